@@ -0,0 +1,62 @@
+"""
+Compare sequential LLMRunner.run against LLMRunner.run_batch on synthetic survey entries.
+
+Usage (from src/):
+    python -m benchmarks.batch_throughput <model.gguf> [--entries 16] [--batch-size 4]
+"""
+
+import argparse
+import time
+
+from benchmarks.synthetic import sample_answers
+from llm_core.inference import LLMRunner
+from menu.options.send_emails.llm_integration.prompt_builder import (
+    PROMPT_PREFIX,
+    build_prompt,
+)
+
+
+def _count_tokens(llm: LLMRunner, texts: list[str]) -> int:
+    return sum(len(llm._llm.tokenize(t.encode("utf-8"), add_bos=False)) for t in texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("model_path")
+    parser.add_argument("--entries", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--n-threads", type=int, default=6)
+    parser.add_argument("--max-tokens", type=int, default=150)
+    args = parser.parse_args()
+
+    prompts = [build_prompt(*answers) for answers in sample_answers(args.entries)]
+    llm = LLMRunner(
+        args.model_path, n_threads=args.n_threads, batch_size=args.batch_size
+    )
+    llm._load_model()
+    print(f"Model loaded in {llm.load_seconds:.1f}s")
+
+    start = time.perf_counter()
+    sequential = [
+        llm.run(p, max_tokens=args.max_tokens, prefix=PROMPT_PREFIX) for p in prompts
+    ]
+    sequential_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = llm.run_batch(prompts, max_tokens=args.max_tokens)
+    batched_s = time.perf_counter() - start
+
+    print(f"{'mode':<12}{'seconds':>10}{'entries/s':>12}{'tokens/s':>12}")
+    for mode, seconds, texts in (
+        ("sequential", sequential_s, sequential),
+        (f"batch x{args.batch_size}", batched_s, batched),
+    ):
+        tokens = _count_tokens(llm, texts)
+        print(
+            f"{mode:<12}{seconds:>10.1f}{len(texts) / seconds:>12.2f}{tokens / seconds:>12.1f}"
+        )
+    print(f"Speedup: {sequential_s / batched_s:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
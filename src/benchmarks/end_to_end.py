@@ -0,0 +1,178 @@
+"""
+End-to-end benchmark of the email run with a synthetic survey and fake LLM and mail backends.
+
+Runs on any machine (no model, Outlook, GPU or network needed) and touches
+nothing outside a temporary folder. For every survey size it reports:
+  - parse:    rows/s streaming the workbook (iter_unsent_entries)
+  - e2e:      emails/s through process_unsent (parse -> generate -> outbox -> send -> log)
+  - sent log: load time, mean append time and export time at that ledger size
+
+Usage (from src/):
+    python -m benchmarks.end_to_end [--sizes 100 1000 10000] [--token-latency 0.0]
+        [--send-latency 0.0] [--send-concurrency 1]
+        [--min-parse-rows-per-s N] [--min-emails-per-s N] [--json report.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+APPENDS_MEASURED = 200
+
+
+def _configure(workdir: str, n: int, survey_path: str):
+    from menu.utils.config_manager import load_config, save_config
+
+    config = load_config()
+    config["Paths"]["survey_path"] = survey_path
+    config["Paths"]["sent_log_path"] = os.path.join(workdir, f"sent_log_{n}.db")
+    config["Paths"]["sent_log_export_path"] = os.path.join(
+        workdir, f"sent_log_{n}.xlsx"
+    )
+    save_config(config)
+
+
+def _measure_parse(survey_path: str) -> tuple[int, float]:
+    from menu.options.send_emails.llm_integration.survey_parser import (
+        iter_unsent_entries,
+    )
+
+    start = time.perf_counter()
+    rows = sum(1 for _ in iter_unsent_entries(survey_path, set()))
+    return rows, time.perf_counter() - start
+
+
+def _measure_e2e(survey_path: str, llm, transport) -> tuple[int, float]:
+    from menu.options.send_emails.email_sender import process_unsent
+    from menu.options.send_emails.llm_integration.generation_cache import (
+        get_generation_cache,
+    )
+
+    get_generation_cache().clear()
+    start = time.perf_counter()
+    # The pipeline prints a few lines per email; keep the console out of the timing.
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = process_unsent(survey_path, llm=llm, send=transport)
+    return len(results), time.perf_counter() - start
+
+
+def _measure_sent_log() -> dict:
+    from menu.options.send_emails.llm_integration.sent_log import (
+        append_to_sent_log,
+        export_sent_log,
+        load_sent_log,
+    )
+
+    start = time.perf_counter()
+    size = len(load_sent_log())
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(APPENDS_MEASURED):
+        append_to_sent_log(f"bench-{i}", "Success")
+    append_s = (time.perf_counter() - start) / APPENDS_MEASURED
+
+    start = time.perf_counter()
+    export_sent_log()
+    export_s = time.perf_counter() - start
+    return {"rows": size, "load_s": load_s, "append_s": append_s, "export_s": export_s}
+
+
+def run(args, workdir: str) -> list[dict]:
+    from benchmarks.fakes import FakeLLMRunner, FakeTransport
+    from benchmarks.synthetic import write_survey_workbook
+
+    model_path = os.path.join(workdir, "fake-model.gguf")
+    with open(model_path, "wb") as f:
+        f.write(b"GGUF")
+
+    results = []
+    for n in args.sizes:
+        survey_path = os.path.join(workdir, f"survey_{n}.xlsx")
+        start = time.perf_counter()
+        write_survey_workbook(survey_path, n, seed=n)
+        write_s = time.perf_counter() - start
+        _configure(workdir, n, survey_path)
+
+        rows, parse_s = _measure_parse(survey_path)
+        llm = FakeLLMRunner(
+            model_path,
+            tokens_per_entry=args.tokens,
+            token_latency=args.token_latency,
+        )
+        transport = FakeTransport(
+            latency=args.send_latency, concurrency=args.send_concurrency
+        )
+        emails, e2e_s = _measure_e2e(survey_path, llm, transport)
+        sent_log = _measure_sent_log()
+
+        result = {
+            "rows": n,
+            "write_s": write_s,
+            "parse_s": parse_s,
+            "parse_rows_per_s": rows / parse_s,
+            "emails": emails,
+            "e2e_s": e2e_s,
+            "emails_per_s": emails / e2e_s if e2e_s else 0.0,
+            "generations": llm.calls,
+            "sent_log": sent_log,
+        }
+        results.append(result)
+        print(
+            f"{n:>8} {rows / parse_s:>12.0f} {result['emails_per_s']:>10.1f} "
+            f"{sent_log['load_s'] * 1000:>10.2f} {sent_log['append_s'] * 1000:>10.3f} "
+            f"{sent_log['export_s'] * 1000:>10.1f}",
+            flush=True,
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--tokens", type=int, default=60, help="tokens per email")
+    parser.add_argument("--token-latency", type=float, default=0.0)
+    parser.add_argument("--send-latency", type=float, default=0.0)
+    parser.add_argument("--send-concurrency", type=int, default=1)
+    parser.add_argument("--min-parse-rows-per-s", type=float, default=0.0)
+    parser.add_argument("--min-emails-per-s", type=float, default=0.0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="benchhub-bench-") as workdir:
+        # Keep config.ini, the ledger, caches and reports inside the temp folder.
+        os.environ["LOCALAPPDATA"] = workdir
+        print(
+            f"{'rows':>8} {'parse r/s':>12} {'emails/s':>10} "
+            f"{'log load ms':>10} {'append ms':>10} {'export ms':>10}"
+        )
+        results = run(args, workdir)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    largest = results[-1]
+    failures = []
+    if largest["parse_rows_per_s"] < args.min_parse_rows_per_s:
+        failures.append(
+            f"parse {largest['parse_rows_per_s']:.0f} rows/s "
+            f"< {args.min_parse_rows_per_s:.0f}"
+        )
+    if largest["emails_per_s"] < args.min_emails_per_s:
+        failures.append(
+            f"end-to-end {largest['emails_per_s']:.1f} emails/s "
+            f"< {args.min_emails_per_s:.1f}"
+        )
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
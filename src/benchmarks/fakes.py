@@ -0,0 +1,181 @@
+import hashlib
+import threading
+import time
+from typing import Callable, Iterator, Optional
+
+from llm_core.generation import GenerationStats, StopCondition
+from menu.options.send_emails.transports import MailTransport
+
+WORDS = (
+    "automation framework training certification mentoring performance security "
+    "cloud pipeline practice community knowledge session roadmap skills testing"
+).split()
+
+
+def _sleep(seconds: float):
+    if seconds > 0:
+        time.sleep(seconds)
+
+
+class FakeTokenizer:
+    """Counts one token per four characters, roughly what a real BPE vocabulary does."""
+
+    def count(self, text: str) -> int:
+        return (len(text) + 3) // 4
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        return text[: max(max_tokens, 0) * 4]
+
+
+class FakeLLMRunner:
+    """
+    Deterministic stand-in for LLMRunner, for benchmarks without a model.
+
+    The same prompt always produces the same paragraph. Each "token" costs
+    ``token_latency`` seconds and every prompt ``prompt_latency`` seconds, so
+    decode time scales the way a real model's does. ``model_path`` must be an
+    existing file because the generation cache keys on its identity.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        tokens_per_entry: int = 60,
+        token_latency: float = 0.0,
+        prompt_latency: float = 0.0,
+        batch_size: int = 4,
+        n_ctx: int = 2048,
+    ):
+        self.model_path = model_path
+        self.n_ctx = n_ctx
+        self.tokenizer = FakeTokenizer()
+        self.tokens_per_entry = tokens_per_entry
+        self.token_latency = token_latency
+        self.prompt_latency = prompt_latency
+        self.batch_size = batch_size
+        self.is_loaded = True
+        self.last_stats: list[GenerationStats] = []
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _words(self, prompt: str) -> list[str]:
+        seed = hashlib.sha256(prompt.encode("utf-8")).digest()
+        return [
+            WORDS[seed[i % len(seed)] % len(WORDS)]
+            for i in range(self.tokens_per_entry)
+        ]
+
+    def _generate(
+        self, prompt: str, max_tokens: int, stop, stats: GenerationStats
+    ) -> Iterator[str]:
+        _sleep(self.prompt_latency)
+        stop = StopCondition.coerce(stop)
+        text = ""
+        for word in self._words(prompt)[:max_tokens]:
+            _sleep(self.token_latency)
+            stats.add_token()
+            text += word + " "
+            match = stop.find(text)
+            if match is not None:
+                stats.finish(match[1])
+                return
+            yield word + " "
+        stats.finish("length")
+
+    def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 150,
+        stop=None,
+        prefix: Optional[str] = None,
+    ):
+        from llm_core.inference import TokenStream
+
+        stats = GenerationStats()
+        self.last_stats = [stats]
+        return TokenStream(self._stream_pieces(prompt, max_tokens, stop, stats), stats)
+
+    def _stream_pieces(self, prompt, max_tokens, stop, stats):
+        text = ""
+        with self._lock:
+            self.calls += 1
+            for piece in self._generate(prompt, max_tokens, stop, stats):
+                text += piece
+                yield piece
+        return text.strip()
+
+    def run(self, prompt: str, max_tokens: int = 150, stop=None, prefix=None) -> str:
+        stream = self.stream(prompt, max_tokens=max_tokens, stop=stop, prefix=prefix)
+        for _ in stream:
+            pass
+        return stream.text
+
+    def run_batch(
+        self,
+        prompts: list[str],
+        max_tokens: int = 150,
+        stop=None,
+        batch_size: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None,
+        n_ctx: Optional[int] = None,
+    ) -> list[str]:
+        """Decode ``batch_size`` prompts per step, paying one token latency per step."""
+        width = batch_size or self.batch_size
+        results, all_stats = [], []
+        with self._lock:
+            self.calls += 1
+            for start in range(0, len(prompts), width):
+                chunk = prompts[start : start + width]
+                stats = [GenerationStats() for _ in chunk]
+                _sleep(self.prompt_latency)
+                words = [self._words(p)[:max_tokens] for p in chunk]
+                for step in range(max(len(w) for w in words)):
+                    _sleep(self.token_latency)
+                    for s, w in zip(stats, words):
+                        if step < len(w):
+                            s.add_token()
+                    if progress is not None:
+                        progress(sum(s.tokens for s in all_stats + stats))
+                for s in stats:
+                    s.finish("length")
+                results.extend(" ".join(w) for w in words)
+                all_stats.extend(stats)
+        self.last_stats = all_stats
+        return results
+
+    def unload(self) -> bool:
+        return False
+
+
+class FakeTransport(MailTransport):
+    """
+    Records every email instead of sending it, optionally sleeping ``latency`` per send.
+
+    ``concurrency`` sends run in parallel, like a pooled SMTP transport.
+    """
+
+    def __init__(self, latency: float = 0.0, fail_every: int = 0, concurrency: int = 1):
+        self.latency = latency
+        self.concurrency = concurrency
+        self.fail_every = fail_every
+        self.sent: list[dict] = []
+        self._lock = threading.Lock()
+
+    def send(
+        self, to: str, cc: str, subject: str, html_body: str, message_id: str = ""
+    ):
+        _sleep(self.latency)
+        with self._lock:
+            attempt = len(self.sent) + 1
+            if self.fail_every and attempt % self.fail_every == 0:
+                self.sent.append({"to": to, "failed": True})
+                raise RuntimeError(f"Simulated delivery failure for {to}")
+            self.sent.append(
+                {
+                    "to": to,
+                    "cc": cc,
+                    "subject": subject,
+                    "message_id": message_id,
+                    "bytes": len(html_body),
+                }
+            )
@@ -0,0 +1,118 @@
+"""
+Startup benchmark: cold start of main.py up to the first menu frame.
+
+Each run starts a fresh interpreter with ``-X importtime``, imports the menu
+and draws the first frame (logo and menu items, without waiting for a key).
+Exits non-zero if the median exceeds the budget or if any heavy dependency
+was imported on the way.
+
+Usage (from src/):
+    python -m benchmarks.startup [--runs 5] [--budget-ms 300] [--top 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules that belong to individual features, never to the menu itself.
+HEAVY_MODULES = (
+    "pandas",
+    "numpy",
+    "openpyxl",
+    "llama_cpp",
+    "win32com",
+    "pythoncom",
+    "tkinter",
+    "diskcache",
+    "tabulate",
+    "watchdog",
+)
+
+# Runs in the child interpreter; the timing covers interpreter start-up too.
+_CHILD = """
+import json, sys, time
+import menu.handler
+from menu.utils.logo import get_logo
+
+get_logo()
+print("BenchHub LLM Integration Menu:")
+elapsed = time.perf_counter() - float(sys.argv[1])
+print("@@" + json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run_once() -> tuple[float, list[str], dict[str, int]]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _CHILD, repr(start)],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "TERM": os.environ.get("TERM", "dumb")},
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"menu start-up failed:\n{proc.stderr}")
+    marker = next(line for line in proc.stdout.splitlines() if line.startswith("@@"))
+    result = json.loads(marker[2:])
+    return result["elapsed"], result["modules"], _parse_importtime(proc.stderr)
+
+
+def _parse_importtime(stderr: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per top-level package."""
+    totals: dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if name.startswith("  "):
+            continue  # Nested import, already counted by its parent.
+        totals[name.strip()] = int(cumulative)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=300.0)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    timings = []
+    for _ in range(args.runs):
+        elapsed, modules, imports = _run_once()
+        timings.append(elapsed)
+
+    print(f"Slowest top-level imports (last run, of {len(modules)} modules):")
+    for name, micros in sorted(imports.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"  {micros / 1000:8.1f} ms  {name}")
+
+    median_ms = statistics.median(timings) * 1000
+    print(
+        f"Cold start to first menu frame: median {median_ms:.0f} ms, "
+        f"min {min(timings) * 1000:.0f} ms over {args.runs} runs "
+        f"(budget {args.budget_ms:.0f} ms)"
+    )
+
+    failed = False
+    heavy = sorted(
+        {m.split(".")[0] for m in modules} & {m.split(".")[0] for m in HEAVY_MODULES}
+    )
+    if heavy:
+        print(f"FAIL: heavy modules imported at start-up: {', '.join(heavy)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"FAIL: start-up exceeds the {args.budget_ms:.0f} ms budget")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Microbenchmark: unsent-entry extraction from a synthetic survey workbook, legacy vs streaming.
+
+Both sides start from the .xlsx file, like a real run. The legacy side is the
+original path (pandas.read_excel, find_column, iterrows); the streaming side
+is iter_unsent_entries, which the send pipeline and the watch mode use.
+
+Usage (from src/):
+    python -m benchmarks.survey_parsing [--rows 10000] [--repeat 3]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import write_survey_workbook
+from menu.options.send_emails.llm_integration.survey_parser import (
+    find_column,
+    iter_unsent_entries,
+)
+
+LEGACY_KEYWORDS = [
+    "upskilling",
+    "future training programs",
+    "currently engaged in any training",
+    "email",
+    "name",
+    "career coach",
+    "id",
+]
+
+
+def legacy_get_entries(path: str, sent_ids: set) -> list[dict]:
+    """The original path: read the whole sheet, repeated find_column scans, then iterrows."""
+    df = pd.read_excel(path)
+    for keyword in LEGACY_KEYWORDS:  # validation pass in send_all_emails
+        find_column(df, keyword)
+    col_interest = find_column(df, "upskilling")
+    col_motivation = find_column(df, "future training programs")
+    col_enrolled = find_column(df, "currently engaged in any training")
+    col_email = find_column(df, "email")
+    col_name = find_column(df, "name")
+    col_coach = find_column(df, "career coach")
+    col_id = find_column(df, "Id")
+
+    entries = []
+    for _, row in df.iterrows():
+        entry_id = str(row[col_id]).strip()
+        if entry_id in sent_ids:
+            continue
+        entries.append(
+            {
+                "id": entry_id,
+                "name": str(row[col_name]).strip(),
+                "email": str(row[col_email]).strip(),
+                "career_coach": str(row[col_coach]).strip(),
+                "r1": str(row[col_interest]).strip() or "-",
+                "r2": str(row[col_motivation]).strip() or "-",
+                "r3": str(row[col_enrolled]).strip() or "-",
+            }
+        )
+    return entries
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sent_ids = {str(i) for i in range(1, args.rows + 1, 2)}
+    with tempfile.TemporaryDirectory() as workdir:
+        path = write_survey_workbook(os.path.join(workdir, "survey.xlsx"), args.rows)
+
+        def streaming():
+            return list(iter_unsent_entries(path, sent_ids))
+
+        legacy = legacy_get_entries(path, sent_ids)
+        entries = streaming()
+        assert [e["id"] for e in legacy] == [e["id"] for e in entries]
+
+        legacy_s = _best_of(lambda: legacy_get_entries(path, sent_ids), args.repeat)
+        streaming_s = _best_of(streaming, args.repeat)
+    print(f"{args.rows} rows, {len(sent_ids)} already sent, {len(entries)} entries")
+    print(f"legacy     {legacy_s * 1000:10.1f} ms  {args.rows / legacy_s:12.0f} rows/s")
+    print(
+        f"streaming  {streaming_s * 1000:10.1f} ms  {args.rows / streaming_s:12.0f} rows/s"
+    )
+    print(f"Speedup: {legacy_s / streaming_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
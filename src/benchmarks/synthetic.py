@@ -0,0 +1,84 @@
+import random
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from menu.utils.survey_schema import REQUIRED_COLUMNS
+
+INTERESTS = [
+    "Automation",
+    "AI",
+    "Performance",
+    "Security",
+    "Accessibility",
+    "Mobile Testing",
+    "Cloud",
+    "DevOps",
+]
+MOTIVATIONS = [
+    "I would like to get better at test automation frameworks.",
+    "Prompt engineering and using AI tools in testing.",
+    "Performance testing with JMeter and k6.",
+    "No",
+    "-",
+    "",
+    "Leadership and mentoring skills.",
+    "ISTQB Advanced Test Analyst certification.",
+]
+TRAININGS = ["Yes", "No", "ISTQB Foundation", "AWS Cloud Practitioner", "-", ""]
+OFFICES = ["Iasi", "Cluj", "Bucharest", "Brasov", "Timisoara"]
+COACHES = [f"coach{i}@endava.com" for i in range(12)]
+
+
+def sample_answers(n: int, seed: int = 0) -> list[tuple[str, str, str]]:
+    """Return ``n`` deterministic (r1, r2, r3) answer triples shaped like real survey data."""
+    rng = random.Random(seed)
+    answers = []
+    for _ in range(n):
+        interests = rng.sample(INTERESTS, rng.randint(1, 4))
+        r1 = ";".join(interests) + ";"
+        answers.append((r1, rng.choice(MOTIVATIONS), rng.choice(TRAININGS)))
+    return answers
+
+
+def synthetic_rows(n: int, seed: int = 0, first_id: int = 1) -> Iterator[list]:
+    """Yield ``n`` survey rows in REQUIRED_COLUMNS order, starting at Id ``first_id``."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 6, 9, 0)
+    for i, (r1, r2, r3) in enumerate(sample_answers(n, seed), start=first_id):
+        started = start + timedelta(minutes=7 * i)
+        yield [
+            i,
+            started,
+            started + timedelta(minutes=rng.randint(2, 15)),
+            f"person{i}@endava.com",
+            f"Person {i}",
+            rng.choice(OFFICES),
+            rng.choice(COACHES),
+            r1,
+            r3,
+            rng.choice(MOTIVATIONS) if r3 == "Yes" else None,
+            r2 or None,
+            rng.choice(["Yes", "No", "Maybe"]),
+            rng.choice(["Yes", "No"]),
+            rng.choice(["Yes", "No"]),
+            rng.choice([0, 1]),
+        ]
+
+
+def write_survey_workbook(path: str, n: int, seed: int = 0) -> str:
+    """
+    Write an ``n``-row survey workbook shaped like the Microsoft Forms export.
+
+    openpyxl's regular mode is used on purpose: like Forms, it stores text in
+    the shared-strings table, whereas write-only mode writes inline strings
+    that are noticeably slower to parse and would skew the parse benchmark.
+    """
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.append(REQUIRED_COLUMNS)
+    for row in synthetic_rows(n, seed):
+        ws.append(row)
+    wb.save(path)
+    return path
@@ -0,0 +1,213 @@
+import math
+import os
+import statistics
+import threading
+import time
+import zipfile
+from datetime import datetime
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+from llm_core.model_manager import get_model_manager
+from menu.options.send_emails.email_sender import process_unsent
+from menu.options.send_emails.llm_integration.run import get_llm_runner
+from menu.options.send_emails.transports import get_transport
+from menu.utils.config_manager import get_survey_path
+
+DEBOUNCE_SECONDS = 5.0  # Wait this long after the last write before reading
+STABLE_POLL_SECONDS = 2.0  # Interval between size/mtime checks
+STABLE_TIMEOUT = 120.0  # Give up on a file that never settles
+POLL_INTERVAL = 300.0  # Fallback rescan when no events arrive (e.g. SMB shares)
+
+
+def _log(message: str):
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] {message}", flush=True)
+
+
+def wait_until_stable(path: str, poll: float = STABLE_POLL_SECONDS) -> bool:
+    """
+    Wait until ``path`` is a complete xlsx that has stopped changing.
+
+    OneDrive writes the workbook in several chunks, so the file counts as
+    settled once its size and mtime are unchanged across two polls and it
+    opens as a zip archive. Returns False if that never happens within
+    STABLE_TIMEOUT.
+    """
+    deadline = time.monotonic() + STABLE_TIMEOUT
+    previous = None
+    while time.monotonic() < deadline:
+        try:
+            stat = os.stat(path)
+            current = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            current = None
+        if current is not None and current == previous and zipfile.is_zipfile(path):
+            return True
+        previous = current
+        time.sleep(poll)
+    return False
+
+
+def _parse_time(value):
+    if isinstance(value, datetime):
+        return value
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+
+
+def time_to_email(entry: dict):
+    """Seconds between the response's completion time and the email going out."""
+    completed = _parse_time(entry.get("completion_time"))
+    sent_at = entry.get("sent_at")
+    if completed is None or sent_at is None:
+        return None
+    return (sent_at - completed).total_seconds()
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 2 * 3600:
+        return f"{seconds / 60:.1f}min"
+    return f"{seconds / 3600:.1f}h"
+
+
+class _SurveyEventHandler(FileSystemEventHandler):
+    def __init__(self, path: str, callback):
+        self._path = os.path.normcase(os.path.abspath(path))
+        self._callback = callback
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def _matches(self, event) -> bool:
+        paths = [event.src_path, getattr(event, "dest_path", "")]
+        return any(
+            p and os.path.normcase(os.path.abspath(p)) == self._path for p in paths
+        )
+
+    def on_any_event(self, event):
+        if event.is_directory or not self._matches(event):
+            return
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._timer = threading.Timer(DEBOUNCE_SECONDS, self._callback)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+
+
+class SurveyWatcher:
+    """
+    Send emails for new survey responses as soon as the workbook changes.
+
+    Runs are single-flight: a change that arrives while a batch is being sent
+    schedules exactly one more run afterwards. The model stays loaded between
+    runs so a new response only pays for its own generation, and the mail
+    transport (e.g. its pooled SMTP connections) stays open as well.
+    """
+
+    def __init__(self, survey_path: str, send=None):
+        self.survey_path = survey_path
+        self._owns_transport = send is None
+        self.send = send or get_transport()
+        self.latencies: list[float] = []
+        self._run_lock = threading.Lock()
+        self._pending = threading.Event()
+        self._stop = threading.Event()
+
+    def trigger(self):
+        self._pending.set()
+        if not self._run_lock.acquire(blocking=False):
+            return  # The running batch picks the change up when it finishes.
+        try:
+            while self._pending.is_set() and not self._stop.is_set():
+                self._pending.clear()
+                self._process()
+        finally:
+            self._run_lock.release()
+
+    def _process(self):
+        if not wait_until_stable(self.survey_path):
+            _log("Survey file did not settle; will retry on the next change.")
+            return
+        try:
+            results = process_unsent(self.survey_path, send=self.send)
+        except (ValueError, PermissionError) as e:
+            _log(f"Could not process survey: {e}")
+            return
+        except Exception as e:
+            _log(f"Unexpected error while processing survey: {e}")
+            return
+        if not results:
+            return
+        for entry in results:
+            seconds = time_to_email(entry)
+            if seconds is None:
+                continue
+            self.latencies.append(seconds)
+            _log(f"Id {entry['id']}: time to email {_format_duration(seconds)}")
+        _log(self.latency_report())
+
+    def latency_report(self) -> str:
+        if not self.latencies:
+            return "Time to email: no completion times recorded."
+        return (
+            f"Time to email over {len(self.latencies)} responses: "
+            f"p50 {_format_duration(statistics.median(self.latencies))}, "
+            f"max {_format_duration(max(self.latencies))}"
+        )
+
+    def run(self, poll_interval: float = POLL_INTERVAL):
+        manager = get_model_manager()
+        manager.idle_timeout = math.inf
+        get_llm_runner().load()  # Load the model once, up front.
+
+        handler = _SurveyEventHandler(
+            self.survey_path, lambda: threading.Thread(target=self.trigger).start()
+        )
+        observer = Observer()
+        observer.schedule(handler, os.path.dirname(os.path.abspath(self.survey_path)))
+        observer.start()
+        _log(f"Watching {self.survey_path}")
+        try:
+            self.trigger()  # Catch up on anything that arrived while stopped.
+            while not self._stop.wait(poll_interval):
+                self.trigger()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop.set()
+            handler.cancel()
+            observer.stop()
+            observer.join()
+            manager.shutdown()
+            if self._owns_transport:
+                self.send.close()
+            _log(self.latency_report())
+
+    def stop(self):
+        self._stop.set()
+
+
+def watch_survey():
+    survey_path = get_survey_path()
+    if not survey_path or not os.path.exists(survey_path):
+        print("Survey file not found. Please configure the path in the options menu.")
+        return 1
+    try:
+        watcher = SurveyWatcher(survey_path)
+    except ValueError as e:
+        print(f"Mail transport is not configured correctly: {e}")
+        return 1
+    watcher.run()
+    return 0
@@ -0,0 +1,172 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from llm_core.generation import StopCondition
+from llm_core.gguf import default_n_ctx
+from llm_core.inference import LLMRunner
+from llm_core.sharding import cpu_topology
+
+THREAD_STEPS = (1, 2, 4, 6, 8, 12, 16, 24, 32, 48, 64)
+BATCH_STEPS = (64, 128, 256, 512, 1024, 2048)
+MEMORY_OPTIONS = ((True, False), (True, True), (False, False))
+DECODE_TOKENS = 32
+# Prefer the current choice unless another one beats it by more than this.
+MIN_GAIN = 0.03
+
+
+@dataclass
+class Trial:
+    n_threads: int
+    n_batch: int
+    use_mmap: bool
+    use_mlock: bool
+    load_seconds: float = 0.0
+    prompt_tokens: int = 0
+    prompt_tokens_per_second: float = 0.0
+    decode_tokens_per_second: float = 0.0
+
+    def settings(self) -> dict:
+        return {
+            "n_threads": self.n_threads,
+            "n_batch": self.n_batch,
+            "use_mmap": self.use_mmap,
+            "use_mlock": self.use_mlock,
+        }
+
+    def summary(self) -> str:
+        memory = "mmap" if self.use_mmap else "no-mmap"
+        if self.use_mlock:
+            memory += "+mlock"
+        return (
+            f"threads={self.n_threads:<3} n_batch={self.n_batch:<5} {memory:<12} "
+            f"load {self.load_seconds:5.1f}s  "
+            f"prompt {self.prompt_tokens_per_second:7.1f} tok/s  "
+            f"decode {self.decode_tokens_per_second:6.1f} tok/s"
+        )
+
+
+def physical_cores() -> int:
+    return len({(socket_id, core_id) for _, socket_id, core_id in cpu_topology()})
+
+
+def thread_candidates(cores: int) -> list[int]:
+    return sorted({n for n in THREAD_STEPS if n < cores} | {cores})
+
+
+def batch_candidates(prompt_tokens: int, n_ctx: int) -> list[int]:
+    """Batch sizes up to the first one that holds the whole prompt; larger ones change nothing."""
+    candidates = []
+    for n in BATCH_STEPS:
+        if n > n_ctx:
+            break
+        candidates.append(n)
+        if n >= prompt_tokens:
+            break
+    return candidates
+
+
+def measure(model_path: str, prompt: str, n_ctx: int, trial: Trial) -> Trial:
+    """Load the model with ``trial``'s settings and time one prompt evaluation and decode."""
+    runner = LLMRunner(
+        model_path,
+        n_ctx=n_ctx,
+        n_threads=trial.n_threads,
+        n_batch=trial.n_batch,
+        use_mmap=trial.use_mmap,
+        use_mlock=trial.use_mlock,
+    )
+    try:
+        start = time.perf_counter()
+        runner.load()
+        trial.load_seconds = time.perf_counter() - start
+        # Warm up on a different prompt, so the measured one is evaluated in full.
+        runner.run("Hello", max_tokens=4)
+        trial.prompt_tokens = len(runner.tokenize(prompt))
+        runner.run(prompt, max_tokens=DECODE_TOKENS, stop=StopCondition())
+        stats = runner.last_stats[0]
+        if stats.ttft:
+            trial.prompt_tokens_per_second = trial.prompt_tokens / stats.ttft
+        if stats.tokens > 1 and stats.finished_at is not None:
+            decode_seconds = stats.finished_at - stats.first_token_at
+            trial.decode_tokens_per_second = (stats.tokens - 1) / decode_seconds
+    finally:
+        runner.unload()
+    return trial
+
+
+def _best(trials: list[Trial], score: Callable[[Trial], float], current: Trial):
+    best = max(trials, key=score)
+    if score(best) > score(current) * (1 + MIN_GAIN):
+        return best
+    return current
+
+
+def autotune(
+    model_path: str,
+    prompt: str,
+    n_ctx: int = 0,
+    baseline: Optional[dict] = None,
+    on_trial: Optional[Callable[[Trial], None]] = None,
+) -> tuple[dict, list[Trial]]:
+    """
+    Find the fastest llama settings for this host and model; returns ``(settings, trials)``.
+
+    The sweep runs one parameter at a time from ``baseline`` (the current
+    settings): thread count by decode speed, stopping once two larger counts
+    in a row are slower; n_batch by prompt-evaluation speed, only up to the
+    prompt's length; then mmap/mlock by decode speed. A change is kept only
+    if it is more than MIN_GAIN faster than the current choice, so noise
+    never flips a setting. Each trial loads its own copy of the model, so
+    unload any resident one first (ModelManager.unload_all). ``n_ctx`` 0 uses
+    the model's own default (see gguf.default_n_ctx).
+    """
+    n_ctx = n_ctx or default_n_ctx(model_path)
+    baseline = baseline or {}
+    current = Trial(
+        n_threads=baseline.get("n_threads", 6),
+        n_batch=baseline.get("n_batch", 512),
+        use_mmap=baseline.get("use_mmap", True),
+        use_mlock=baseline.get("use_mlock", False),
+    )
+    trials = []
+
+    def run(**changes) -> Trial:
+        trial = measure(
+            model_path, prompt, n_ctx, Trial(**{**current.settings(), **changes})
+        )
+        trials.append(trial)
+        if on_trial is not None:
+            on_trial(trial)
+        return trial
+
+    current = run()
+
+    sweep = []
+    slower = 0
+    for n_threads in thread_candidates(physical_cores()):
+        trial = run(n_threads=n_threads)
+        if (
+            sweep
+            and trial.decode_tokens_per_second < sweep[-1].decode_tokens_per_second
+        ):
+            slower += 1
+            if slower == 2:
+                break
+        else:
+            slower = 0
+        sweep.append(trial)
+    current = _best(sweep, lambda t: t.decode_tokens_per_second, current)
+
+    sweep = [
+        run(n_batch=n_batch)
+        for n_batch in batch_candidates(current.prompt_tokens, n_ctx)
+    ]
+    current = _best(sweep, lambda t: t.prompt_tokens_per_second, current)
+
+    sweep = [
+        run(use_mmap=use_mmap, use_mlock=use_mlock)
+        for use_mmap, use_mlock in MEMORY_OPTIONS
+    ]
+    current = _best(sweep, lambda t: t.decode_tokens_per_second, current)
+    return current.settings(), trials
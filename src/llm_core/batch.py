@@ -0,0 +1,248 @@
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Union
+
+import llama_cpp
+import numpy as np
+from llama_cpp import Llama
+from llama_cpp import _internals as internals
+
+from llm_core.generation import GenerationStats, StopCondition
+from telemetry.recorder import stage
+
+
+@dataclass
+class SamplingParams:
+    """Sampling settings, defaulting to the same values Llama.__call__ uses."""
+
+    temperature: float = 0.8
+    top_k: int = 40
+    top_p: float = 0.95
+    min_p: float = 0.05
+    seed: Optional[int] = None
+
+
+@dataclass
+class _Sequence:
+    seq_id: int
+    prompt: list[int]
+    n_past: int = 0
+    generated: list[int] = field(default_factory=list)
+    text: bytes = b""
+    done: bool = False
+    stats: GenerationStats = field(default_factory=GenerationStats)
+
+
+class BatchDecoder:
+    """
+    Decodes several prompts in parallel as separate sequences of one llama context.
+
+    The context shares the weights of an already loaded ``Llama`` and reserves
+    ``n_ctx_per_seq`` KV cells for each of the ``width`` sequences. Every decode
+    step evaluates one token for every active sequence in a single batch, which
+    keeps the CPU's matrix units busy where a single stream is memory bound.
+    """
+
+    def __init__(self, llm: Llama, width: int, n_ctx_per_seq: int, n_threads: int):
+        if width < 1:
+            raise ValueError("Batch width must be at least 1.")
+        self.width = width
+        self.n_ctx_per_seq = n_ctx_per_seq
+        self._llm = llm
+        self._model = llm._model
+        self._vocab = llama_cpp.llama_model_get_vocab(self._model.model)
+        self._n_vocab = llm.n_vocab()
+        self.n_batch = max(llm.n_batch, width)
+
+        params = internals.LlamaContext.default_params()
+        params.n_ctx = width * n_ctx_per_seq
+        params.n_batch = self.n_batch
+        params.n_ubatch = self.n_batch
+        params.n_seq_max = width
+        params.n_threads = n_threads
+        params.n_threads_batch = n_threads
+        self._ctx = internals.LlamaContext(
+            model=self._model, params=params, verbose=False
+        )
+        self._batch = internals.LlamaBatch(
+            n_tokens=self.n_batch, embd=0, n_seq_max=width, verbose=False
+        )
+        self.last_stats: list[GenerationStats] = []
+
+    def close(self):
+        self._batch.close()
+        self._ctx.close()
+
+    def generate(
+        self,
+        prompts: list[list[int]],
+        max_tokens: int,
+        stop: Union[StopCondition, list[str], None] = None,
+        sampling: Optional[SamplingParams] = None,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> list[str]:
+        """
+        Generate a completion for each tokenized prompt. Results keep input order.
+
+        A sequence leaves the batch as soon as ``stop`` matches its text, so the
+        remaining ones decode without it. ``progress`` is called after every
+        decode step with the number of tokens generated so far; per-sequence
+        timings are left in ``last_stats``.
+        """
+        if len(prompts) > self.width:
+            raise ValueError(f"At most {self.width} prompts fit in one batch.")
+        if not prompts:
+            return []
+        for tokens in prompts:
+            if len(tokens) + 1 > self.n_ctx_per_seq:
+                raise ValueError(
+                    f"Prompt of {len(tokens)} tokens does not fit a context of {self.n_ctx_per_seq}."
+                )
+
+        sampling = sampling or SamplingParams()
+        rng = np.random.default_rng(sampling.seed)
+        stop = StopCondition.coerce(stop)
+        seqs = [
+            _Sequence(seq_id=i, prompt=list(tokens)) for i, tokens in enumerate(prompts)
+        ]
+
+        self.last_stats = [s.stats for s in seqs]
+        self._ctx.kv_cache_clear()
+        with stage("llm.prompt_eval", tokens=sum(len(t) for t in prompts)):
+            last_logits = self._eval_prompts(seqs)
+        with stage("llm.decode") as counts:
+            for s in seqs:
+                self._accept(
+                    s,
+                    self._sample(last_logits[s.seq_id], sampling, rng),
+                    max_tokens,
+                    stop,
+                )
+            while True:
+                active = [s for s in seqs if not s.done]
+                if not active:
+                    break
+                self._batch.reset()
+                for s in active:
+                    self._add(s.generated[-1], s.n_past, s.seq_id, True)
+                    s.n_past += 1
+                self._ctx.decode(self._batch)
+                for i, s in enumerate(active):
+                    self._accept(s, self._sample(i, sampling, rng), max_tokens, stop)
+                if progress is not None:
+                    progress(sum(s.stats.tokens for s in seqs))
+            counts["tokens"] = sum(s.stats.tokens for s in seqs)
+
+        return [self._finish(s, stop) for s in seqs]
+
+    def _eval_prompts(self, seqs: list[_Sequence]) -> dict:
+        """
+        Evaluate every prompt, returning the last-token logits of each sequence.
+
+        Tokens shared by all prompts (e.g. the fixed instruction prefix) are
+        evaluated once on the first sequence and copied to the others.
+        """
+        shared = (
+            _common_prefix_length([s.prompt[:-1] for s in seqs]) if len(seqs) > 1 else 0
+        )
+        if shared:
+            first = seqs[0]
+            self._decode_tokens(
+                [(first, pos, first.prompt[pos]) for pos in range(shared)]
+            )
+            for s in seqs[1:]:
+                self._ctx.kv_cache_seq_cp(first.seq_id, s.seq_id, 0, shared)
+
+        pending = []
+        for s in seqs:
+            s.n_past = len(s.prompt)
+            pending.extend(
+                (s, pos, s.prompt[pos]) for pos in range(shared, len(s.prompt))
+            )
+        return self._decode_tokens(pending)
+
+    def _decode_tokens(self, pending: list[tuple]) -> dict:
+        logits = {}
+        for start in range(0, len(pending), self.n_batch):
+            chunk = pending[start : start + self.n_batch]
+            self._batch.reset()
+            last_rows = []
+            for row, (s, pos, token) in enumerate(chunk):
+                is_last = pos == len(s.prompt) - 1
+                self._add(token, pos, s.seq_id, is_last)
+                if is_last:
+                    last_rows.append((s, row))
+            self._ctx.decode(self._batch)
+            for s, row in last_rows:
+                logits[s.seq_id] = self._logits(row)
+        return logits
+
+    def _add(self, token: int, pos: int, seq_id: int, logits: bool):
+        b = self._batch.batch
+        i = b.n_tokens
+        b.token[i] = token
+        b.pos[i] = pos
+        b.seq_id[i][0] = seq_id
+        b.n_seq_id[i] = 1
+        b.logits[i] = logits
+        b.n_tokens = i + 1
+
+    def _logits(self, row: int) -> np.ndarray:
+        ptr = self._ctx.get_logits_ith(row)
+        return np.ctypeslib.as_array(ptr, shape=(self._n_vocab,)).copy()
+
+    def _sample(self, row, sampling: SamplingParams, rng) -> int:
+        # Same order as llama.cpp's sampler chain: top-k, top-p, min-p, then temperature.
+        logits = row if isinstance(row, np.ndarray) else self._logits(row)
+        if sampling.temperature <= 0:
+            return int(np.argmax(logits))
+        k = min(sampling.top_k, logits.size) if sampling.top_k > 0 else logits.size
+        top = np.argpartition(logits, -k)[-k:]
+        top = top[np.argsort(logits[top])[::-1]]
+        probs = np.exp(logits[top] - logits[top[0]])
+        probs /= probs.sum()
+        keep = np.zeros(len(top), dtype=bool)
+        keep[: int(np.searchsorted(np.cumsum(probs), sampling.top_p)) + 1] = True
+        keep &= probs >= sampling.min_p * probs[0]
+        top = top[keep]
+        scaled = np.exp((logits[top] - logits[top[0]]) / sampling.temperature)
+        return int(rng.choice(top, p=scaled / scaled.sum()))
+
+    def _accept(self, seq: _Sequence, token: int, max_tokens: int, stop: StopCondition):
+        if llama_cpp.llama_vocab_is_eog(self._vocab, token):
+            self._done(seq, "eos")
+            return
+        seq.generated.append(token)
+        seq.stats.add_token()
+        seq.text += self._model.detokenize([token])
+        decoded = seq.text.decode("utf-8", errors="ignore")
+        match = stop.find(decoded)
+        if match is not None:
+            self._done(seq, match[1])
+        elif len(seq.generated) >= max_tokens:
+            self._done(seq, "length")
+        elif seq.n_past + 1 >= self.n_ctx_per_seq:
+            self._done(seq, "context")
+
+    @staticmethod
+    def _done(seq: _Sequence, reason: str):
+        seq.done = True
+        seq.stats.finish(reason)
+
+    @staticmethod
+    def _finish(seq: _Sequence, stop: StopCondition) -> str:
+        text = seq.text.decode("utf-8", errors="ignore")
+        match = stop.find(text)
+        if match is not None:
+            text = text[: match[0]]
+        return text.strip()
+
+
+def _common_prefix_length(token_lists: list[list[int]]) -> int:
+    if not token_lists:
+        return 0
+    first = token_lists[0]
+    length = min(len(t) for t in token_lists)
+    for i in range(length):
+        if any(t[i] != first[i] for t in token_lists[1:]):
+            return i
+    return length
@@ -0,0 +1,108 @@
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Union
+
+# A blank line after some text: the first paragraph is complete.
+_PARAGRAPH_BREAK = re.compile(r"\S[ \t]*\r?\n[ \t]*\r?\n")
+
+
+class StopCondition:
+    """
+    Decide where generated text should end.
+
+    Generation stops at the earliest of: any literal ``stop`` string, any
+    ``patterns`` regex (matched case-insensitively) and, with ``paragraph``,
+    the first blank line after some text. The text is cut where the match
+    starts, so stop strings, sign-offs and second paragraphs never reach the
+    email.
+    """
+
+    def __init__(
+        self,
+        stop: Iterable[str] = (),
+        patterns: Iterable[str] = (),
+        paragraph: bool = False,
+    ):
+        self.stop = [s for s in stop if s]
+        self.patterns = [re.compile(p, re.IGNORECASE) for p in patterns]
+        self.paragraph = paragraph
+
+    @classmethod
+    def coerce(
+        cls, stop: Union["StopCondition", Iterable[str], None]
+    ) -> "StopCondition":
+        if isinstance(stop, StopCondition):
+            return stop
+        return cls(stop or ())
+
+    def find(self, text: str) -> Optional[tuple[int, str]]:
+        """Return ``(cut_index, reason)`` for the earliest stop in ``text``, if any."""
+        best = None
+        for s in self.stop:
+            idx = text.find(s)
+            if idx != -1 and (best is None or idx < best[0]):
+                best = (idx, "stop")
+        for pattern in self.patterns:
+            match = pattern.search(text)
+            if match and (best is None or match.start() < best[0]):
+                best = (match.start(), "pattern")
+        if self.paragraph:
+            match = _PARAGRAPH_BREAK.search(text)
+            if match and (best is None or match.start() + 1 < best[0]):
+                best = (match.start() + 1, "paragraph")
+        return best
+
+    def holdback(self) -> int:
+        """Characters a stream must hold back so a partial stop string is never emitted."""
+        return max((len(s) - 1 for s in self.stop), default=0)
+
+
+@dataclass
+class GenerationStats:
+    """Timing of one generated sequence; times are seconds from the start of the request."""
+
+    started: float = field(default_factory=time.perf_counter)
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    tokens: int = 0
+    stop_reason: str = ""
+    # Speculative decoding: whether drafts were on, and how many were proposed/kept.
+    speculative: bool = False
+    drafted: int = 0
+    accepted: int = 0
+
+    def add_token(self):
+        now = time.perf_counter()
+        if self.first_token_at is None:
+            self.first_token_at = now
+        self.tokens += 1
+
+    def finish(self, reason: str):
+        self.finished_at = time.perf_counter()
+        self.stop_reason = self.stop_reason or reason
+
+    @property
+    def ttft(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Decode rate after the first token (prompt evaluation excluded)."""
+        if self.first_token_at is None or self.finished_at is None or self.tokens < 2:
+            return None
+        elapsed = self.finished_at - self.first_token_at
+        return (self.tokens - 1) / elapsed if elapsed > 0 else None
+
+    def summary(self) -> str:
+        ttft = f"{self.ttft:.2f}s" if self.ttft is not None else "-"
+        rate = self.tokens_per_second
+        rate = f"{rate:.1f} tok/s" if rate is not None else "- tok/s"
+        summary = (
+            f"TTFT {ttft}, {self.tokens} tokens at {rate}, stop: {self.stop_reason}"
+        )
+        if self.speculative:
+            summary += f", drafts {self.accepted}/{self.drafted} accepted"
+        return summary
@@ -0,0 +1,271 @@
+import mmap
+import os
+import struct
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+
+GGUF_MAGIC = b"GGUF"
+SUPPORTED_VERSIONS = (2, 3)
+DEFAULT_ALIGNMENT = 32
+# Context chosen when [Inference] n_ctx is auto: the model's trained context,
+# capped so the KV cache stays small on a laptop.
+AUTO_CTX_CAP = 4096
+
+# Metadata value types: fixed-size ones map to their struct format.
+SCALAR_FORMATS = {
+    0: "<B",  # uint8
+    1: "<b",  # int8
+    2: "<H",  # uint16
+    3: "<h",  # int16
+    4: "<I",  # uint32
+    5: "<i",  # int32
+    6: "<f",  # float32
+    7: "<?",  # bool
+    10: "<Q",  # uint64
+    11: "<q",  # int64
+    12: "<d",  # float64
+}
+TYPE_STRING = 8
+TYPE_ARRAY = 9
+
+# ggml tensor type -> (elements per block, bytes per block).
+GGML_BLOCKS = {
+    0: (1, 4),  # F32
+    1: (1, 2),  # F16
+    2: (32, 18),  # Q4_0
+    3: (32, 20),  # Q4_1
+    6: (32, 22),  # Q5_0
+    7: (32, 24),  # Q5_1
+    8: (32, 34),  # Q8_0
+    9: (32, 36),  # Q8_1
+    10: (256, 84),  # Q2_K
+    11: (256, 110),  # Q3_K
+    12: (256, 144),  # Q4_K
+    13: (256, 176),  # Q5_K
+    14: (256, 210),  # Q6_K
+    15: (256, 292),  # Q8_K
+    16: (256, 66),  # IQ2_XXS
+    17: (256, 74),  # IQ2_XS
+    18: (256, 98),  # IQ3_XXS
+    19: (256, 50),  # IQ1_S
+    20: (32, 18),  # IQ4_NL
+    21: (256, 110),  # IQ3_S
+    22: (256, 82),  # IQ2_S
+    23: (256, 136),  # IQ4_XS
+    24: (1, 1),  # I8
+    25: (1, 2),  # I16
+    26: (1, 4),  # I32
+    27: (1, 8),  # I64
+    28: (1, 8),  # F64
+    29: (256, 56),  # IQ1_M
+    30: (1, 2),  # BF16
+    34: (256, 54),  # TQ1_0
+    35: (256, 66),  # TQ2_0
+}
+
+# general.file_type -> quantization name, as llama.cpp's llama_ftype.
+FILE_TYPES = {
+    0: "F32",
+    1: "F16",
+    2: "Q4_0",
+    3: "Q4_1",
+    7: "Q8_0",
+    8: "Q5_0",
+    9: "Q5_1",
+    10: "Q2_K",
+    11: "Q3_K_S",
+    12: "Q3_K_M",
+    13: "Q3_K_L",
+    14: "Q4_K_S",
+    15: "Q4_K_M",
+    16: "Q5_K_S",
+    17: "Q5_K_M",
+    18: "Q6_K",
+    19: "IQ2_XXS",
+    20: "IQ2_XS",
+    21: "Q2_K_S",
+    22: "IQ3_XS",
+    23: "IQ3_XXS",
+    24: "IQ1_S",
+    25: "IQ4_NL",
+    26: "IQ3_S",
+    27: "IQ3_M",
+    28: "IQ2_S",
+    29: "IQ2_M",
+    30: "IQ4_XS",
+    31: "IQ1_M",
+    32: "BF16",
+    36: "TQ1_0",
+    37: "TQ2_0",
+}
+
+
+class GGUFError(ValueError):
+    """The file is not a usable GGUF model."""
+
+
+@dataclass
+class GGUFInfo:
+    path: str
+    file_size: int
+    version: int
+    tensor_count: int
+    architecture: str
+    name: str = ""
+    context_length: Optional[int] = None
+    file_type: Optional[int] = None
+    # End of the last tensor's data, or None if a tensor type is unknown.
+    data_end: Optional[int] = None
+    # Scalar metadata; arrays (vocabularies, merges) are recorded by length.
+    metadata: dict = field(default_factory=dict)
+
+    @property
+    def quantization(self) -> str:
+        if self.file_type is None:
+            return "unknown"
+        return FILE_TYPES.get(self.file_type, f"type {self.file_type}")
+
+    def summary(self) -> str:
+        """One line for the configuration screen, e.g. "llama, Q4_K_M, ctx 32768, 291 tensors"."""
+        parts = [self.architecture, self.quantization]
+        if self.context_length:
+            parts.append(f"ctx {self.context_length}")
+        parts.append(f"{self.tensor_count} tensors")
+        label = ", ".join(parts)
+        return f"{self.name} ({label})" if self.name else label
+
+
+class _Reader:
+    def __init__(self, buf, size: int):
+        self.buf = buf
+        self.size = size
+        self.pos = 0
+
+    def unpack(self, fmt: str):
+        end = self.pos + struct.calcsize(fmt)
+        if end > self.size:
+            raise GGUFError("The file ends inside its header (incomplete download?).")
+        (value,) = struct.unpack_from(fmt, self.buf, self.pos)
+        self.pos = end
+        return value
+
+    def string(self) -> str:
+        length = self.unpack("<Q")
+        end = self.pos + length
+        if end > self.size:
+            raise GGUFError("The file ends inside its header (incomplete download?).")
+        value = self.buf[self.pos : end].decode("utf-8", errors="replace")
+        self.pos = end
+        return value
+
+    def value(self, kind: int):
+        if kind in SCALAR_FORMATS:
+            return self.unpack(SCALAR_FORMATS[kind])
+        if kind == TYPE_STRING:
+            return self.string()
+        if kind == TYPE_ARRAY:
+            item_kind = self.unpack("<I")
+            count = self.unpack("<Q")
+            if item_kind in SCALAR_FORMATS:
+                self.pos += count * struct.calcsize(SCALAR_FORMATS[item_kind])
+            else:
+                # Strings (and nested arrays) have to be walked.
+                for _ in range(count):
+                    self.value(item_kind)
+            return count
+        raise GGUFError(f"Unknown metadata value type {kind}.")
+
+
+def _tensor_bytes(dims: list[int], ggml_type: int) -> Optional[int]:
+    block = GGML_BLOCKS.get(ggml_type)
+    if block is None:
+        return None
+    elements = 1
+    for dim in dims:
+        elements *= dim
+    block_elements, block_bytes = block
+    return elements // block_elements * block_bytes
+
+
+def _parse(path: str) -> GGUFInfo:
+    file_size = os.path.getsize(path)
+    if file_size < 24:
+        raise GGUFError("The file is too small to be a GGUF model.")
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if mm[:4] != GGUF_MAGIC:
+            raise GGUFError("Not a GGUF model file (wrong magic bytes).")
+        reader = _Reader(mm, file_size)
+        reader.pos = 4
+        version = reader.unpack("<I")
+        if version not in SUPPORTED_VERSIONS:
+            raise GGUFError(f"Unsupported GGUF version {version}.")
+        tensor_count = reader.unpack("<Q")
+        kv_count = reader.unpack("<Q")
+
+        metadata = {}
+        for _ in range(kv_count):
+            key = reader.string()
+            metadata[key] = reader.value(reader.unpack("<I"))
+
+        data_end: Optional[int] = 0
+        for _ in range(tensor_count):
+            reader.string()  # tensor name
+            n_dims = reader.unpack("<I")
+            dims = [reader.unpack("<Q") for _ in range(n_dims)]
+            nbytes = _tensor_bytes(dims, reader.unpack("<I"))
+            offset = reader.unpack("<Q")
+            if data_end is not None:
+                data_end = None if nbytes is None else max(data_end, offset + nbytes)
+
+    alignment = metadata.get("general.alignment", DEFAULT_ALIGNMENT)
+    data_start = -(-reader.pos // alignment) * alignment
+    architecture = str(metadata.get("general.architecture", ""))
+    context_length = metadata.get(f"{architecture}.context_length")
+    info = GGUFInfo(
+        path=path,
+        file_size=file_size,
+        version=version,
+        tensor_count=tensor_count,
+        architecture=architecture or "unknown",
+        name=str(metadata.get("general.name", "")),
+        context_length=int(context_length) if context_length else None,
+        file_type=metadata.get("general.file_type"),
+        data_end=None if data_end is None else data_start + data_end,
+        metadata=metadata,
+    )
+    if info.data_end is not None and info.data_end > file_size:
+        raise GGUFError(
+            f"The file is truncated: {file_size:,} of {info.data_end:,} bytes "
+            "present (incomplete download?)."
+        )
+    return info
+
+
+@lru_cache(maxsize=8)
+def _read_cached(path: str, size: int, mtime_ns: int) -> GGUFInfo:
+    return _parse(path)
+
+
+def read_gguf(path: str) -> GGUFInfo:
+    """
+    Inspect a GGUF model without loading its weights.
+
+    The file is memory-mapped and only the header, the metadata and the
+    tensor table are parsed, which takes milliseconds for a multi-GB model.
+    The tensor table also gives the size the weights must span, so a
+    truncated download is caught here instead of when llama loads it.
+    Results are cached per file size and mtime. Raises GGUFError if the file
+    is not a usable GGUF model.
+    """
+    stat = os.stat(path)
+    return _read_cached(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def default_n_ctx(model_path: str, cap: int = AUTO_CTX_CAP) -> int:
+    """Context for [Inference] n_ctx = auto: the model's trained context, at most ``cap``."""
+    try:
+        trained = read_gguf(model_path).context_length
+    except (OSError, GGUFError):
+        trained = None
+    return min(trained, cap) if trained else cap
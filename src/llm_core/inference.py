@@ -1,26 +1,344 @@
-from llama_cpp import Llama
-from typing import Optional
+import threading
+import time
+from typing import Callable, Generator, Iterator, Optional, Union
+
+import llama_cpp
+from llama_cpp import Llama, LlamaState
+
+from llm_core.batch import BatchDecoder
+from llm_core.generation import GenerationStats, StopCondition
+from llm_core.gguf import default_n_ctx
+from llm_core.memory import current_rss
+from llm_core.speculative import CONTROL_EVERY, SpeculativeConfig, SpeculativeDraft
+from llm_core.tokens import Tokenizer, get_tokenizer
+from telemetry.recorder import record, stage
+
+Stop = Union[StopCondition, list[str], None]
+
+
+class TokenStream:
+    """
+    Iterator over the text pieces of one generation.
+
+    Pieces are yielded as tokens are decoded. Text that a stop string or stop
+    pattern could still cut is held back, so ``text`` (the final, stripped
+    output) is available once iteration ends, with timings in ``stats``.
+    """
+
+    def __init__(self, pieces: Generator[str, None, str], stats: GenerationStats):
+        self._pieces = pieces
+        self.stats = stats
+        self.text = ""
+
+    def __iter__(self) -> Iterator[str]:
+        self.text = yield from self._pieces
 
 
 class LLMRunner:
-    def __init__(self, model_path: str, n_ctx: int = 2048, n_threads: int = 6):
+    def __init__(
+        self,
+        model_path: str,
+        n_ctx: int = 0,
+        n_threads: int = 6,
+        batch_size: int = 4,
+        n_batch: int = 512,
+        use_mmap: bool = True,
+        use_mlock: bool = False,
+        speculative: Optional[SpeculativeConfig] = None,
+    ):
         self.model_path = model_path
-        self.n_ctx = n_ctx
+        # 0 (n_ctx = auto) sizes the context from the model's GGUF header.
+        self.n_ctx = n_ctx or default_n_ctx(model_path)
         self.n_threads = n_threads
+        self.batch_size = batch_size
+        self.n_batch = n_batch
+        self.use_mmap = use_mmap
+        self.use_mlock = use_mlock
+        self.speculative = speculative
         self._llm: Optional[Llama] = None
+        self._draft: Optional[SpeculativeDraft] = None
+        self._generations = 0
+        self._decoder: Optional[BatchDecoder] = None
+        self._lock = threading.RLock()
+        self._prefix_states: dict[str, LlamaState] = {}
+        self.load_seconds: Optional[float] = None
+        self.resident_bytes: int = 0
+        self.last_used = time.monotonic()
+        self.last_stats: list[GenerationStats] = []
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._llm is not None
+
+    @property
+    def tokenizer(self) -> Tokenizer:
+        """The model's tokenizer, usable without loading the weights."""
+        return get_tokenizer(self.model_path)
 
     def _load_model(self):
         if self._llm is None:
-            self._llm = Llama(
-                model_path=self.model_path, n_ctx=self.n_ctx, n_threads=self.n_threads
-            )
+            rss_before = current_rss()
+            start = time.perf_counter()
+            with stage("llm.load"):
+                if self.speculative is not None:
+                    self._draft = SpeculativeDraft(
+                        self.speculative, n_ctx=self.n_ctx, n_threads=self.n_threads
+                    )
+                self._llm = Llama(
+                    model_path=self.model_path,
+                    n_ctx=self.n_ctx,
+                    n_threads=self.n_threads,
+                    n_batch=self.n_batch,
+                    use_mmap=self.use_mmap,
+                    use_mlock=self.use_mlock,
+                    draft_model=self._draft,
+                    # Drafts are verified against every position's logits; Llama
+                    # forces this for a draft model but sizes its buffers from
+                    # the argument.
+                    logits_all=self._draft is not None,
+                    verbose=False,
+                )
+                if self._draft is not None:
+                    self._draft.check_vocab(self._llm.n_vocab())
+            self.load_seconds = time.perf_counter() - start
+            self.resident_bytes = max(current_rss() - rss_before, 0)
+
+    def load(self):
+        """Load the model now instead of on the first generation."""
+        with self._lock:
+            self._load_model()
+            self.last_used = time.monotonic()
+
+    def begin_run(self):
+        """
+        Count generations from zero again, at the start of a sending run.
+
+        With speculative decoding, the 2nd generation of every run is then a
+        control without drafts, however few prompts the run has and however
+        many runs the (warm) runner has served before.
+        """
+        with self._lock:
+            self._generations = 0
+
+    def tokenize(self, text: str) -> list[int]:
+        with self._lock:
+            self._load_model()
+            return self._llm.tokenize(text.encode("utf-8"), special=True)
+
+    def unload(self) -> bool:
+        """Drop the loaded weights. The model is reloaded lazily on the next run."""
+        with self._lock:
+            if self._llm is None:
+                return False
+            if self._decoder is not None:
+                self._decoder.close()
+                self._decoder = None
+            self._llm.close()
+            self._llm = None
+            if self._draft is not None:
+                self._draft.close()
+                self._draft = None
+            self._prefix_states.clear()
+            self.resident_bytes = 0
+            return True
+
+    def _restore_prefix(self, prefix: str):
+        """
+        Put the context into the state reached after evaluating ``prefix``.
+
+        The prefix is evaluated once and snapshotted; later calls restore the
+        snapshot so only the per-entry suffix goes through prompt evaluation.
+        """
+        state = self._prefix_states.get(prefix)
+        if state is not None:
+            self._llm.load_state(state)
+            return
+        tokens = self._llm.tokenize(prefix.encode("utf-8"))
+        self._llm.reset()
+        self._llm.eval(tokens)
+        self._prefix_states[prefix] = self._llm.save_state()
 
     def run(
-        self, prompt: str, max_tokens: int = 150, stop: Optional[list[str]] = None
+        self,
+        prompt: str,
+        max_tokens: int = 150,
+        stop: Stop = None,
+        prefix: Optional[str] = None,
     ) -> str:
+        stream = self.stream(prompt, max_tokens=max_tokens, stop=stop, prefix=prefix)
+        for _ in stream:
+            pass
+        return stream.text
+
+    def stream(
+        self,
+        prompt: str,
+        max_tokens: int = 150,
+        stop: Stop = None,
+        prefix: Optional[str] = None,
+    ) -> TokenStream:
+        """
+        Generate a completion for ``prompt``, yielding text as it is decoded.
+
+        Decoding ends at the first match of ``stop`` (a list of stop strings or
+        a StopCondition), an end-of-generation token or ``max_tokens``. The
+        runner stays locked until the stream is exhausted or closed.
+        """
         if not prompt.strip():
             raise ValueError("Prompt is empty.")
-        self._load_model()
-        stop = stop or ["</s>"]
-        output = self._llm(prompt, max_tokens=max_tokens, stop=stop)
-        return output["choices"][0]["text"].strip()
+        if prefix and not prompt.startswith(prefix):
+            raise ValueError("Prompt does not start with the given prefix.")
+        stats = GenerationStats()
+        stop = StopCondition.coerce(stop or ["</s>"])
+        pieces = self._stream_pieces(stats, prompt, max_tokens, stop, prefix)
+        return TokenStream(pieces, stats)
+
+    def _stream_pieces(
+        self,
+        stats: GenerationStats,
+        prompt: str,
+        max_tokens: int,
+        stop: StopCondition,
+        prefix: Optional[str],
+    ) -> Generator[str, None, str]:
+        with self._lock:
+            self._load_model()
+            stats.started = time.perf_counter()
+            if prefix:
+                # Llama only re-evaluates the tokens after the longest common
+                # prefix with its current state, i.e. just the suffix.
+                self._restore_prefix(prefix)
+            tokens = self._llm.tokenize(prompt.encode("utf-8"), special=True)
+            vocab = llama_cpp.llama_model_get_vocab(self._llm._model.model)
+            # Paragraph breaks and sign-offs start on a new line, so a line is
+            # only released once the next one has begun.
+            hold_lines = stop.paragraph or bool(stop.patterns)
+            text = b""
+            emitted = 0
+            decoded = ""
+            cut = None
+            draft = self._draft
+            if draft is not None:
+                self._generations += 1
+                # The 2nd generation of a run (see begin_run), then every
+                # CONTROL_EVERY-th, runs without drafts as the speedup baseline.
+                stats.speculative = self._generations % CONTROL_EVERY != 2
+                draft.begin(enabled=stats.speculative)
+            try:
+                for token in self._llm.generate(tokens, reset=True):
+                    if draft is not None:
+                        draft.observe(token)
+                    if llama_cpp.llama_vocab_is_eog(vocab, token):
+                        stats.finish("eos")
+                        break
+                    stats.add_token()
+                    text += self._llm._model.detokenize([token])
+                    decoded = text.decode("utf-8", errors="ignore")
+                    match = stop.find(decoded)
+                    if match is not None:
+                        cut = match[0]
+                        stats.finish(match[1])
+                        break
+                    if stats.tokens >= max_tokens:
+                        stats.finish("length")
+                        break
+                    if self._llm.n_tokens + 1 >= self._llm.n_ctx():
+                        stats.finish("context")
+                        break
+                    safe = len(decoded) - stop.holdback()
+                    if hold_lines:
+                        safe = min(safe, decoded.rfind("\n") + 1 or safe)
+                    if safe > emitted:
+                        yield decoded[emitted:safe]
+                        emitted = safe
+                else:
+                    stats.finish("eos")
+                final = decoded[:cut] if cut is not None else decoded
+                if len(final) > emitted:
+                    yield final[emitted:]
+                return final.strip()
+            finally:
+                if draft is not None:
+                    stats.drafted = draft.drafted
+                    stats.accepted = draft.accepted
+                self.last_stats = [stats]
+                self.last_used = time.monotonic()
+                _record_stats(stats, len(tokens))
+
+    def run_batch(
+        self,
+        prompts: list[str],
+        max_tokens: int = 150,
+        stop: Stop = None,
+        batch_size: Optional[int] = None,
+        progress: Optional[Callable[[int], None]] = None,
+        n_ctx: Optional[int] = None,
+    ) -> list[str]:
+        """
+        Generate completions for several prompts, decoding up to ``batch_size`` of them
+        in parallel as separate sequences of one context. Results keep input order,
+        with per-prompt timings in ``last_stats``.
+
+        Each sequence gets ``n_ctx`` KV cells (at most the runner's own
+        ``n_ctx``), so short prompts do not reserve memory for long ones.
+        """
+        if any(not prompt.strip() for prompt in prompts):
+            raise ValueError("Prompt is empty.")
+        if not prompts:
+            return []
+        width = min(batch_size or self.batch_size, len(prompts))
+        stop = StopCondition.coerce(stop or ["</s>"])
+        results = []
+        stats = []
+        with self._lock:
+            self._load_model()
+            n_ctx = min(n_ctx or self.n_ctx, self.n_ctx)
+            decoder = self._batch_decoder(width, n_ctx)
+            for start in range(0, len(prompts), width):
+                tokens = [
+                    self._llm.tokenize(prompt.encode("utf-8"))
+                    for prompt in prompts[start : start + width]
+                ]
+                done = sum(s.tokens for s in stats)
+                results.extend(
+                    decoder.generate(
+                        tokens,
+                        max_tokens=max_tokens,
+                        stop=stop,
+                        progress=progress and (lambda n, done=done: progress(done + n)),
+                    )
+                )
+                stats.extend(decoder.last_stats)
+            self.last_stats = stats
+            self.last_used = time.monotonic()
+        return results
+
+    def _batch_decoder(self, width: int, n_ctx: int) -> BatchDecoder:
+        decoder = self._decoder
+        # Reuse a context that is big enough but not more than twice too big.
+        if (
+            decoder is None
+            or decoder.width != width
+            or not n_ctx <= decoder.n_ctx_per_seq <= 2 * n_ctx
+        ):
+            if decoder is not None:
+                decoder.close()
+            self._decoder = BatchDecoder(
+                self._llm,
+                width=width,
+                n_ctx_per_seq=n_ctx,
+                n_threads=self.n_threads,
+            )
+        return self._decoder
+
+
+def _record_stats(stats: GenerationStats, prompt_tokens: int):
+    """Split one streamed generation into prompt evaluation and decode telemetry."""
+    if stats.first_token_at is None:
+        return
+    record("llm.prompt_eval", stats.ttft, tokens=prompt_tokens)
+    end = stats.finished_at or time.perf_counter()
+    counts = {"tokens": stats.tokens}
+    if stats.speculative:
+        counts.update(drafted=stats.drafted, accepted=stats.accepted)
+    record("llm.decode", end - stats.first_token_at, **counts)
@@ -0,0 +1,202 @@
+import threading
+import time
+from typing import Optional
+
+from llm_core.inference import LLMRunner
+from llm_core.memory import format_bytes
+from llm_core.sharding import ShardedGenerator, plan_core_sets
+from llm_core.speculative import SpeculativeConfig
+
+DEFAULT_IDLE_TIMEOUT = 15 * 60  # seconds a model may stay resident without use
+
+
+class ModelManager:
+    """
+    Keeps LLMRunner instances warm for the lifetime of the process.
+
+    Runners are keyed by their model path and load parameters, so every caller
+    asking for the same configuration shares one loaded model. A background reaper unloads
+    models that have been idle for longer than ``idle_timeout`` seconds; the
+    runner object itself is kept and reloads lazily on its next use. Worker
+    process pools (see ``get_pool``) are kept and reaped the same way.
+    """
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._runners: dict[tuple, LLMRunner] = {}
+        self._pools: dict[tuple, ShardedGenerator] = {}
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def get(
+        self,
+        model_path: str,
+        n_ctx: int = 0,
+        n_threads: int = 6,
+        n_batch: int = 512,
+        use_mmap: bool = True,
+        use_mlock: bool = False,
+        speculative: Optional[SpeculativeConfig] = None,
+    ) -> LLMRunner:
+        key = (model_path, n_ctx, n_threads, n_batch, use_mmap, use_mlock, speculative)
+        with self._lock:
+            runner = self._runners.get(key)
+            if runner is None:
+                runner = LLMRunner(
+                    model_path=model_path,
+                    n_ctx=n_ctx,
+                    n_threads=n_threads,
+                    n_batch=n_batch,
+                    use_mmap=use_mmap,
+                    use_mlock=use_mlock,
+                    speculative=speculative,
+                )
+                self._runners[key] = runner
+            runner.last_used = time.monotonic()
+            self._ensure_reaper()
+        return runner
+
+    def get_pool(
+        self,
+        model_path: str,
+        workers: int,
+        threads_per_worker: int,
+        n_ctx: int = 0,
+        batch_size: int = 4,
+        n_batch: int = 512,
+    ) -> ShardedGenerator:
+        """
+        Return the worker process pool for this configuration, planning its core sets.
+
+        ``workers`` of 0 starts as many workers as there are core sets of
+        ``threads_per_worker`` physical cores. Workers start on first use.
+        """
+        key = (model_path, workers, threads_per_worker, n_ctx, batch_size, n_batch)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = ShardedGenerator(
+                    model_path,
+                    plan_core_sets(workers, threads_per_worker),
+                    n_ctx=n_ctx,
+                    batch_size=batch_size,
+                    n_batch=n_batch,
+                )
+                self._pools[key] = pool
+            pool.last_used = time.monotonic()
+            self._ensure_reaper()
+        return pool
+
+    def unload_idle(self) -> list[tuple]:
+        """Unload every model idle for longer than the timeout. Returns the unloaded keys."""
+        now = time.monotonic()
+        unloaded = []
+        with self._lock:
+            runners = list(self._runners.items()) + list(self._pools.items())
+        for key, runner in runners:
+            if not runner.is_loaded or now - runner.last_used < self.idle_timeout:
+                continue
+            # Never block on a runner that is generating right now.
+            if not runner._lock.acquire(blocking=False):
+                continue
+            try:
+                if runner.unload():
+                    unloaded.append(key)
+            finally:
+                runner._lock.release()
+        return unloaded
+
+    def unload_all(self):
+        with self._lock:
+            runners = list(self._runners.values()) + list(self._pools.values())
+        for runner in runners:
+            runner.unload()
+
+    def evict(self, model_path: str) -> int:
+        """
+        Unload and forget every runner and pool of ``model_path``.
+
+        Used when its settings change: the next ``get`` builds a runner with
+        the new settings instead of keeping one under the old key. Returns
+        how many were dropped.
+        """
+        with self._lock:
+            keys = [key for key in self._runners if key[0] == model_path]
+            runners = [self._runners.pop(key) for key in keys]
+            keys = [key for key in self._pools if key[0] == model_path]
+            runners += [self._pools.pop(key) for key in keys]
+        for runner in runners:
+            runner.unload()
+        return len(runners)
+
+    def stats(self) -> list[dict]:
+        """Describe each known runner: load time, resident size and idle time."""
+        now = time.monotonic()
+        with self._lock:
+            items = list(self._runners.items())
+        return [
+            {
+                "model_path": key[0],
+                "n_ctx": runner.n_ctx,
+                "n_threads": key[2],
+                "loaded": runner.is_loaded,
+                "load_seconds": runner.load_seconds,
+                "resident_bytes": runner.resident_bytes,
+                "idle_seconds": now - runner.last_used,
+            }
+            for key, runner in items
+        ]
+
+    def report(self) -> str:
+        lines = []
+        for s in self.stats():
+            state = "resident" if s["loaded"] else "unloaded"
+            load = f"{s['load_seconds']:.1f}s" if s["load_seconds"] is not None else "-"
+            lines.append(
+                f"{s['model_path']} (n_ctx={s['n_ctx']}, threads={s['n_threads']}): "
+                f"{state}, load {load}, RSS +{format_bytes(s['resident_bytes'])}, "
+                f"idle {s['idle_seconds']:.0f}s"
+            )
+        with self._lock:
+            pools = list(self._pools.values())
+        for pool in pools:
+            state = "running" if pool.is_loaded else "stopped"
+            load = f"{pool.load_seconds:.1f}s" if pool.load_seconds is not None else "-"
+            cores = ",".join(str(len(c)) for c in pool.core_sets)
+            shares = "/".join(str(n) for n in pool.prompts_per_worker)
+            lines.append(
+                f"{pool.model_path} ({pool.workers} workers, threads {cores}): "
+                f"{state}, load {load}, prompts per worker {shares}"
+            )
+        return "\n".join(lines) or "No models loaded."
+
+    def shutdown(self):
+        self._stop.set()
+        self.unload_all()
+
+    def _ensure_reaper(self):
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        self._reaper = threading.Thread(
+            target=self._reap_loop, name="llm-idle-reaper", daemon=True
+        )
+        self._reaper.start()
+
+    def _reap_loop(self):
+        interval = max(min(self.idle_timeout / 4, 60), 1)
+        while not self._stop.wait(interval):
+            self.unload_idle()
+
+
+_manager: Optional[ModelManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_model_manager() -> ModelManager:
+    """Return the process-wide ModelManager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ModelManager()
+        return _manager
@@ -0,0 +1,274 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+from llm_core.generation import GenerationStats, StopCondition
+from llm_core.gguf import default_n_ctx
+from telemetry.recorder import record, stage
+
+READY_TIMEOUT = 600.0  # seconds a worker may take to load the model
+POLL_SECONDS = 1.0  # how often the parent checks that workers are still alive
+
+
+def cpu_topology() -> list[tuple[int, int, int]]:
+    """
+    List the CPUs this process may run on as ``(cpu, socket, core)`` tuples.
+
+    Socket and core ids come from sysfs on Linux. Elsewhere every CPU is
+    reported as its own core on socket 0.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+    else:
+        cpus = list(range(os.cpu_count() or 1))
+    topology = []
+    for cpu in cpus:
+        base = f"/sys/devices/system/cpu/cpu{cpu}/topology"
+        try:
+            with open(f"{base}/physical_package_id") as f:
+                socket_id = int(f.read())
+            with open(f"{base}/core_id") as f:
+                core_id = int(f.read())
+        except (OSError, ValueError):
+            socket_id, core_id = 0, cpu
+        topology.append((cpu, socket_id, core_id))
+    return topology
+
+
+def plan_core_sets(workers: int, threads_per_worker: int) -> list[list[int]]:
+    """
+    Split the available physical cores into ``workers`` sets of ``threads_per_worker`` CPUs.
+
+    SMT siblings are skipped (llama.cpp decode gains nothing from them) and
+    cores are taken socket by socket, so a set only spans two sockets when a
+    socket's cores do not divide evenly. ``workers`` of 0 means as many as fit.
+    """
+    physical = {}
+    for cpu, socket_id, core_id in cpu_topology():
+        physical.setdefault((socket_id, core_id), cpu)
+    cores = [physical[key] for key in sorted(physical)]
+    threads_per_worker = max(1, min(threads_per_worker, len(cores)))
+    fit = max(1, len(cores) // threads_per_worker)
+    workers = min(workers, fit) if workers > 0 else fit
+    return [
+        cores[i * threads_per_worker : (i + 1) * threads_per_worker]
+        for i in range(workers)
+    ]
+
+
+def _pin(cores: list[int]):
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+        return
+    try:
+        import psutil
+    except ImportError:
+        return  # Unpinned; the OS scheduler still spreads the workers.
+    psutil.Process().cpu_affinity(cores)
+
+
+def _worker_main(worker_id, model_path, params, cores, tasks, results):
+    """Entry point of a worker process: load the model once, then serve tasks."""
+    from llm_core.inference import LLMRunner
+
+    try:
+        _pin(cores)
+        llm = LLMRunner(model_path, n_threads=len(cores), **params)
+        llm.load()
+    except Exception as e:
+        results.put(("ready", worker_id, f"{type(e).__name__}: {e}"))
+        return
+    results.put(("ready", worker_id, None))
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        job_id, start, prompts, max_tokens, stop, n_ctx = task
+        try:
+            if len(prompts) == 1:
+                texts = [llm.run(prompts[0], max_tokens=max_tokens, stop=stop)]
+            else:
+                texts = llm.run_batch(
+                    prompts, max_tokens=max_tokens, stop=stop, n_ctx=n_ctx
+                )
+            results.put(("done", job_id, start, texts, llm.last_stats, worker_id))
+        except Exception as e:
+            results.put(("error", job_id, start, f"{type(e).__name__}: {e}", worker_id))
+    llm.unload()
+
+
+class ShardedGenerator:
+    """
+    Pool of worker processes, each with its own llama context pinned to a core set.
+
+    Every worker memory-maps the same GGUF file, so the weights are read once
+    into the page cache and shared; only the KV cache and scratch buffers are
+    per worker. A job is cut into tasks of ``batch_size`` prompts on one
+    shared queue: a worker takes the next task as soon as it finishes its
+    last, so fast workers pick up the work slow ones have not started. Results
+    are merged back into input order.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        core_sets: list[list[int]],
+        n_ctx: int = 0,
+        batch_size: int = 4,
+        n_batch: int = 512,
+    ):
+        if not core_sets:
+            raise ValueError("A sharded generator needs at least one worker.")
+        self.model_path = model_path
+        self.core_sets = core_sets
+        self.n_ctx = n_ctx or default_n_ctx(model_path)
+        self.batch_size = batch_size
+        self.n_batch = n_batch
+        self.last_stats: list[GenerationStats] = []
+        self.last_used = time.monotonic()
+        self.load_seconds: Optional[float] = None
+        self.prompts_per_worker = [0] * len(core_sets)
+        self._context = multiprocessing.get_context("spawn")
+        self._processes: list = []
+        self._tasks = None
+        self._results = None
+        self._job = 0
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        return len(self.core_sets)
+
+    @property
+    def is_loaded(self) -> bool:
+        return bool(self._processes)
+
+    def start(self):
+        """Start the workers and wait until every one has loaded the model."""
+        if self._processes:
+            return
+        self._tasks = self._context.Queue()
+        self._results = self._context.Queue()
+        start = time.perf_counter()
+        with stage("llm.load", items=self.workers):
+            for worker_id, cores in enumerate(self.core_sets):
+                process = self._context.Process(
+                    target=_worker_main,
+                    args=(
+                        worker_id,
+                        self.model_path,
+                        {
+                            "n_ctx": self.n_ctx,
+                            "batch_size": self.batch_size,
+                            "n_batch": self.n_batch,
+                        },
+                        cores,
+                        self._tasks,
+                        self._results,
+                    ),
+                    name=f"llm-worker-{worker_id}",
+                    daemon=True,
+                )
+                process.start()
+                self._processes.append(process)
+            errors = []
+            for _ in self._processes:
+                message = self._get(timeout=READY_TIMEOUT)
+                if message[2] is not None:
+                    errors.append(f"worker {message[1]}: {message[2]}")
+        self.load_seconds = time.perf_counter() - start
+        if errors:
+            self.shutdown()
+            raise RuntimeError("LLM workers failed to start: " + "; ".join(errors))
+
+    def _get(self, timeout: float):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self._results.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                dead = [p.name for p in self._processes if not p.is_alive()]
+                if dead:
+                    self.shutdown()
+                    raise RuntimeError(f"LLM worker exited unexpectedly: {dead[0]}")
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Timed out waiting for the LLM workers.")
+
+    def generate(
+        self,
+        prompts: list[str],
+        max_tokens: int,
+        stop: StopCondition,
+        progress: Optional[Callable[[int], None]] = None,
+        n_ctx: Optional[int] = None,
+    ) -> list[str]:
+        """
+        Generate one completion per prompt across all workers, in input order.
+
+        Per-prompt timings are left in ``last_stats``. ``progress`` receives the
+        running token total as tasks complete. ``n_ctx`` is the per-sequence
+        context, as in ``LLMRunner.run_batch``.
+        """
+        if not prompts:
+            return []
+        with self._lock:
+            self.start()
+            self._job += 1
+            job_id = self._job
+            starts = range(0, len(prompts), self.batch_size)
+            for start in starts:
+                chunk = prompts[start : start + self.batch_size]
+                self._tasks.put((job_id, start, chunk, max_tokens, stop, n_ctx))
+
+            texts: list[Optional[str]] = [None] * len(prompts)
+            stats: list[Optional[GenerationStats]] = [None] * len(prompts)
+            errors = []
+            tokens = 0
+            pending = len(starts)
+            while pending:
+                message = self._get(timeout=float("inf"))
+                kind, message_job, start = message[:3]
+                if message_job != job_id:
+                    # A late result of an earlier job that was abandoned part-way.
+                    continue
+                pending -= 1
+                if kind == "error":
+                    errors.append(message[3])
+                    continue
+                chunk_texts, chunk_stats, worker_id = message[3:]
+                texts[start : start + len(chunk_texts)] = chunk_texts
+                stats[start : start + len(chunk_stats)] = chunk_stats
+                for s in chunk_stats:
+                    tokens += s.tokens
+                    if s.finished_at is not None:
+                        # Worker clocks are not ours; only the durations carry over.
+                        record("llm.decode", s.finished_at - s.started, tokens=s.tokens)
+                self.prompts_per_worker[worker_id] += len(chunk_texts)
+                if progress is not None:
+                    progress(tokens)
+            self.last_stats = stats
+            self.last_used = time.monotonic()
+        if errors:
+            raise RuntimeError(f"Generation failed in a worker: {errors[0]}")
+        return texts
+
+    def shutdown(self) -> bool:
+        """Stop every worker; the pool restarts on its next use."""
+        if not self._processes:
+            return False
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        self._tasks = self._results = None
+        return True
+
+    # ModelManager unloads idle pools like idle runners.
+    unload = shutdown
@@ -0,0 +1,147 @@
+import statistics
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from llama_cpp import Llama
+from llama_cpp.llama_speculative import LlamaDraftModel, LlamaPromptLookupDecoding
+
+MODES = ("off", "prompt", "draft")
+MIN_PROPOSALS = 32  # drafted tokens seen before the acceptance threshold applies
+# One generation in this many decodes without drafts, as the speedup baseline.
+CONTROL_EVERY = 8
+
+
+@dataclass(frozen=True)
+class SpeculativeConfig:
+    """
+    Settings for speculative decoding.
+
+    ``mode`` "prompt" drafts by n-gram lookup against the prompt and the text
+    so far; "draft" additionally asks the small ``draft_model_path`` GGUF
+    whenever the lookup finds nothing. Drafting stops for the rest of a
+    generation once fewer than ``min_acceptance`` of its drafted tokens were
+    accepted.
+    """
+
+    mode: str = "prompt"
+    draft_model_path: str = ""
+    draft_tokens: int = 8
+    ngram: int = 3
+    min_acceptance: float = 0.3
+
+    def __post_init__(self):
+        if self.mode not in MODES or self.mode == "off":
+            raise ValueError(f"Unknown speculative mode '{self.mode}'.")
+        if self.mode == "draft" and not self.draft_model_path:
+            raise ValueError("Speculative mode 'draft' needs a draft_model_path.")
+
+
+class SpeculativeDraft(LlamaDraftModel):
+    """
+    Draft model handed to ``Llama``, which verifies its proposals in one forward pass.
+
+    Llama evaluates the last token plus every drafted token in a single
+    batch, then samples each position in turn and keeps drafts for as long as
+    they match what it sampled, so the output distribution is unchanged.
+    ``observe`` is called with every token the runner receives to count how
+    many drafts were accepted.
+    """
+
+    def __init__(self, config: SpeculativeConfig, n_ctx: int, n_threads: int):
+        self.config = config
+        self._lookup = LlamaPromptLookupDecoding(
+            max_ngram_size=config.ngram, num_pred_tokens=config.draft_tokens
+        )
+        self._draft_llm: Optional[Llama] = None
+        if config.mode == "draft":
+            self._draft_llm = Llama(
+                model_path=config.draft_model_path,
+                n_ctx=n_ctx,
+                n_threads=n_threads,
+                verbose=False,
+            )
+        self._pending: deque[int] = deque()
+        self.enabled = True
+        self.drafted = 0
+        self.accepted = 0
+
+    def check_vocab(self, n_vocab: int):
+        if self._draft_llm is not None and self._draft_llm.n_vocab() != n_vocab:
+            raise ValueError(
+                "The draft model's vocabulary does not match the main model's "
+                f"({self._draft_llm.n_vocab()} vs {n_vocab} tokens)."
+            )
+
+    def begin(self, enabled: bool = True):
+        """Reset the counters for a new generation."""
+        self._pending.clear()
+        self.enabled = enabled
+        self.drafted = 0
+        self.accepted = 0
+
+    def observe(self, token: int):
+        if self._pending and self._pending[0] == token:
+            self._pending.popleft()
+            self.accepted += 1
+        else:
+            self._pending.clear()
+
+    def __call__(self, input_ids: np.ndarray, /, **kwargs) -> np.ndarray:
+        if self.enabled and self.drafted >= MIN_PROPOSALS:
+            self.enabled = self.accepted >= self.config.min_acceptance * self.drafted
+        if not self.enabled:
+            return np.array([], dtype=np.intc)
+        draft = self._lookup(input_ids)
+        if not len(draft) and self._draft_llm is not None:
+            draft = self._draft_from_model(input_ids)
+        self._pending = deque(int(token) for token in draft)
+        self.drafted += len(draft)
+        return draft
+
+    def _draft_from_model(self, input_ids: np.ndarray) -> np.ndarray:
+        # Greedy continuation; Llama.generate only evaluates what is new since
+        # the previous call.
+        draft = []
+        for token in self._draft_llm.generate(list(input_ids), reset=True, temp=0.0):
+            draft.append(token)
+            if len(draft) >= self.config.draft_tokens:
+                break
+        return np.array(draft, dtype=np.intc)
+
+    def close(self):
+        if self._draft_llm is not None:
+            self._draft_llm.close()
+            self._draft_llm = None
+
+
+def speculation_report(stats: list) -> Optional[str]:
+    """
+    Summarize drafting over a run's GenerationStats, or None if nothing was drafted.
+
+    The speedup compares the decode rate of drafting generations with the
+    control generations that ran without drafts.
+    """
+    drafted = [s for s in stats if s.speculative]
+    if not drafted:
+        return None
+    proposed = sum(s.drafted for s in drafted)
+    accepted = sum(s.accepted for s in drafted)
+    ratio = f"{accepted / proposed:.0%}" if proposed else "-"
+    line = (
+        f"Speculative decoding: {accepted}/{proposed} drafted tokens accepted ({ratio})"
+    )
+    rates = [s.tokens_per_second for s in drafted if s.tokens_per_second]
+    control = [
+        s.tokens_per_second
+        for s in stats
+        if not s.speculative and s.tokens_per_second and s.finished_at is not None
+    ]
+    if rates and control:
+        speedup = statistics.mean(rates) / statistics.mean(control)
+        line += (
+            f", decode {statistics.mean(rates):.1f} vs {statistics.mean(control):.1f} "
+            f"tok/s without drafts ({speedup:.2f}x)"
+        )
+    return line
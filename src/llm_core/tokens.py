@@ -0,0 +1,77 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from llama_cpp import Llama
+
+TOKEN_CACHE_SIZE = 4096  # texts whose token ids are kept
+
+
+class Tokenizer:
+    """
+    A model's own tokenizer, loaded without its weights, with an LRU cache of results.
+
+    Loading with ``vocab_only`` takes milliseconds even for a multi-GB GGUF, so
+    prompts can be measured before deciding how to load the model for real.
+    Survey answers repeat a lot ("Yes", "-", the interest lists), so most
+    lookups are cache hits.
+    """
+
+    def __init__(self, model_path: str, cache_size: int = TOKEN_CACHE_SIZE):
+        self.model_path = model_path
+        self.cache_size = cache_size
+        self._llm = Llama(
+            model_path=model_path, vocab_only=True, n_ctx=16, n_batch=16, verbose=False
+        )
+        self._cache: OrderedDict[str, tuple[int, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def tokenize(self, text: str) -> tuple[int, ...]:
+        with self._lock:
+            tokens = self._cache.get(text)
+            if tokens is not None:
+                self._cache.move_to_end(text)
+                self.hits += 1
+                return tokens
+            self.misses += 1
+            tokens = tuple(
+                self._llm.tokenize(text.encode("utf-8"), add_bos=False, special=True)
+            )
+            self._cache[text] = tokens
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return tokens
+
+    def count(self, text: str) -> int:
+        """Number of tokens ``text`` adds to a prompt (without the BOS token)."""
+        return len(self.tokenize(text))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Return the longest prefix of ``text`` that is at most ``max_tokens`` tokens."""
+        tokens = self.tokenize(text)
+        if len(tokens) <= max_tokens:
+            return text
+        if max_tokens <= 0:
+            return ""
+        with self._lock:
+            prefix = self._llm.detokenize(list(tokens[:max_tokens]))
+        # A multi-byte character may have been split at the cut.
+        prefix = prefix.decode("utf-8", errors="ignore")
+        if prefix.startswith(" ") and not text.startswith(" "):
+            prefix = prefix[1:]  # SentencePiece's word-start marker
+        return prefix
+
+
+_tokenizers: dict[str, Tokenizer] = {}
+_tokenizers_lock = threading.Lock()
+
+
+def get_tokenizer(model_path: str) -> Tokenizer:
+    """Return the shared tokenizer for ``model_path``."""
+    with _tokenizers_lock:
+        tokenizer: Optional[Tokenizer] = _tokenizers.get(model_path)
+        if tokenizer is None:
+            tokenizer = _tokenizers[model_path] = Tokenizer(model_path)
+        return tokenizer
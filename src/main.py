@@ -1,9 +1,39 @@
+import argparse
+import multiprocessing
 import sys
 import os
-from menu.handler import main_menu
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="BenchHub LLM Integration")
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="run headless: watch the survey file and email new responses",
+    )
+    parser.add_argument(
+        "--autotune",
+        action="store_true",
+        help="calibrate llama settings for this machine and save them to config.ini",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    # LLM worker processes re-run this executable in a frozen (PyInstaller) build.
+    multiprocessing.freeze_support()
+    args = parse_args()
+    if args.watch:
+        from daemon.survey_watcher import watch_survey
+
+        sys.exit(watch_survey())
+    if args.autotune:
+        from menu.options.configuration.autotune import run_autotune
+
+        sys.exit(run_autotune())
+
+    from menu.handler import main_menu
+
     main_menu()
@@ -1,20 +1,41 @@
-from menu.utils.menu_builder import menu_builder
-from menu.options.send_emails.email_sender import send_all_emails
-from menu.options.configuration.configure import configure_options
-from menu.options.preview.preview import preview_file
+from menu.utils.menu_builder import menu_builder, run_menu
 from menu.options.exit.exit import exit_app
 
+# Menu actions import their modules on first use: the email sender pulls in
+# pandas, llama_cpp and win32com, and the configuration screens tkinter, none
+# of which are needed to draw the menu.
+
+
+def send_all_emails():
+    from menu.options.send_emails.email_sender import send_all_emails
+
+    return send_all_emails()
+
+
+def configure_options():
+    from menu.options.configuration.configure import configure_options
+
+    return configure_options()
+
+
+def preview_file():
+    from menu.options.preview.preview import preview_file
+
+    return preview_file()
+
+
+def export_log():
+    from menu.options.export_log.export_log import export_log
+
+    return export_log()
+
 
 def main_menu():
-    while True:
-        menu_items = [
-            {"label": "Run Email Sender", "callback": send_all_emails},
-            {"label": "Configure Options", "callback": configure_options},
-            {"label": "Preview File", "callback": preview_file},
-            {"label": "Exit", "callback": exit_app},
-        ]
-        menu_builder("BenchHub LLM Integration Menu:", menu_items)
-
-
-if __name__ == "__main__":
-    main_menu()
+    menu_items = [
+        {"label": "Run Email Sender", "callback": send_all_emails},
+        {"label": "Configure Options", "callback": configure_options},
+        {"label": "Preview File", "callback": preview_file},
+        {"label": "Export Sent Log", "callback": export_log},
+        {"label": "Exit", "callback": exit_app},
+    ]
+    run_menu(menu_builder("BenchHub LLM Integration Menu:", menu_items))
@@ -0,0 +1,58 @@
+import os
+from datetime import datetime
+
+from menu.utils.config_manager import (
+    get_inference_settings,
+    get_llm_path,
+    save_inference_settings,
+)
+
+# A typical response, so the calibration prompt is as long as a real one.
+CALIBRATION_ANSWERS = (
+    "Automation;AI;Performance;",
+    "I would like to get better at test automation frameworks and AI tools.",
+    "ISTQB Foundation",
+)
+
+
+def run_autotune() -> int:
+    """Calibrate llama settings for the configured model and save them to [Inference]."""
+    from llm_core.autotune import autotune
+    from llm_core.model_manager import get_model_manager
+    from menu.options.send_emails.llm_integration.prompt_builder import build_prompt
+
+    model_path = get_llm_path()
+    if not model_path or not os.path.exists(model_path):
+        print("LLM model not found. Please configure the path in the options menu.")
+        return 1
+
+    settings = get_inference_settings()
+    manager = get_model_manager()
+    # Every trial loads its own copy of the weights; never next to a resident one.
+    manager.unload_all()
+    print(f"Calibrating {os.path.basename(model_path)}; every trial reloads the model.")
+    tuned, trials = autotune(
+        model_path,
+        build_prompt(*CALIBRATION_ANSWERS),
+        n_ctx=settings["n_ctx"],
+        baseline=settings,
+        on_trial=lambda trial: print(f"  {trial.summary()}"),
+    )
+    tuned["autotuned_at"] = datetime.now().isoformat(timespec="seconds")
+    save_inference_settings(tuned)
+    # The runner kept under the old settings would never be asked for again.
+    manager.evict(model_path)
+    print("\nSaved to [Inference] in config.ini:")
+    for key, value in tuned.items():
+        if isinstance(value, bool):
+            value = "yes" if value else "no"
+        print(f"  {key} = {value}")
+    return 0
+
+
+def autotune_inference():
+    try:
+        run_autotune()
+    except Exception as e:
+        print(f"\nCalibration failed: {e}")
+    input("Press Enter to return to the configuration menu...")
@@ -1,26 +1,49 @@
+import os
+
+from llm_core.gguf import GGUFError, default_n_ctx, read_gguf
+from menu.options.configuration.autotune import autotune_inference
 from menu.options.configuration.paths.llm_path import set_llm_model_path
 from menu.options.configuration.paths.survey_path import set_survey_path
-from menu.utils.menu_builder import menu_builder
-from menu.utils.config_manager import load_config
-
+from menu.utils.menu_builder import back, menu_builder
+from menu.utils.config_manager import get_inference_settings, load_config
 
-def configure_options():
-    from menu.handler import main_menu  # defer import to avoid circular ref
 
+def configuration_header():
     # Load current config
     config = load_config()
     llm_model = config["Paths"].get("llm_model_path", "<not set>")
     survey = config["Paths"].get("survey_path", "<not set>")
+    inference = get_inference_settings()
+    tuned = config.get("Inference", "autotuned_at", fallback="not autotuned")
+    n_ctx = inference["n_ctx"] or f"auto ({default_n_ctx(llm_model)})"
 
-    header = (
+    return (
         f"\nCurrent Configuration:\n"
         f"  🔹 LLM Model Path:   {llm_model}\n"
+        f"  🔹 Model:            {describe_model(llm_model)}\n"
         f"  🔹 Survey Path:      {survey}\n"
+        f"  🔹 Inference:        {inference['n_threads']} threads, "
+        f"n_batch {inference['n_batch']}, n_ctx {n_ctx} ({tuned})\n"
     )
 
+
+def describe_model(path: str) -> str:
+    """One-line model summary from the GGUF header, without loading the weights."""
+    if not os.path.isfile(path):
+        return "<not found>"
+    try:
+        return read_gguf(path).summary()
+    except (OSError, GGUFError) as e:
+        return f"<invalid: {e}>"
+
+
+def configure_options():
     menu_items = [
         {"label": "Configure LLM Model Path", "callback": set_llm_model_path},
         {"label": "Configure Survey Path", "callback": set_survey_path},
-        {"label": "Go back to main menu", "callback": main_menu},
+        {"label": "Autotune Inference Settings", "callback": autotune_inference},
+        {"label": "Go back to main menu", "callback": back},
     ]
-    menu_builder("Configuration Options:", menu_items, header=header)
+    return menu_builder(
+        "Configuration Options:", menu_items, header=configuration_header
+    )
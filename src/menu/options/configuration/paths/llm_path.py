@@ -1,9 +1,9 @@
-from tkinter import filedialog, Tk
 from menu.utils.config_manager import load_config, save_config
-import os
 
 
 def set_llm_model_path():
+    from tkinter import filedialog, Tk
+
     root = Tk()
     root.withdraw()
     path = filedialog.askopenfilename(
@@ -12,14 +12,15 @@ def set_llm_model_path():
     root.destroy()
 
     if path:
-        if os.path.getsize(path) <= 4 * 1024 * 1024 * 1024:
-            print(
-                "Error: LLM model file must be over 4 GiB. Please select a valid model file."
-            )
-            input("Press Enter to return to the configuration menu...")
-            from menu.options.configuration.configure import configure_options
+        from llm_core.gguf import GGUFError, read_gguf
 
-            return configure_options()
+        try:
+            info = read_gguf(path)
+        except (OSError, GGUFError) as e:
+            print(f"Error: {e} Please select a valid model file.")
+            input("Press Enter to return to the configuration menu...")
+            return
+        print(f"Model: {info.summary()}")
         config = load_config()
         config["Paths"]["llm_model_path"] = path
         save_config(config)
@@ -27,6 +28,3 @@ def set_llm_model_path():
     else:
         print("No file selected.")
     input("Press Enter to return to the configuration menu...")
-    from menu.options.configuration.configure import configure_options
-
-    configure_options()
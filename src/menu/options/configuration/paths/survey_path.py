@@ -1,30 +1,10 @@
-from tkinter import filedialog, Tk
 from menu.utils.config_manager import load_config, save_config
-import pandas as pd
-
-REQUIRED_COLUMNS = [
-    "Id",
-    "Start time",
-    "Completion time",
-    "Email",
-    "Name",
-    "Please choose the office location you are assigned to.\n",
-    "Please provide your Career Coach's email address in the space below.\n",
-    "Which areas of upskilling are you most interested in? (You can select multiple options)\n",
-    "Are you currently engaged in any training, certifications, or testing activities?\n",
-    "If yes, please specify the type of training or certification you're currently engaged with.\n",
-    "Are there any specific topics or skills you would like to focus on in future training programs?\n",
-    "Would you be open to sharing your expertise by leading training sessions within your field of knowledge?\n",
-    (
-        "Would you be interested in joining Keystone MarketPlace Romania in the future?\n"
-        "https://confluence.endava.com/spaces/CTO/pages/577044538/KMP+in+Romania"
-    ),
-    "Do you feel you have enough information or clarity regarding your next steps during bench period?\n",
-    "Send Email",
-]
+from menu.utils.survey_schema import validate_survey
 
 
 def set_survey_path():
+    from tkinter import filedialog, Tk
+
     root = Tk()
     root.withdraw()
     path = filedialog.askopenfilename(
@@ -34,22 +14,18 @@ def set_survey_path():
 
     if path:
         try:
-            df = pd.read_excel(path)
-            missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
-            if missing:
-                print("Error: The selected Excel file is missing required columns:")
-                for col in missing:
-                    print(f"  - {col}")
+            report = validate_survey(path)
+            if not report.ok:
+                print("Error: The selected Excel file does not match the survey:")
+                print(report.describe())
                 input("Press Enter to return to the configuration menu...")
-                from menu.options.configuration.configure import configure_options
-
-                return configure_options()
+                return
+            if report.renamed or report.extra:
+                print(report.describe())
         except Exception as e:
             print(f"Error reading Excel file: {e}")
             input("Press Enter to return to the configuration menu...")
-            from menu.options.configuration.configure import configure_options
-
-            return configure_options()
+            return
         config = load_config()
         config["Paths"]["survey_path"] = path
         save_config(config)
@@ -57,6 +33,3 @@ def set_survey_path():
     else:
         print("No file selected.")
     input("Press Enter to return to the configuration menu...")
-    from menu.options.configuration.configure import configure_options
-
-    configure_options()
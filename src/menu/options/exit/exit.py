@@ -1,5 +1,10 @@
 def exit_app():
     import sys
 
+    # Release a warm model, if one was ever loaded, before the process goes away.
+    model_manager = sys.modules.get("llm_core.model_manager")
+    if model_manager is not None:
+        model_manager.get_model_manager().shutdown()
+
     print("Exiting application.")
     sys.exit(0)
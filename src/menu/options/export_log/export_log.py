@@ -0,0 +1,13 @@
+from menu.options.send_emails.llm_integration.sent_log import export_sent_log
+
+
+def export_log():
+    try:
+        path = export_sent_log()
+        print(f"Sent log exported to {path}")
+    except PermissionError:
+        print("Permission denied. sent_log.xlsx is likely open elsewhere.")
+        print("Please close the file and try again.")
+    except Exception as e:
+        print(f"Could not export the sent log: {e}")
+    input("Press Enter to return to the menu...")
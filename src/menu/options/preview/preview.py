@@ -1,33 +1,75 @@
+import os
+import shutil
+
 from .utils import (
-    load_survey_df,
-    get_unsent_people,
-    get_id_name_email,
-    display_people_table,
+    FILTER_FIELDS,
+    PREVIEW_FIELDS,
+    SurveyPage,
+    load_unsent_rows,
 )
+from menu.options.send_emails.llm_integration.sent_log import load_sent_log
 from menu.utils.config_manager import load_config, get_config_path
-import os
+from menu.utils.logo import LOGO
+from menu.utils.survey_schema import FIELD_COLUMNS, validate_survey
+from menu.utils.terminal import Screen, read_key
 
-REQUIRED_COLUMNS = [
-    "Id",
-    "Start time",
-    "Completion time",
-    "Email",
-    "Name",
-    "Please choose the office location you are assigned to.\n",
-    "Please provide your Career Coach's email address in the space below.\n",
-    "Which areas of upskilling are you most interested in? (You can select multiple options)\n",
-    "Are you currently engaged in any training, certifications, or testing activities?\n",
-    "If yes, please specify the type of training or certification you're currently engaged with.\n",
-    "Are there any specific topics or skills you would like to focus on in future training programs?\n",
-    "Would you be open to sharing your expertise by leading training sessions within your field of knowledge?\n",
-    "Do you feel you have enough information or clarity regarding your next steps during bench period?\n",
-    "Send Email",
-]
+# Lines around the table: logo, title, status and key help.
+SCREEN_OVERHEAD = 16
+# Key name -> pager action.
+KEY_ACTIONS = {
+    "left": "prev",
+    "pageup": "prev",
+    "p": "prev",
+    "right": "next",
+    "pagedown": "next",
+    "n": "next",
+    "home": "first",
+    "end": "last",
+    "o": "office",
+    "c": "career_coach",
+    "x": "clear",
+    "q": "quit",
+    "esc": "quit",
+    "enter": "quit",
+}
 
 
-def preview_file():
-    from menu.handler import main_menu
+def page_size() -> int:
+    """Rows that fit on screen; each grid row takes two lines."""
+    lines = shutil.get_terminal_size().lines
+    return max(5, (lines - SCREEN_OVERHEAD) // 2)
+
+
+def browse(page: SurveyPage):
+    """Show ``page`` and handle paging and filter keys until the user leaves."""
+    screen = Screen()
+    while True:
+        screen.draw(
+            f"{LOGO}\nPeople who have NOT been sent an email:\n\n"
+            f"{page.render()}\n\n{page.status()}\n"
+            "Left/Right or PgUp/PgDn: page, Home/End: first/last, "
+            "O: filter office, C: filter coach, X: clear filters, Enter/Esc: back"
+        )
+        key = KEY_ACTIONS.get(read_key())
+        if key == "quit":
+            return
+        if key == "next":
+            page.move(1)
+        elif key == "prev":
+            page.move(-1)
+        elif key == "first":
+            page.move(-page.pages)
+        elif key == "last":
+            page.move(page.pages)
+        elif key == "clear":
+            page.clear_filters()
+        elif key in FILTER_FIELDS:
+            text = input(f"\n{PREVIEW_FIELDS[key]} contains (empty to clear): ")
+            page.set_filter(key, text)
+            screen.invalidate()
 
+
+def preview_file():
     # Check config.ini existence
     config_path = get_config_path()
     if not os.path.exists(config_path):
@@ -35,7 +77,7 @@ def preview_file():
             "Error: Configuration not found. Please configure paths from the configuration options menu first."
         )
         input("Press Enter to return to the main menu...")
-        return main_menu()
+        return
 
     config = load_config()
     excel_path = config["Paths"].get("survey_path", "")
@@ -47,33 +89,29 @@ def preview_file():
             " Please configure it from the configuration options menu."
         )
         input("Press Enter to return to the main menu...")
-        return main_menu()
+        return
 
-    df = load_survey_df(excel_path)
-    if df is None or df.empty:
-        print(
-            "Error: Survey Excel file is empty or could not be loaded."
-            " Please check the file and configure it from the configuration options menu."
-        )
+    try:
+        report = validate_survey(excel_path, FIELD_COLUMNS)
+    except Exception as e:
+        print(f"Error reading Excel file: {e}")
         input("Press Enter to return to the main menu...")
-        return main_menu()
-
-    print(f"Loaded: {excel_path}\n")
-    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
-    if missing:
+        return
+    if not report.ok:
         print("Error: The selected Excel file is missing required columns:")
-        for col in missing:
-            print(f"  - {col}")
+        print(report.describe())
         input("Press Enter to return to the configuration menu...")
         from menu.options.configuration.configure import configure_options
 
         return configure_options()
-    filtered = get_unsent_people(df)
-    filtered = get_id_name_email(filtered)
-    print("\nPeople who have NOT been sent an email:\n")
-    display_people_table(filtered)
-    input("\nPress Enter to return to the main menu...")
-    main_menu()
+
+    print(f"Loading: {excel_path}")
+    rows = load_unsent_rows(excel_path, load_sent_log())
+    if not rows:
+        print("\nAll emails have been sent!")
+        input("\nPress Enter to return to the main menu...")
+        return
+    browse(SurveyPage(rows, page_size()))
 
 
 if __name__ == "__main__":
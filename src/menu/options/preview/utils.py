@@ -1,73 +1,137 @@
-import pandas as pd
+from typing import Optional
+
 from tabulate import tabulate
 
+from menu.utils.survey_schema import resolve_indexes
+from telemetry.recorder import stage
+
+# Logical field -> column title in the preview table.
+PREVIEW_FIELDS = {
+    "id": "Id",
+    "name": "Name",
+    "email": "Email",
+    "office": "Office",
+    "career_coach": "Coach",
+}
+FILTER_FIELDS = ("office", "career_coach")
+
 
-def get_excel_df(EXCEL_PATH):
-    try:
-        df = pd.read_excel(EXCEL_PATH)
-        return df
-    except Exception as e:
-        print(f"Error reading Excel file: {e}")
-        input("Press Enter to return to the preview menu...")
-        return None
+def _text(val) -> str:
+    return "" if val is None else str(val).strip()
 
 
 def truncate(val, width=40):
-    val = str(val)
+    val = _text(val)
     return val if len(val) <= width else val[: width - 3] + "..."
 
 
-def show_where_left_off(EXCEL_PATH):
-    df = get_excel_df(EXCEL_PATH)
-    if df is None:
-        return
-    unsent = df[df["Send Email"].astype(str).str.lower() == "no"]
-    if not unsent.empty:
-        print("You left off at:\n")
-        row = unsent.head(1).transpose()
-        row.columns = ["Next Person"]
-        row = row.applymap(lambda x: truncate(x, 40))
-        print(tabulate(row, headers="keys", tablefmt="grid", showindex=True))
-    else:
-        print("All emails have been sent!")
-    input("\nPress Enter to return to the preview menu...")
-
-
-def show_missed(EXCEL_PATH):
-    df = get_excel_df(EXCEL_PATH)
-    if df is None:
-        return
-    unsent = df[df["Send Email"].astype(str).str.lower() == "no"]
-    if not unsent.empty:
-        print(f"Missed {len(unsent)} recipients:\n")
-        df_clean = unsent.transpose()
-        df_clean.columns = [f"Person {i+1}" for i in range(len(df_clean.columns))]
-        df_clean = df_clean.applymap(lambda x: truncate(x, 40))
-        print(tabulate(df_clean, headers="keys", tablefmt="grid", showindex=True))
-    else:
-        print("No missed recipients!")
-    input("\nPress Enter to return to the preview menu...")
-
-
-def load_survey_df(EXCEL_PATH):
-    """Load the survey Excel file as a DataFrame."""
-    return get_excel_df(EXCEL_PATH)
-
-
-def get_unsent_people(df):
-    """Return a DataFrame of people who have not been sent an email (Send Email != 1)."""
-    return df[df["Send Email"] != 1]
-
-
-def get_id_name_email(df):
-    """Return only the Id, Email, and Name columns from the DataFrame, if present."""
-    cols = [col for col in df.columns if col.lower() in ["id", "name", "email"]]
-    return df[cols]
-
-
-def display_people_table(df):
-    """Display the table of people in a readable format."""
-    if df.empty:
-        print("All emails have been sent!")
-    else:
-        print(tabulate(df, headers="keys", tablefmt="grid", showindex=False))
+def load_unsent_rows(path: str, sent_ids: set) -> list[tuple]:
+    """
+    Read the PREVIEW_FIELDS of every person whose Id is not in ``sent_ids``.
+
+    Only the span of the projected columns is read from the workbook, and
+    cells are kept as they are; text conversion happens when a row is
+    filtered or shown. Rows hold one value per PREVIEW_FIELDS key, with None
+    for an optional field (office) the workbook does not have.
+    """
+    from openpyxl import load_workbook
+
+    with stage("preview.load") as counts:
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            ws = wb.worksheets[0]
+            header = next(ws.iter_rows(max_row=1, values_only=True), ())
+            index = resolve_indexes(header)
+            positions = [index.get(field) for field in PREVIEW_FIELDS]
+            first_col = min(p for p in positions if p is not None)
+            last_col = max(p for p in positions if p is not None)
+            positions = [None if p is None else p - first_col for p in positions]
+            rows = []
+            for row in ws.iter_rows(
+                min_row=2,
+                min_col=first_col + 1,
+                max_col=last_col + 1,
+                values_only=True,
+            ):
+                entry_id = row[positions[0]]
+                if entry_id is None or str(entry_id).strip() in sent_ids:
+                    continue
+                rows.append(tuple(None if p is None else row[p] for p in positions))
+        finally:
+            wb.close()
+        counts["rows"] = len(rows)
+    return rows
+
+
+class SurveyPage:
+    """
+    A filtered, paged view over preview rows.
+
+    Filters are case-insensitive substrings on FILTER_FIELDS. Only the rows
+    of the current page are converted and truncated for display.
+    """
+
+    def __init__(self, rows: list[tuple], page_size: int):
+        self.rows = rows
+        self.page_size = max(1, page_size)
+        self.filters: dict[str, str] = {}
+        self.page = 0
+        self._matches: Optional[list[tuple]] = None
+
+    @property
+    def matches(self) -> list[tuple]:
+        if self._matches is None:
+            fields = list(PREVIEW_FIELDS)
+            wanted = [
+                (fields.index(field), text.lower())
+                for field, text in self.filters.items()
+            ]
+            self._matches = [
+                row
+                for row in self.rows
+                if all(text in _text(row[i]).lower() for i, text in wanted)
+            ]
+        return self._matches
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-len(self.matches) // self.page_size))
+
+    def set_filter(self, field: str, text: str):
+        text = text.strip()
+        if text:
+            self.filters[field] = text
+        else:
+            self.filters.pop(field, None)
+        self._matches = None
+        self.page = 0
+
+    def clear_filters(self):
+        self.filters.clear()
+        self._matches = None
+        self.page = 0
+
+    def move(self, pages: int):
+        self.page = min(max(self.page + pages, 0), self.pages - 1)
+
+    def render(self) -> str:
+        start = self.page * self.page_size
+        visible = [
+            [truncate(value) for value in row]
+            for row in self.matches[start : start + self.page_size]
+        ]
+        if not visible:
+            return "No matching people."
+        return tabulate(visible, headers=list(PREVIEW_FIELDS.values()), tablefmt="grid")
+
+    def status(self) -> str:
+        line = (
+            f"Page {self.page + 1}/{self.pages} - {len(self.matches)} of "
+            f"{len(self.rows)} unsent"
+        )
+        if self.filters:
+            line += " - " + ", ".join(
+                f"{PREVIEW_FIELDS[field]} contains '{text}'"
+                for field, text in self.filters.items()
+            )
+        return line
@@ -1,18 +1,42 @@
+import itertools
 import os
-import pandas as pd
-import win32com.client as win32
+from datetime import datetime
+from typing import Optional
 
-from menu.options.send_emails.llm_integration.run import generate_llm_outputs
-from menu.utils.config_manager import get_survey_path, get_llm_path
-from menu.options.send_emails.llm_integration.survey_parser import find_column
+from llm_core.gguf import GGUFError, read_gguf
+from llm_core.model_manager import get_model_manager
+from llm_core.speculative import speculation_report
+from menu.options.send_emails.outbox import Outbox
+from menu.options.send_emails.outbox_sender import OutboxSender
+from menu.options.send_emails.pipeline import Pipeline, Stage
+from menu.options.send_emails.transports import get_transport
+from menu.options.send_emails.llm_integration.normalization import (
+    answer_key,
+    dedup_report,
+    normalize_entry,
+)
+from menu.options.send_emails.llm_integration.prompt_builder import build_prompt
+from menu.options.send_emails.llm_integration.run import (
+    generate_for_entries,
+    generation_batch_size,
+    get_llm_runner,
+)
+from menu.options.send_emails.llm_integration.generation_cache import (
+    get_generation_cache,
+)
+from menu.utils.config_manager import get_llm_path, get_mail_settings, get_survey_path
+from menu.utils.survey_schema import FIELD_COLUMNS, validate_survey
+from telemetry.recorder import finish_run, start_run
+from menu.options.send_emails.llm_integration.survey_parser import (
+    iter_unsent_entries,
+)
 from menu.options.send_emails.llm_integration.sent_log import (
     load_sent_log,
-    append_to_sent_log,
+    export_sent_log,
 )
 
 # === CONFIG ===
 subject = "Your Development Plan – Personalized Suggestions"
-LOG_PATH = "C:\\Users\\iustanciu\\OneDrive - ENDAVA\\Survey\\sent_log.xlsx"
 
 EMAIL_TEMPLATE = """
 <html>
@@ -30,14 +54,170 @@ Community Leads if you have any questions or need further support.</p>
 """
 
 
-def send_email_outlook(to: str, cc: str, subject: str, html_body: str):
-    outlook = win32.Dispatch("Outlook.Application")
-    mail = outlook.CreateItem(0)
-    mail.To = to
-    mail.CC = cc
-    mail.Subject = subject
-    mail.HTMLBody = html_body
-    mail.Send()
+def build_email_pipeline(llm, outbox: Outbox, sender: OutboxSender) -> Pipeline:
+    """
+    Build the parse -> prompt -> generate -> render -> enqueue -> log pipeline.
+
+    Entries are fed in by the caller (the parse step); every later step runs on
+    its own thread. Rendered emails are written to ``outbox`` and handed to
+    ``sender``, whose worker pool delivers them independently, so a slow mail
+    server never holds up LLM decoding of the next entries.
+    """
+
+    def prompt_stage(entry):
+        normalize_entry(entry)
+        entry["prompt"] = build_prompt(entry["r1"], entry["r2"], entry["r3"])
+
+    def generate_stage(entries):
+        generate_for_entries(llm, entries)
+
+    def render_stage(entry):
+        entry["html"] = EMAIL_TEMPLATE.format(
+            name=entry["name"], generated_section=entry["llm_output"]
+        )
+
+    def enqueue_stage(entry):
+        print(
+            f"Queueing email to {entry['name']} <{entry['email']}> | CC: {entry['career_coach']}"
+        )
+        outbox.enqueue(
+            entry["id"],
+            to=entry["email"],
+            cc=entry["career_coach"],
+            subject=subject,
+            html_body=entry["html"],
+        )
+        sender.submit(entry["id"])
+
+    def log_stage(entry):
+        entry_id = entry["id"]
+        if "error" not in entry:
+            if "generation_stats" in entry:
+                print(f"  Id {entry_id}: {entry['generation_stats'].summary()}")
+        else:
+            # Not logged, so the entry is picked up again on the next run.
+            print(f"Failed to prepare email for Id {entry_id}: {entry['error']}")
+        print(f"  queues: {pipeline.format_depths()}")
+
+    batch_size = generation_batch_size()
+    pipeline = Pipeline(
+        [
+            Stage("prompt", prompt_stage),
+            Stage("generate", generate_stage, batch_size=batch_size),
+            Stage("render", render_stage),
+            Stage("enqueue", enqueue_stage),
+            Stage("log", log_stage, handles_errors=True),
+        ],
+        # Deep enough queues for the generate stage to gather a full batch.
+        maxsize=max(8, batch_size),
+    )
+    return pipeline
+
+
+def build_outbox_sender(outbox: Outbox, send, on_result=None) -> OutboxSender:
+    """Create an OutboxSender for ``send`` using the retry and rate settings in [Mail]."""
+    settings = get_mail_settings()
+    return OutboxSender(
+        outbox,
+        send,
+        concurrency=getattr(send, "concurrency", 1),
+        rate_per_minute=float(settings["rate_per_minute"]),
+        max_attempts=int(settings["max_attempts"]),
+        retry_base=float(settings["retry_base_seconds"]),
+        retry_max=float(settings["retry_max_seconds"]),
+        on_result=on_result,
+    )
+
+
+def process_unsent(survey_path: str, llm=None, send=None) -> list[dict]:
+    """
+    Generate, queue and send an email for every unsent survey entry, without any prompts.
+
+    Emails are spooled to the outbox and delivered through ``send``, or the
+    transport configured in [Mail] (which is closed afterwards). Messages left
+    in the outbox by an interrupted run are delivered first. Returns the
+    processed entries (empty if there was nothing new to send). Raises
+    ValueError if the survey is missing a required column. Stage timings are
+    written to a run report and the Prometheus textfile.
+    """
+    recorder = start_run("send_emails")
+    transport = send or get_transport()
+    try:
+        return _process_unsent(survey_path, llm, transport, recorder)
+    finally:
+        if send is None:
+            transport.close()
+        report_path = finish_run(recorder)
+        if report_path:
+            print(recorder.summary())
+            print(f"Run report written to {report_path}")
+
+
+def _process_unsent(survey_path: str, llm, send, recorder) -> list[dict]:
+    outbox = Outbox()
+    outcomes: dict[str, tuple[datetime, Optional[str]]] = {}
+
+    def on_result(entry_id, error):
+        outcomes[entry_id] = (datetime.now(), error)
+
+    sender = build_outbox_sender(outbox, send, on_result=on_result)
+    recovered = len(outbox.pending())
+    if recovered:
+        print(f"Resuming {recovered} emails left in the outbox by a previous run.")
+    sender.start()
+    try:
+        # Anything already in the outbox is sent by the sender, not generated again.
+        sent_ids = load_sent_log() | outbox.ids()
+        entries = recorder.timed_iter(
+            "survey.parse", iter_unsent_entries(survey_path, sent_ids)
+        )
+        # Pull the first entry here so a missing column or an empty backlog is
+        # reported before the pipeline starts.
+        first = next(entries, None)
+        results = []
+        if first is not None:
+            llm = llm or get_llm_runner()
+            if hasattr(llm, "begin_run"):
+                llm.begin_run()
+            pipeline = build_email_pipeline(llm, outbox, sender)
+            results = pipeline.run(itertools.chain([first], entries))
+        sender.drain()
+    finally:
+        sender.stop()
+
+    for entry in results:
+        if "error" in entry or entry["id"] not in outcomes:
+            continue
+        finished_at, error = outcomes[entry["id"]]
+        if error is None:
+            entry["sent_at"] = finished_at
+        else:
+            entry["error"] = error
+            entry["failed_stage"] = "send"
+    if not results and not outcomes:
+        return []
+
+    sent = sum(1 for entry in results if "error" not in entry)
+    if results:
+        print(f"Sent {sent} of {len(results)} emails.")
+        print(get_model_manager().report())
+        print(get_generation_cache().report())
+        print(dedup_report(len(results), len({answer_key(e) for e in results})))
+        report = speculation_report(
+            [e["generation_stats"] for e in results if "generation_stats" in e]
+        )
+        if report:
+            print(report)
+    if recovered:
+        resent = (
+            sum(1 for entry_id, (_, error) in outcomes.items() if error is None) - sent
+        )
+        print(f"Sent {resent} of {recovered} emails resumed from the outbox.")
+    try:
+        print(f"Sent log exported to {export_sent_log()}")
+    except PermissionError:
+        print("Could not export sent_log.xlsx (it is open elsewhere).")
+    return results
 
 
 def send_all_emails():
@@ -54,59 +234,31 @@ def send_all_emails():
         input("Press Enter to return to the menu...")
         return
 
-    if os.path.getsize(llm_model_path) < 4 * 1024 * 1024 * 1024:
-        print("LLM model file is smaller than 4GB. Please select a valid model.")
+    try:
+        report = validate_survey(survey_path, FIELD_COLUMNS)
+    except Exception as e:
+        print(f"Error reading Excel file: {e}")
+        input("Press Enter to return to the menu...")
+        return
+    if not report.ok:
+        print("The survey file is missing columns the email sender needs:")
+        print(report.describe())
+        input("Press Enter to return to the menu...")
+        return
+
+    try:
+        read_gguf(llm_model_path)
+    except (OSError, GGUFError) as e:
+        print(f"LLM model file is not usable: {e} Please select a valid model.")
         input("Press Enter to return to the menu...")
         return
 
     try:
-        df = pd.read_excel(survey_path)
-
-        required_keywords = [
-            "upskilling",
-            "future training programs",
-            "next period",
-            "email",
-            "name",
-            "career coach",
-            "id",
-        ]
-        for keyword in required_keywords:
-            find_column(df, keyword)
-
-        sent_ids = load_sent_log(LOG_PATH)
-        responses = generate_llm_outputs(df)
-
-        if not responses:
+        results = process_unsent(survey_path)
+        if not results:
             print("All entries are already processed. No emails were sent.")
             input("Press Enter to return to the menu...")
             return
-
-        for entry in responses:
-            entry_id = str(entry["id"]).strip()
-            if entry_id in sent_ids:
-                print(f"Skipping Id {entry_id} (already sent)")
-                continue
-
-            try:
-                html = EMAIL_TEMPLATE.format(
-                    name=entry["name"], generated_section=entry["llm_output"]
-                )
-                print(
-                    f"Sending to {entry['name']} <{entry['email']}> | CC: {entry['coach']}"
-                )
-                send_email_outlook(
-                    to=entry["email"],
-                    cc=entry["coach"],
-                    subject=subject,
-                    html_body=html,
-                )
-                append_to_sent_log(entry_id, "Success", path=LOG_PATH)
-
-            except Exception as e:
-                print(f"Failed to send email to Id {entry_id}: {e}")
-                append_to_sent_log(entry_id, f"Failed: {str(e)}", path=LOG_PATH)
-
         print("All emails processed and log updated.")
 
     except ValueError as e:
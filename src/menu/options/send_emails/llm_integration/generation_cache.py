@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+from typing import Optional
+
+from diskcache import Cache
+
+from menu.utils.config_manager import get_data_dir
+
+CACHE_DIRNAME = "generation_cache"
+CACHE_SIZE_LIMIT = 256 * 1024 * 1024  # bytes; least recently used entries are evicted
+
+
+def model_identity(model_path: str) -> str:
+    """Identify a model file cheaply by name, size and modification time."""
+    stat = os.stat(model_path)
+    return f"{os.path.basename(model_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class GenerationCache:
+    """
+    Persistent, size-bounded cache of generated paragraphs.
+
+    Keys are content addresses: a hash of the answer key, the prompt
+    version, the model file identity and the generation parameters. Any change
+    to one of those produces a different key, so stale text is never served.
+    """
+
+    def __init__(
+        self, directory: Optional[str] = None, size_limit: int = CACHE_SIZE_LIMIT
+    ):
+        self._cache = Cache(
+            directory or get_data_dir(CACHE_DIRNAME),
+            size_limit=size_limit,
+            eviction_policy="least-recently-used",
+        )
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        answers: tuple, prompt_version: str, model_id: str, params: dict
+    ) -> str:
+        payload = json.dumps(
+            {
+                "answers": list(answers),
+                "prompt_version": prompt_version,
+                "model": model_id,
+                "params": params,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        text = self._cache.get(key)
+        if text is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return text
+
+    def set(self, key: str, text: str):
+        self._cache.set(key, text)
+
+    def report(self) -> str:
+        total = self.hits + self.misses
+        ratio = f"{self.hits / total:.0%}" if total else "n/a"
+        return (
+            f"Generation cache: {self.hits} hits, {self.misses} misses ({ratio} hit rate), "
+            f"{len(self._cache)} stored, {self._cache.volume() / (1024 * 1024):.1f} MiB on disk"
+        )
+
+    def clear(self):
+        """Drop every cached paragraph and reset the counters."""
+        self._cache.clear()
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self._cache.close()
+
+
+_cache: Optional[GenerationCache] = None
+
+
+def get_generation_cache() -> GenerationCache:
+    """Return the process-wide GenerationCache."""
+    global _cache
+    if _cache is None:
+        _cache = GenerationCache()
+    return _cache
@@ -0,0 +1,77 @@
+import math
+
+ANSWER_FIELDS = ("r1", "r2", "r3")
+# Microsoft Forms stores multi-select answers as "A;B;C;".
+MULTI_SELECT_FIELDS = ("r1",)
+# Free-text answers, where "No" or "n/a" means nothing to add. r3 is a Yes/No
+# question, so its "No" is a real answer and is kept.
+PLACEHOLDER_FIELDS = ("r1", "r2")
+EMPTY_ANSWER = "-"
+# Answers that carry no information for the prompt.
+_EMPTY_VALUES = {"", "-", "--", "no", "nan", "none", "n/a", "na", "nothing", "."}
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def canonical_answer(
+    value, multi_select: bool = False, fold_placeholders: bool = True
+) -> str:
+    """
+    Canonical display form of a survey answer.
+
+    Whitespace is collapsed and empty answers become "-"; with
+    ``fold_placeholders`` so do placeholder answers ("-", "No", "nan", ...).
+    Multi-select values are split on ";", de-duplicated
+    case-insensitively and sorted, so "AI;Automation;" and "automation; AI"
+    produce the same text.
+    """
+    if _is_missing(value):
+        return EMPTY_ANSWER
+    text = " ".join(str(value).split())
+    if not text or (fold_placeholders and text.casefold() in _EMPTY_VALUES):
+        return EMPTY_ANSWER
+    if not multi_select:
+        return text
+    options = {}
+    for option in text.split(";"):
+        option = option.strip()
+        if option and option.casefold() not in _EMPTY_VALUES:
+            options.setdefault(option.casefold(), option)
+    if not options:
+        return EMPTY_ANSWER
+    return ", ".join(options[key] for key in sorted(options))
+
+
+def normalize_entry(entry: dict) -> tuple:
+    """Canonicalize an entry's answers in place and return its grouping key."""
+    for field in ANSWER_FIELDS:
+        entry[field] = canonical_answer(
+            entry[field],
+            multi_select=field in MULTI_SELECT_FIELDS,
+            fold_placeholders=field in PLACEHOLDER_FIELDS,
+        )
+    return answer_key(entry)
+
+
+def answer_key(entry: dict) -> tuple:
+    """Case-insensitive key of an already normalized entry."""
+    return tuple(entry[field].casefold() for field in ANSWER_FIELDS)
+
+
+def group_entries(entries: list[dict]) -> list[list[dict]]:
+    """Normalize entries and group those with equivalent answers, keeping first-seen order."""
+    groups: dict[tuple, list[dict]] = {}
+    for entry in entries:
+        groups.setdefault(normalize_entry(entry), []).append(entry)
+    return list(groups.values())
+
+
+def dedup_report(n_entries: int, n_unique: int) -> str:
+    if not n_entries:
+        return "Deduplication: no entries."
+    return (
+        f"Deduplication: {n_entries} entries -> {n_unique} unique answer sets "
+        f"({n_entries / max(n_unique, 1):.1f}x fewer generations)"
+    )
@@ -1,42 +1,250 @@
+import sys
+import time
+from dataclasses import asdict
+from typing import Optional
+
+from llm_core.batch import SamplingParams
+from llm_core.generation import GenerationStats, StopCondition
 from llm_core.inference import LLMRunner
-from menu.options.send_emails.llm_integration.prompt_builder import build_prompt
-from menu.options.send_emails.llm_integration.survey_parser import (
-    get_entries_for_unsent,
+from llm_core.model_manager import get_model_manager
+from llm_core.sharding import plan_core_sets
+from llm_core.speculative import SpeculativeConfig
+from menu.options.send_emails.llm_integration.generation_cache import (
+    get_generation_cache,
+    model_identity,
+)
+from menu.options.send_emails.llm_integration.normalization import (
+    answer_key,
+    group_entries,
+)
+from menu.options.send_emails.llm_integration.prompt_builder import (
+    PROMPT_PREFIX,
+    PROMPT_VERSION,
+)
+from menu.options.send_emails.llm_integration.token_budget import (
+    ParagraphLengths,
+    TokenBudget,
+)
+from menu.utils.config_manager import (
+    get_inference_settings,
+    get_llm_path,
+    get_stop_patterns,
 )
-from menu.options.send_emails.llm_integration.sent_log import load_sent_log
+from telemetry.recorder import stage
 
-from menu.utils.config_manager import get_llm_path
+# Number of survey entries decoded in parallel as separate sequences.
+GENERATION_BATCH_SIZE = 4
+# Ceiling for max_tokens; the actual cap follows past paragraph lengths (token_budget).
+MAX_TOKENS = 150
+STOP = ["</s>"]
+# The email needs one paragraph; a sign-off or a fresh greeting means the
+# model has moved past it. More patterns can be added under [Generation]
+# stop_patterns in config.ini.
+STOP_PATTERNS = [
+    r"\n\s*(?:best|kind|warm)?\s*regards\b",
+    r"\n\s*(?:sincerely|cheers|thank you)\b",
+    r"\n\s*(?:dear|hello|hi)\b",
+]
+STOP_AT_PARAGRAPH = True
 
 
-def generate_llm_outputs(df) -> list[dict]:
-    sent_ids = load_sent_log(
-        "C:\\Users\\iustanciu\\OneDrive - ENDAVA\\Survey\\sent_log.xlsx"
-    )
-    entries = get_entries_for_unsent(df, sent_ids)
-    # print(f"Found {len(entries)} entries to process.")
-    # print(entries)
-    if not entries:
-        print("No new entries to process. All IDs are already logged.")
-        return []
+RUNNER_SETTINGS = ("n_ctx", "n_threads", "n_batch", "use_mmap", "use_mlock")
+
 
+def get_llm_runner() -> LLMRunner:
+    """Return the warm runner for the configured model, with the [Inference] settings."""
     llm_path = get_llm_path()
     if not llm_path:
         raise ValueError("LLM model path is not configured.")
+    settings = get_inference_settings()
+    return get_model_manager().get(
+        llm_path,
+        speculative=speculative_config(settings),
+        **{key: settings[key] for key in RUNNER_SETTINGS},
+    )
+
 
-    llm = LLMRunner(model_path=llm_path)
-
-    results = []
-    for entry in entries:
-        prompt = build_prompt(entry["r1"], entry["r2"], entry["r3"])
-        text = llm.run(prompt)
-        results.append(
-            {
-                "id": entry["id"],
-                "name": entry["name"],
-                "email": entry["email"],
-                "coach": entry["career_coach"],
-                "llm_output": text.strip(),
-            }
+def speculative_config(settings: dict) -> Optional[SpeculativeConfig]:
+    """The speculative decoding settings from [Inference], or None when it is off."""
+    mode = settings["speculative"].lower()
+    if mode in ("", "off", "no"):
+        return None
+    return SpeculativeConfig(
+        mode=mode,
+        draft_model_path=settings["draft_model_path"],
+        draft_tokens=settings["draft_tokens"],
+        min_acceptance=settings["speculative_min_acceptance"],
+    )
+
+
+def generation_stop() -> StopCondition:
+    return StopCondition(
+        STOP, STOP_PATTERNS + get_stop_patterns(), paragraph=STOP_AT_PARAGRAPH
+    )
+
+
+class _Progress:
+    """Live "tokens so far" line while generating, so the console never looks frozen."""
+
+    def __init__(self, n_prompts: int):
+        self.n_prompts = n_prompts
+        self.enabled = sys.stdout.isatty()
+        self.start = time.perf_counter()
+        self.shown = 0.0
+
+    def __call__(self, tokens: int):
+        now = time.perf_counter()
+        if not self.enabled or now - self.shown < 0.2:
+            return
+        self.shown = now
+        rate = tokens / (now - self.start)
+        print(
+            f"\r  Generating {self.n_prompts} email(s): {tokens} tokens, {rate:.1f} tok/s",
+            end="",
+            flush=True,
         )
 
-    return results
+    def done(self):
+        if self.enabled and self.shown:
+            print()
+
+
+def generation_batch_size() -> int:
+    """Entries to generate per call: one batch for every worker process configured."""
+    settings = get_inference_settings()
+    if settings["workers"] == 1:
+        return GENERATION_BATCH_SIZE
+    core_sets = plan_core_sets(settings["workers"], settings["threads_per_worker"])
+    return GENERATION_BATCH_SIZE * len(core_sets)
+
+
+def get_generation_pool(llm: LLMRunner, n_prompts: int):
+    """
+    Return the worker process pool configured under [Inference], if it should be used.
+
+    The pool only pays off for more than one prompt, and only applies to a
+    real LLMRunner (not e.g. a benchmark fake).
+    """
+    settings = get_inference_settings()
+    if settings["workers"] == 1 or n_prompts < 2 or type(llm) is not LLMRunner:
+        return None
+    return get_model_manager().get_pool(
+        llm.model_path,
+        workers=settings["workers"],
+        threads_per_worker=settings["threads_per_worker"],
+        n_ctx=llm.n_ctx,
+        batch_size=GENERATION_BATCH_SIZE,
+        n_batch=llm.n_batch,
+    )
+
+
+def get_token_budget(llm: LLMRunner) -> TokenBudget:
+    """Budget for ``llm``: its context as the ceiling, output capped by past paragraph lengths."""
+    max_tokens = ParagraphLengths().output_budget(MAX_TOKENS)
+    return TokenBudget(llm.tokenizer, n_ctx=llm.n_ctx, max_tokens=max_tokens)
+
+
+def generate_texts(
+    llm: LLMRunner,
+    prompts: list[str],
+    max_tokens: int = MAX_TOKENS,
+    n_ctx: Optional[int] = None,
+) -> tuple[list[str], list[GenerationStats]]:
+    """
+    Generate one paragraph per prompt and return the texts with per-prompt timings.
+
+    Several prompts are batched, with ``n_ctx`` KV cells per sequence, and
+    sharded across worker processes when [Inference] workers is not 1. With
+    speculative decoding on, prompts are streamed one by one instead, since
+    drafts take the place of the batch's parallel sequences.
+    """
+    stop = generation_stop()
+    progress = _Progress(len(prompts))
+    try:
+        if len(prompts) == 1 or getattr(llm, "speculative", None) is not None:
+            texts, all_stats = [], []
+            for prompt in prompts:
+                done = sum(s.tokens for s in all_stats)
+                stream = llm.stream(
+                    prompt, max_tokens=max_tokens, stop=stop, prefix=PROMPT_PREFIX
+                )
+                for _ in stream:
+                    progress(done + stream.stats.tokens)
+                texts.append(stream.text)
+                all_stats.append(stream.stats)
+            return texts, all_stats
+        pool = get_generation_pool(llm, len(prompts))
+        if pool is not None:
+            texts = pool.generate(
+                prompts,
+                max_tokens=max_tokens,
+                stop=stop,
+                progress=progress,
+                n_ctx=n_ctx,
+            )
+            return [text.strip() for text in texts], pool.last_stats
+        texts = llm.run_batch(
+            prompts,
+            max_tokens=max_tokens,
+            stop=stop,
+            batch_size=GENERATION_BATCH_SIZE,
+            progress=progress,
+            n_ctx=n_ctx,
+        )
+    finally:
+        progress.done()
+    return [text.strip() for text in texts], llm.last_stats
+
+
+def generate_for_entries(llm: LLMRunner, entries: list[dict]) -> int:
+    """
+    Set ``entry["llm_output"]`` for every entry and return the number of unique answer sets.
+
+    Entries are normalized and grouped by equivalent answers; each group is
+    generated once and the text fanned out to all of its members. Groups seen
+    before (same answers, prompt version, model file and generation
+    parameters) are served from the on-disk generation cache. Prompts are
+    fitted to the token budget, and the batch context is sized to the longest.
+    """
+    cache = get_generation_cache()
+    model_id = model_identity(llm.model_path)
+    stop = generation_stop()
+    budget = get_token_budget(llm)
+    # The output cap (max_tokens, and the prompt_limit derived from it) is
+    # left out: it follows the learned paragraph lengths and moves between
+    # runs, which would turn every row into a miss. A paragraph generated
+    # under another cap ended at the same stop conditions, so it still holds.
+    params = {
+        "n_ctx": llm.n_ctx,
+        "stop": stop.stop,
+        "stop_patterns": [p.pattern for p in stop.patterns],
+        "paragraph": stop.paragraph,
+        "sampling": asdict(SamplingParams()),
+    }
+
+    groups = group_entries(entries)
+    misses = []
+    for group in groups:
+        key = cache.make_key(answer_key(group[0]), PROMPT_VERSION, model_id, params)
+        text = cache.get(key)
+        if text is None:
+            misses.append((group, key))
+        else:
+            for entry in group:
+                entry["llm_output"] = text
+
+    if misses:
+        with stage("llm.budget", items=len(misses)):
+            fitted = [budget.fit(group[0]) for group, _ in misses]
+        prompts = [prompt for prompt, _ in fitted]
+        n_ctx = budget.context_for([n_tokens for _, n_tokens in fitted])
+        texts, all_stats = generate_texts(
+            llm, prompts, max_tokens=budget.max_tokens, n_ctx=n_ctx
+        )
+        ParagraphLengths().add(all_stats)
+        for (group, key), text, stats in zip(misses, texts, all_stats):
+            cache.set(key, text)
+            for entry in group:
+                entry["llm_output"] = text
+                entry["generation_stats"] = stats
+    return len(groups)
@@ -1,27 +1,149 @@
 import os
-import pandas as pd
+import sqlite3
+import threading
 from datetime import datetime
+from typing import Optional
 
-LOG_PATH = "C:\\Users\\iustanciu\\OneDrive - ENDAVA\\Survey\\sent_log.xlsx"
+from menu.utils.config_manager import get_sent_log_export_path, get_sent_log_path
+from telemetry.recorder import stage
 
+COLUMNS = ["Id", "Timestamp", "Status"]
 
-def load_sent_log(path: str = LOG_PATH) -> set:
-    if not os.path.exists(path):
-        df = pd.DataFrame(columns=["Id", "Timestamp", "Status"])
-        df.to_excel(path, index=False)
-        return set()
-    df = pd.read_excel(path)
-    return set(df["Id"].dropna().astype(str).str.strip())
 
+class SentLedger:
+    """
+    Append-only record of every email attempt, stored in SQLite (WAL mode).
 
-def append_to_sent_log(entry_id: str, status: str, path: str = LOG_PATH):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    new_row = {"Id": entry_id, "Timestamp": timestamp, "Status": status}
+    Each attempt is one committed INSERT, so a run costs O(1) per email and an
+    interrupted run keeps everything written before the interruption. Ids are
+    indexed for the "already sent?" lookup. ``export_xlsx`` writes the familiar
+    sent_log.xlsx for people who read the spreadsheet.
+    """
 
-    if not os.path.exists(path):
-        df = pd.DataFrame(columns=["Id", "Timestamp", "Status"])
-    else:
-        df = pd.read_excel(path)
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sent_log ("
+            " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " id TEXT NOT NULL,"
+            " timestamp TEXT NOT NULL,"
+            " status TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sent_log_id ON sent_log (id)"
+        )
 
-    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-    df.to_excel(path, index=False)
+    def record(self, entry_id: str, status: str, timestamp: Optional[str] = None):
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with stage("sent_log.append"), self._lock:
+            self._conn.execute(
+                "INSERT INTO sent_log (id, timestamp, status) VALUES (?, ?, ?)",
+                (str(entry_id).strip(), timestamp, status),
+            )
+
+    def contains(self, entry_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM sent_log WHERE id = ? LIMIT 1", (str(entry_id).strip(),)
+            ).fetchone()
+        return row is not None
+
+    def ids(self) -> set:
+        with stage("sent_log.load") as counts, self._lock:
+            rows = self._conn.execute("SELECT DISTINCT id FROM sent_log").fetchall()
+            counts["rows"] = len(rows)
+        return {row[0] for row in rows}
+
+    def rows(self) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, timestamp, status FROM sent_log ORDER BY seq"
+            ).fetchall()
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return (
+                self._conn.execute("SELECT 1 FROM sent_log LIMIT 1").fetchone() is None
+            )
+
+    def import_xlsx(self, xlsx_path: str) -> int:
+        """Copy the rows of an existing sent_log.xlsx into the ledger in one transaction."""
+        import pandas as pd
+
+        df = pd.read_excel(xlsx_path)
+        rows = [
+            (str(r["Id"]).strip(), str(r["Timestamp"]), str(r["Status"]))
+            for _, r in df.dropna(subset=["Id"]).iterrows()
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO sent_log (id, timestamp, status) VALUES (?, ?, ?)", rows
+            )
+            self._conn.execute("COMMIT")
+        return len(rows)
+
+    def export_xlsx(self, xlsx_path: str):
+        """Write the whole ledger to ``xlsx_path`` via a temp file and atomic rename."""
+        import pandas as pd
+
+        with stage("sent_log.export") as counts:
+            df = pd.DataFrame(self.rows(), columns=COLUMNS)
+            counts["rows"] = len(df)
+            tmp_path = f"{xlsx_path}.tmp.xlsx"
+            df.to_excel(tmp_path, index=False)
+            os.replace(tmp_path, xlsx_path)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_ledgers: dict[str, SentLedger] = {}
+_ledgers_lock = threading.Lock()
+
+
+def get_ledger(path: Optional[str] = None) -> SentLedger:
+    """
+    Return the shared ledger for ``path`` (the configured one by default).
+
+    A new, empty ledger is seeded once from an existing sent_log.xlsx so the
+    history kept in the spreadsheet is not lost.
+    """
+    path = path or get_sent_log_path()
+    with _ledgers_lock:
+        ledger = _ledgers.get(path)
+        if ledger is None:
+            ledger = SentLedger(path)
+            export_path = get_sent_log_export_path()
+            if ledger.is_empty() and os.path.exists(export_path):
+                imported = ledger.import_xlsx(export_path)
+                print(
+                    f"Imported {imported} rows from {export_path} into the sent ledger."
+                )
+            _ledgers[path] = ledger
+        return ledger
+
+
+def load_sent_log(path: Optional[str] = None) -> set:
+    return get_ledger(path).ids()
+
+
+def append_to_sent_log(entry_id: str, status: str, path: Optional[str] = None):
+    get_ledger(path).record(entry_id, status)
+
+
+def export_sent_log(xlsx_path: Optional[str] = None, path: Optional[str] = None) -> str:
+    """Export the ledger to sent_log.xlsx and return the path written."""
+    xlsx_path = xlsx_path or get_sent_log_export_path()
+    get_ledger(path).export_xlsx(xlsx_path)
+    return xlsx_path
@@ -1,5 +1,21 @@
+from typing import Iterator, NotRequired, TypedDict
+
 import pandas as pd
 
+from menu.utils.survey_schema import resolve_indexes
+
+
+class SurveyEntry(TypedDict):
+    id: str
+    name: str
+    email: str
+    career_coach: str
+    r1: str
+    r2: str
+    r3: str
+    # Microsoft Forms "Completion time"; only set when the column exists.
+    completion_time: NotRequired[object]
+
 
 def find_column(df, keyword: str) -> str:
     for col in df.columns:
@@ -8,30 +24,53 @@ def find_column(df, keyword: str) -> str:
     raise ValueError(f"Could not find column with keyword: '{keyword}'")
 
 
-def get_entries_for_unsent(df: pd.DataFrame, sent_ids: set) -> list[dict]:
-    col_interest = find_column(df, "upskilling")
-    col_motivation = find_column(df, "future training programs")
-    col_enrolled = find_column(df, "next period")
-    col_email = find_column(df, "email")
-    col_name = find_column(df, "name")
-    col_coach = find_column(df, "career coach")
-    col_id = find_column(df, "Id")
-
-    entries = []
-    for _, row in df.iterrows():
-        entry_id = str(row[col_id]).strip()
-        if entry_id in sent_ids:
-            continue  # skip if already sent
-
-        entry = {
-            "id": entry_id,
-            "name": str(row[col_name]).strip(),
-            "email": str(row[col_email]).strip(),
-            "career_coach": str(row[col_coach]).strip(),
-            "r1": str(row[col_interest]).strip() or "-",
-            "r2": str(row[col_motivation]).strip() or "-",
-            "r3": str(row[col_enrolled]).strip() or "-",
-        }
-        entries.append(entry)
-
-    return entries
+def _cell_text(value) -> str:
+    """Cell value as stripped text, with empty cells as "" rather than "nan"."""
+    if pd.isna(value):
+        return ""
+    return str(value).strip()
+
+
+def iter_unsent_entries(path: str, sent_ids: set) -> Iterator[SurveyEntry]:
+    """
+    Stream unsent entries straight from the workbook.
+
+    The sheet is read with openpyxl in read-only mode, limited to the span of
+    the columns the sender needs, and yields one entry per unsent row as
+    soon as it is parsed. Nothing but the current row is held in memory, so the
+    first entry is available immediately however large the survey grows.
+    Raises ValueError if a required column is missing.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        header = next(ws.iter_rows(max_row=1, values_only=True), ())
+        index = resolve_indexes(header)
+        first_col = min(index.values())
+        index = {field: i - first_col for field, i in index.items()}
+        rows = ws.iter_rows(
+            min_row=2,
+            min_col=first_col + 1,
+            max_col=first_col + max(index.values()) + 1,
+            values_only=True,
+        )
+        for row in rows:
+            entry_id = _cell_text(row[index["id"]])
+            if not entry_id or entry_id in sent_ids:
+                continue
+            entry = SurveyEntry(
+                id=entry_id,
+                name=_cell_text(row[index["name"]]),
+                email=_cell_text(row[index["email"]]),
+                career_coach=_cell_text(row[index["career_coach"]]),
+                r1=_cell_text(row[index["r1"]]) or "-",
+                r2=_cell_text(row[index["r2"]]) or "-",
+                r3=_cell_text(row[index["r3"]]) or "-",
+            )
+            if "completion_time" in index:
+                entry["completion_time"] = row[index["completion_time"]]
+            yield entry
+    finally:
+        wb.close()
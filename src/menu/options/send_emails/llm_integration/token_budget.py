@@ -0,0 +1,164 @@
+import json
+import math
+import os
+from typing import Optional
+
+from llm_core.generation import GenerationStats
+from menu.options.send_emails.llm_integration.normalization import ANSWER_FIELDS
+from menu.options.send_emails.llm_integration.prompt_builder import (
+    PROMPT_PREFIX,
+    build_prompt,
+    build_prompt_suffix,
+)
+from menu.utils.config_manager import get_data_dir
+
+BUDGET_DIRNAME = "token_budget"
+LENGTHS_FILENAME = "paragraph_lengths.json"
+CONTEXT_STEP = 256  # per-sequence contexts are sized in steps of this many tokens
+SAFETY_TOKENS = 8  # slack for merges across the prefix/suffix/answer boundaries
+TRUNCATION_MARK = "..."
+# Output cap learned from past paragraphs: p95 length plus headroom.
+LENGTH_HISTORY = 200
+MIN_HISTORY = 20
+OUTPUT_HEADROOM = 1.25
+OUTPUT_STEP = 16  # rounding, so the cap (part of the cache key) rarely moves
+MIN_OUTPUT_TOKENS = 64
+# Stop reasons that mean the model finished the paragraph on its own.
+NATURAL_STOPS = ("paragraph", "pattern", "stop", "eos")
+
+
+def fair_shares(lengths: list[int], budget: int) -> list[int]:
+    """
+    Split ``budget`` tokens between answers of ``lengths`` tokens.
+
+    Short answers keep everything; what they leave over is shared equally by
+    the longer ones, so one pasted CV is cut before a one-line answer is.
+    """
+    shares = [0] * len(lengths)
+    remaining = max(budget, 0)
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    for position, index in enumerate(order):
+        share = min(lengths[index], remaining // (len(order) - position))
+        shares[index] = share
+        remaining -= share
+    return shares
+
+
+class ParagraphLengths:
+    """Token counts of recently generated paragraphs, kept next to config.ini."""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(get_data_dir(BUDGET_DIRNAME), LENGTHS_FILENAME)
+        try:
+            with open(self.path) as f:
+                self.lengths: list[int] = json.load(f)
+        except (OSError, ValueError):
+            self.lengths = []
+
+    def add(self, stats: list[GenerationStats]):
+        lengths = [s.tokens for s in stats if s.stop_reason in NATURAL_STOPS]
+        if not lengths:
+            return
+        self.lengths = (self.lengths + lengths)[-LENGTH_HISTORY:]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.lengths, f)
+        os.replace(tmp_path, self.path)
+
+    def output_budget(self, ceiling: int) -> int:
+        """``max_tokens`` for the next generations: ``ceiling`` until enough history exists."""
+        if len(self.lengths) < MIN_HISTORY:
+            return ceiling
+        ordered = sorted(self.lengths)
+        p95 = ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+        budget = math.ceil(p95 * OUTPUT_HEADROOM / OUTPUT_STEP) * OUTPUT_STEP
+        return max(MIN_OUTPUT_TOKENS, min(budget, ceiling))
+
+
+class TokenBudget:
+    """
+    Fits prompts into a model's context and sizes the context to what they need.
+
+    Prompts are measured with the model's own tokenizer. A prompt longer than
+    ``n_ctx`` minus the output budget has its answers truncated with
+    ``fair_shares``; ``context_for`` then picks the smallest context (in
+    CONTEXT_STEP steps, at most ``n_ctx``) that holds a set of prompts plus
+    their output.
+    """
+
+    def __init__(self, tokenizer, n_ctx: int, max_tokens: int):
+        self.tokenizer = tokenizer
+        self.n_ctx = n_ctx
+        self.max_tokens = max_tokens
+        self.truncated = 0
+
+    @property
+    def prompt_limit(self) -> int:
+        return self.n_ctx - self.max_tokens - SAFETY_TOKENS
+
+    def count_prompt(self, answers: list[str]) -> int:
+        # The prefix is shared by every prompt, so it is tokenized once; +1 for BOS.
+        return (
+            1
+            + self.tokenizer.count(PROMPT_PREFIX)
+            + self.tokenizer.count(build_prompt_suffix(*answers))
+        )
+
+    def fit(self, entry: dict) -> tuple[str, int]:
+        """
+        Return the prompt for ``entry`` and its token count, truncating answers if needed.
+
+        The count never exceeds ``prompt_limit``. Raises ValueError if the
+        prompt does not fit even with every answer cut to TRUNCATION_MARK,
+        i.e. ``n_ctx`` is too small for the template and the output budget.
+        """
+        answers = [entry[field] for field in ANSWER_FIELDS]
+        n_tokens = self.count_prompt(answers)
+        if n_tokens <= self.prompt_limit:
+            return entry.get("prompt") or build_prompt(*answers), n_tokens
+
+        lengths = [self.tokenizer.count(answer) for answer in answers]
+        mark = self.tokenizer.count(TRUNCATION_MARK)
+        # Every answer longer than the mark cut down to it: the shortest prompt.
+        shortest = [
+            answer if length <= mark else TRUNCATION_MARK
+            for answer, length in zip(answers, lengths)
+        ]
+        shortest_tokens = self.count_prompt(shortest)
+        if shortest_tokens > self.prompt_limit:
+            raise ValueError(
+                f"The context ({self.n_ctx} tokens) is too small: the prompt template "
+                f"alone takes {shortest_tokens} tokens, but only {self.prompt_limit} "
+                f"are left after reserving {self.max_tokens} for the output. "
+                "Raise n_ctx in [Inference]."
+            )
+        overhead = n_tokens - sum(lengths)
+        budget = self.prompt_limit - overhead
+        for _ in range(3):
+            shares = fair_shares(lengths, budget - mark * len(answers))
+            fitted = [
+                (
+                    answer
+                    if share >= length
+                    else self.tokenizer.truncate(answer, share) + TRUNCATION_MARK
+                )
+                for answer, length, share in zip(answers, lengths, shares)
+            ]
+            n_tokens = self.count_prompt(fitted)
+            if n_tokens <= self.prompt_limit:
+                break
+            # Token boundaries moved at the cuts; tighten by the overshoot.
+            budget -= n_tokens - self.prompt_limit
+        else:
+            fitted, n_tokens = shortest, shortest_tokens
+        self.truncated += 1
+        print(
+            f"  Id {entry.get('id', '?')}: answers truncated to fit the context "
+            f"({sum(lengths) + overhead} -> {n_tokens} tokens)"
+        )
+        return build_prompt(*fitted), n_tokens
+
+    def context_for(self, prompt_tokens: list[int]) -> int:
+        """Smallest context (per sequence) that holds the longest prompt and its output."""
+        need = max(prompt_tokens, default=0) + self.max_tokens + 1
+        return min(self.n_ctx, math.ceil(need / CONTEXT_STEP) * CONTEXT_STEP)
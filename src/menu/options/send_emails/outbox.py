@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import re
+import socket
+import time
+from datetime import datetime
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+from email.utils import formatdate
+from typing import Optional
+
+from menu.utils.config_manager import get_data_dir
+
+OUTBOX_DIRNAME = "outbox"
+FAILED_DIRNAME = "failed"
+
+
+def _atomic_write(path: str, data: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _file_stem(entry_id: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", entry_id)[:40]
+    digest = hashlib.sha1(entry_id.encode("utf-8")).hexdigest()[:8]
+    return f"{safe}-{digest}"
+
+
+class Outbox:
+    """
+    Durable spool of rendered emails, one ``.eml`` plus ``.json`` metadata per survey Id.
+
+    Both files are written via a temp file, fsync and atomic rename, with the
+    metadata last: a message exists only once its metadata does, so a crash
+    mid-write leaves nothing half-queued. Messages are keyed on the survey Id,
+    so queueing the same Id twice is a no-op. The spool assumes one sending
+    process at a time.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or get_data_dir(OUTBOX_DIRNAME)
+        self.failed_directory = os.path.join(self.directory, FAILED_DIRNAME)
+        os.makedirs(self.failed_directory, exist_ok=True)
+
+    def _paths(self, entry_id: str, directory: Optional[str] = None):
+        base = os.path.join(directory or self.directory, _file_stem(entry_id))
+        return f"{base}.eml", f"{base}.json"
+
+    def contains(self, entry_id: str) -> bool:
+        return os.path.exists(self._paths(entry_id)[1])
+
+    def enqueue(
+        self, entry_id: str, to: str, cc: str, subject: str, html_body: str
+    ) -> bool:
+        """Spool a message for ``entry_id``; returns False if one is already queued."""
+        eml_path, meta_path = self._paths(entry_id)
+        if os.path.exists(meta_path):
+            return False
+        message = EmailMessage()
+        message["To"] = to
+        if cc:
+            message["Cc"] = cc
+        message["Subject"] = subject
+        message["Date"] = formatdate(localtime=True)
+        # Stable per Id, so a resend after a crash can be recognised as a duplicate.
+        message["Message-ID"] = f"<benchhub-{_file_stem(entry_id)}@{socket.getfqdn()}>"
+        message.set_content("This email is best viewed in an HTML capable client.")
+        message.add_alternative(html_body, subtype="html")
+        _atomic_write(eml_path, bytes(message))
+        meta = {
+            "id": entry_id,
+            "to": to,
+            "cc": cc,
+            "subject": subject,
+            "queued_at": datetime.now().isoformat(timespec="seconds"),
+            "attempts": 0,
+            "next_attempt": 0.0,
+            "last_error": "",
+        }
+        _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+        return True
+
+    def pending(self) -> list[dict]:
+        """Metadata of every queued message, oldest first."""
+        items = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "rb") as f:
+                    items.append(json.loads(f.read()))
+            except (OSError, ValueError):
+                continue
+        return sorted(items, key=lambda meta: meta["queued_at"])
+
+    def ids(self) -> set:
+        return {meta["id"] for meta in self.pending()}
+
+    def load(self, entry_id: str) -> tuple[dict, str]:
+        """
+        Return ``(metadata, html_body)`` for a queued message.
+
+        ``metadata["message_id"]`` is the Message-ID spooled with it.
+        """
+        eml_path, meta_path = self._paths(entry_id)
+        with open(meta_path, "rb") as f:
+            meta = json.loads(f.read())
+        with open(eml_path, "rb") as f:
+            message = message_from_bytes(f.read(), policy=policy.default)
+        html = message.get_body(preferencelist=("html",)).get_content()
+        meta["message_id"] = message["Message-ID"] or ""
+        return meta, html
+
+    def reschedule(self, entry_id: str, error: str, delay: float) -> dict:
+        """Record a failed attempt and when to try again."""
+        _, meta_path = self._paths(entry_id)
+        with open(meta_path, "rb") as f:
+            meta = json.loads(f.read())
+        meta["attempts"] += 1
+        meta["last_error"] = error
+        meta["next_attempt"] = time.time() + delay
+        _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+        return meta
+
+    def mark_delivered(self, entry_id: str):
+        """
+        Record that the transport accepted the message.
+
+        Written before the ledger and the removal, so if either of those fails
+        the message is finished later without being sent again.
+        """
+        _, meta_path = self._paths(entry_id)
+        with open(meta_path, "rb") as f:
+            meta = json.loads(f.read())
+        meta["delivered"] = True
+        _atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def remove(self, entry_id: str):
+        """Drop a delivered message."""
+        eml_path, meta_path = self._paths(entry_id)
+        # Metadata first: without it the message no longer counts as queued.
+        for path in (meta_path, eml_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def move_to_failed(self, entry_id: str):
+        """Park a message that will not be retried, keeping it for inspection."""
+        # Metadata first, so a crash in between never leaves a queued message
+        # without its body.
+        for src, dst in reversed(
+            list(
+                zip(self._paths(entry_id), self._paths(entry_id, self.failed_directory))
+            )
+        ):
+            if os.path.exists(src):
+                os.replace(src, dst)
@@ -0,0 +1,280 @@
+import heapq
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+from menu.options.send_emails.llm_integration.sent_log import (
+    append_to_sent_log,
+    get_ledger,
+)
+from menu.options.send_emails.outbox import Outbox
+from telemetry.recorder import stage
+
+
+class TokenBucket:
+    """
+    Allow ``rate`` acquisitions per second on average, with bursts of up to ``burst``.
+
+    A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop: Optional[threading.Event] = None) -> bool:
+        """Block until a token is available; returns False if ``stop`` was set meanwhile."""
+        if self.rate <= 0:
+            return True
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if stop is not None:
+                if stop.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+class OutboxSender:
+    """
+    Worker pool that drains an Outbox through a mail transport.
+
+    ``concurrency`` workers send in parallel, together limited to
+    ``rate_per_minute`` by a token bucket. A failed send is retried with
+    exponential backoff (``retry_base``, doubling up to ``retry_max`` seconds)
+    until ``max_attempts``; permanent failures stop at once. Errors before the
+    send (e.g. the ledger check) are retried the same way, and a message whose
+    spool files cannot be read is moved to failed. Once the transport has
+    accepted a message it is marked delivered and never sent again, even if
+    recording the outcome fails. Each outcome is
+    written to the sent ledger, which is also consulted before sending, so an
+    Id recorded as sent is never sent again. ``on_result(entry_id, error)`` is
+    called after every final outcome (error is None on success).
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        transport,
+        concurrency: int = 1,
+        rate_per_minute: float = 0,
+        max_attempts: int = 5,
+        retry_base: float = 2.0,
+        retry_max: float = 60.0,
+        on_result: Optional[Callable[[str, Optional[str]], None]] = None,
+        log_path: Optional[str] = None,
+    ):
+        self.outbox = outbox
+        self.transport = transport
+        self.concurrency = max(concurrency, 1)
+        self.bucket = TokenBucket(rate_per_minute / 60, burst=self.concurrency)
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.on_result = on_result
+        self.log_path = log_path
+        self._heap: list[tuple[float, int, str]] = []
+        self._queued: set[str] = set()
+        self._counter = 0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    def start(self):
+        """Start the workers and queue everything already waiting in the outbox."""
+        for meta in self.outbox.pending():
+            self._schedule(meta["id"], meta.get("next_attempt", 0.0))
+        for i in range(self.concurrency):
+            thread = threading.Thread(
+                target=self._work, name=f"outbox-sender-{i + 1}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, entry_id: str):
+        """Queue a message that was just written to the outbox."""
+        self._schedule(entry_id, 0.0)
+
+    def _schedule(self, entry_id: str, due: float):
+        with self._cond:
+            if entry_id in self._queued:
+                return
+            self._queued.add(entry_id)
+            self._counter += 1
+            heapq.heappush(self._heap, (due, self._counter, entry_id))
+            self._cond.notify()
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until nothing is queued or being sent; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._heap or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self):
+        """Stop the workers; unsent messages stay in the outbox for the next run."""
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _next(self) -> Optional[str]:
+        with self._cond:
+            while not self._stop.is_set():
+                if self._heap:
+                    due, _, entry_id = self._heap[0]
+                    wait = due - time.time()
+                    if wait <= 0:
+                        heapq.heappop(self._heap)
+                        self._queued.discard(entry_id)
+                        self._in_flight += 1
+                        return entry_id
+                    self._cond.wait(wait)
+                else:
+                    self._cond.wait()
+        return None
+
+    def _work(self):
+        on_start = getattr(self.transport, "on_thread_start", None)
+        if on_start is not None:
+            try:
+                on_start()
+            except Exception as e:
+                # Sends on this thread may still work; if not, they fail and retry.
+                print(
+                    f"Mail transport setup failed on {threading.current_thread().name}: {e}"
+                )
+        while True:
+            entry_id = self._next()
+            if entry_id is None:
+                return
+            try:
+                self._deliver(entry_id)
+            except Exception as e:
+                self._crashed(entry_id, e)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _deliver(self, entry_id: str):
+        if not self.outbox.contains(entry_id):
+            return
+        if get_ledger(self.log_path).contains(entry_id):
+            # Already has an outcome (e.g. the process died before removing the file).
+            self.outbox.remove(entry_id)
+            return
+        if not self.bucket.acquire(self._stop):
+            self._schedule(entry_id, 0.0)
+            return
+        meta, html = self.outbox.load(entry_id)
+        if meta.get("delivered"):
+            # Sent by an earlier attempt that could not record it; never resend.
+            self._finish(entry_id)
+            return
+        try:
+            with stage("mail.send"):
+                self.transport(
+                    to=meta["to"],
+                    cc=meta["cc"],
+                    subject=meta["subject"],
+                    html_body=html,
+                    message_id=meta["message_id"],
+                )
+        except Exception as e:
+            self._failed(entry_id, meta, e)
+            return
+        # The email is out: from here on nothing may lead to a retry.
+        try:
+            self.outbox.mark_delivered(entry_id)
+        except Exception as e:
+            print(f"Sent Id {entry_id}, but could not mark it delivered: {e}")
+        self._finish(entry_id)
+
+    def _finish(self, entry_id: str):
+        """Record a delivered message in the ledger and drop it from the outbox."""
+        try:
+            append_to_sent_log(entry_id, "Success", path=self.log_path)
+        except Exception as e:
+            # Kept in the outbox, marked delivered, so the next run records it.
+            print(f"Sent Id {entry_id}, but could not record it in the sent log: {e}")
+        else:
+            try:
+                self.outbox.remove(entry_id)
+            except Exception as e:
+                print(
+                    f"Sent Id {entry_id}, but could not remove it from the outbox: {e}"
+                )
+        self._report(entry_id, None)
+
+    def _crashed(self, entry_id: str, error: Exception):
+        """
+        Handle an error outside the send itself (a corrupt spool file, the
+        ledger check, ``on_result``) so the worker lives on and ``drain``
+        returns. A message already delivered is never retried.
+        """
+        print(f"Error while delivering Id {entry_id}: {error!r}")
+        try:
+            if not self.outbox.contains(entry_id):
+                return  # Already delivered or parked; nothing left to retry.
+            try:
+                meta, _ = self.outbox.load(entry_id)
+            except Exception:
+                # The spooled message is unreadable; no retry can fix that.
+                self._give_up(entry_id, error)
+                return
+            if meta.get("delivered"):
+                return  # Already sent; the next run only records it.
+            self._failed(entry_id, meta, error)
+        except Exception as e:
+            print(
+                f"Could not record the failure of Id {entry_id} ({e}); "
+                "it stays in the outbox for the next run."
+            )
+
+    def _give_up(self, entry_id: str, error: Exception):
+        append_to_sent_log(entry_id, f"Failed: {error}", path=self.log_path)
+        self.outbox.move_to_failed(entry_id)
+        self._report(entry_id, str(error))
+
+    def _failed(self, entry_id: str, meta: dict, error: Exception):
+        attempts = meta["attempts"] + 1
+        is_permanent = getattr(self.transport, "is_permanent", lambda e: False)
+        if attempts >= self.max_attempts or is_permanent(error):
+            self._give_up(entry_id, error)
+            return
+        delay = min(self.retry_base * 2 ** (attempts - 1), self.retry_max)
+        meta = self.outbox.reschedule(entry_id, str(error), delay)
+        print(
+            f"Send to Id {entry_id} failed ({error}); retry {attempts} of "
+            f"{self.max_attempts - 1} in {delay:.1f}s"
+        )
+        self._schedule(entry_id, meta["next_attempt"])
+
+    def _report(self, entry_id: str, error: Optional[str]):
+        if error is None:
+            print(f"Sent email for Id {entry_id} at {datetime.now():%H:%M:%S}")
+        else:
+            print(f"Failed to send email to Id {entry_id}: {error}")
+        if self.on_result is not None:
+            self.on_result(entry_id, error)
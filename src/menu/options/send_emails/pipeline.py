@@ -0,0 +1,175 @@
+import queue
+import threading
+from typing import Callable, Iterable, Optional
+
+from telemetry.profiling import profile_entries
+from telemetry.recorder import stage as timed_stage
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline, run on its own thread.
+
+    Args:
+        name (str): Label used for queue depth reporting.
+        fn (callable): Called with one item (or a list of items when ``batch_size`` > 1).
+            Items are dicts that ``fn`` updates in place; its return value is ignored.
+        batch_size (int): Maximum number of already-queued items handed to ``fn`` at once.
+        handles_errors (bool): Whether items that failed in an earlier stage are passed
+            to ``fn``. Otherwise they are forwarded untouched.
+        on_start (callable, optional): Called once on each stage thread before any item,
+            e.g. to initialise COM for Outlook.
+        workers (int): Number of threads pulling from the stage's queue, e.g. one per
+            pooled SMTP connection. Items may leave the stage out of order when > 1.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        batch_size: int = 1,
+        handles_errors: bool = False,
+        on_start: Optional[Callable] = None,
+        workers: int = 1,
+    ):
+        if workers < 1:
+            raise ValueError("A stage needs at least one worker.")
+        self.name = name
+        self.fn = fn
+        self.batch_size = batch_size
+        self.handles_errors = handles_errors
+        self.on_start = on_start
+        self.workers = workers
+
+
+class Pipeline:
+    """
+    Runs stages concurrently, connected by bounded queues.
+
+    Each stage pulls from its own input queue and pushes to the next one, so a
+    slow stage only blocks its producers once its queue is full. An exception
+    raised by a stage is stored under the item's ``"error"`` key (with the stage
+    name under ``"failed_stage"``) and the item keeps flowing so later stages (e.g. logging) can still see it.
+    Every stage call is timed as ``pipeline.<name>`` in the current telemetry run.
+    """
+
+    def __init__(self, stages: list[Stage], maxsize: int = 8):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage.")
+        self.stages = stages
+        self._queues = [queue.Queue(maxsize=maxsize) for _ in stages]
+        self._results: list[dict] = []
+        self._source_error: Optional[BaseException] = None
+        self._running = [stage.workers for stage in stages]
+        self._running_lock = threading.Lock()
+
+    def depths(self) -> dict[str, int]:
+        """Number of items currently waiting in front of each stage."""
+        return {stage.name: q.qsize() for stage, q in zip(self.stages, self._queues)}
+
+    def format_depths(self) -> str:
+        return " ".join(f"{name}={depth}" for name, depth in self.depths().items())
+
+    def run(self, source: Iterable[dict]) -> list[dict]:
+        """Feed every item from ``source`` through all stages and return the finished items."""
+        threads = [
+            threading.Thread(
+                target=self._feed, args=(source,), name="pipeline-source", daemon=True
+            )
+        ]
+        for index, stage in enumerate(self.stages):
+            for worker in range(stage.workers):
+                suffix = f"-{worker + 1}" if stage.workers > 1 else ""
+                threads.append(
+                    threading.Thread(
+                        target=self._work,
+                        args=(index,),
+                        name=f"pipeline-{stage.name}{suffix}",
+                        daemon=True,
+                    )
+                )
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        if self._source_error is not None:
+            raise self._source_error
+        return self._results
+
+    def _feed(self, source: Iterable[dict]):
+        try:
+            for item in source:
+                self._queues[0].put(item)
+        except BaseException as e:
+            self._source_error = e
+        finally:
+            self._queues[0].put(_DONE)
+
+    def _work(self, index: int):
+        stage = self.stages[index]
+        inbox = self._queues[index]
+        start_error = None
+        if stage.on_start is not None:
+            try:
+                stage.on_start()
+            except Exception as e:
+                start_error = e
+        done = False
+        while not done:
+            batch = []
+            item = inbox.get()
+            if item is _DONE:
+                break
+            batch.append(item)
+            while len(batch) < stage.batch_size:
+                try:
+                    item = inbox.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _DONE:
+                    done = True
+                    break
+                batch.append(item)
+            if start_error is not None:
+                for item in batch:
+                    _mark_failed(item, stage, start_error)
+            else:
+                self._process(stage, batch)
+            for item in batch:
+                self._emit(index, item)
+        with self._running_lock:
+            self._running[index] -= 1
+            last = self._running[index] == 0
+        if last:
+            self._emit(index, _DONE)
+        else:
+            inbox.put(_DONE)  # Let the stage's other workers see the end too.
+
+    def _process(self, stage: Stage, batch: list[dict]):
+        todo = [item for item in batch if stage.handles_errors or "error" not in item]
+        if todo:
+            ids = [item.get("id") for item in todo]
+            try:
+                with timed_stage(f"pipeline.{stage.name}", items=len(todo)):
+                    with profile_entries(ids, stage.name):
+                        if stage.batch_size > 1:
+                            stage.fn(todo)
+                        else:
+                            stage.fn(todo[0])
+            except Exception as e:
+                for item in todo:
+                    _mark_failed(item, stage, e)
+
+    def _emit(self, index: int, item):
+        if index + 1 < len(self._queues):
+            self._queues[index + 1].put(item)
+        elif item is not _DONE:
+            self._results.append(item)
+
+
+def _mark_failed(item: dict, stage: Stage, error: BaseException):
+    if "error" not in item:
+        item["error"] = str(error)
+        item["failed_stage"] = stage.name
@@ -0,0 +1,239 @@
+import queue
+import smtplib
+import socket
+import ssl
+import threading
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from typing import Optional
+
+from menu.utils.config_manager import get_mail_settings
+
+
+class MailTransport:
+    """
+    Delivers one email at a time; subclasses implement ``send``.
+
+    ``message_id`` is the stable Message-ID the outbox gave the email, so a
+    resend after a crash carries the same one; transports that can set the
+    header use it. ``concurrency`` is how many sends may run in parallel, and
+    ``on_thread_start`` runs once on each sending thread before its first
+    send. ``is_permanent`` tells the outbox sender which errors are not worth
+    retrying. A transport is also callable with those keyword arguments, so
+    plain functions and transports are interchangeable.
+    """
+
+    concurrency = 1
+
+    def send(
+        self, to: str, cc: str, subject: str, html_body: str, message_id: str = ""
+    ):
+        raise NotImplementedError
+
+    def is_permanent(self, error: Exception) -> bool:
+        return False
+
+    def on_thread_start(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __call__(
+        self, to: str, cc: str, subject: str, html_body: str, message_id: str = ""
+    ):
+        self.send(
+            to=to, cc=cc, subject=subject, html_body=html_body, message_id=message_id
+        )
+
+
+class OutlookTransport(MailTransport):
+    """
+    Sends through the local Outlook client over COM (Windows only).
+
+    The Outlook.Application dispatch is created once per sending thread and
+    reused, instead of one COM round-trip per email. Outlook assigns its own
+    Message-ID, so ``message_id`` is not used.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def on_thread_start(self):
+        # Outlook automation needs COM initialised on the thread that dispatches it.
+        try:
+            import pythoncom
+        except ImportError:
+            return
+        pythoncom.CoInitialize()
+
+    def _outlook(self):
+        outlook = getattr(self._local, "outlook", None)
+        if outlook is None:
+            import win32com.client as win32
+
+            outlook = self._local.outlook = win32.Dispatch("Outlook.Application")
+        return outlook
+
+    def send(
+        self, to: str, cc: str, subject: str, html_body: str, message_id: str = ""
+    ):
+        mail = self._outlook().CreateItem(0)
+        mail.To = to
+        mail.CC = cc
+        mail.Subject = subject
+        mail.HTMLBody = html_body
+        mail.Send()
+
+
+class SMTPTransport(MailTransport):
+    """
+    Sends over SMTP through a pool of persistent, authenticated connections.
+
+    Up to ``max_connections`` connections are opened lazily and reused for
+    every following message, and the pipeline sends on that many threads at
+    once. A connection the server dropped is reopened and the message retried
+    once.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int = 587,
+        sender: str = "",
+        username: str = "",
+        password: str = "",
+        starttls: bool = True,
+        use_ssl: bool = False,
+        max_connections: int = 4,
+        timeout: float = 30.0,
+    ):
+        if not host:
+            raise ValueError("SMTP host is not configured.")
+        if max_connections < 1:
+            raise ValueError("max_connections must be at least 1.")
+        self.host = host
+        self.port = port
+        self.sender = sender or username
+        if not self.sender:
+            raise ValueError("SMTP sender address is not configured.")
+        self.username = username
+        self.password = password
+        self.starttls = starttls and not use_ssl
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.concurrency = max_connections
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        self._open: list[smtplib.SMTP] = []
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        context = ssl.create_default_context()
+        if self.use_ssl:
+            conn = smtplib.SMTP_SSL(
+                self.host, self.port, timeout=self.timeout, context=context
+            )
+        else:
+            conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                conn.starttls(context=context)
+        if self.username:
+            conn.login(self.username, self.password)
+        with self._lock:
+            self._open.append(conn)
+            self.connections_opened += 1
+        return conn
+
+    def _discard(self, conn: smtplib.SMTP):
+        with self._lock:
+            if conn in self._open:
+                self._open.remove(conn)
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+    def build_message(
+        self, to: str, cc: str, subject: str, html_body: str, message_id: str = ""
+    ) -> EmailMessage:
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = to
+        if cc:
+            message["Cc"] = cc
+        message["Subject"] = subject
+        message["Date"] = formatdate(localtime=True)
+        message["Message-ID"] = message_id or make_msgid(domain=socket.getfqdn())
+        message.set_content("This email is best viewed in an HTML capable client.")
+        message.add_alternative(html_body, subtype="html")
+        return message
+
+    def send(
+        self, to: str, cc: str, subject: str, html_body: str, message_id: str = ""
+    ):
+        message = self.build_message(to, cc, subject, html_body, message_id)
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                try:
+                    conn.send_message(message)
+                except smtplib.SMTPServerDisconnected:
+                    self._discard(conn)
+                    conn = self._connect()
+                    conn.send_message(message)
+            except (
+                smtplib.SMTPRecipientsRefused,
+                smtplib.SMTPSenderRefused,
+                smtplib.SMTPDataError,
+            ):
+                # smtplib has already reset the transaction; the connection is fine.
+                self._idle.put(conn)
+                raise
+            except BaseException:
+                # The connection may be mid-transaction; never hand it out again.
+                self._discard(conn)
+                raise
+            self._idle.put(conn)
+
+    def is_permanent(self, error: Exception) -> bool:
+        # Refused recipients and 5xx replies fail the same way on every attempt.
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return True
+        code = getattr(error, "smtp_code", 0)
+        return isinstance(code, int) and 500 <= code < 600
+
+    def close(self):
+        with self._lock:
+            conns, self._open = self._open, []
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        for conn in conns:
+            try:
+                conn.quit()
+            except (smtplib.SMTPException, OSError):
+                conn.close()
+
+
+def get_transport(settings: Optional[dict] = None) -> MailTransport:
+    """Build the transport selected by ``transport`` in the [Mail] section of config.ini."""
+    settings = settings or get_mail_settings()
+    kind = settings["transport"].lower()
+    if kind == "outlook":
+        return OutlookTransport()
+    if kind == "smtp":
+        return SMTPTransport(
+            host=settings["smtp_host"],
+            port=int(settings["smtp_port"]),
+            sender=settings["sender"],
+            username=settings["smtp_username"],
+            password=settings["smtp_password"],
+            starttls=settings["smtp_starttls"],
+            use_ssl=settings["smtp_ssl"],
+            max_connections=int(settings["max_connections"]),
+        )
+    raise ValueError(f"Unknown mail transport '{kind}' (expected outlook or smtp).")
@@ -13,13 +13,25 @@ def get_config_path():
     return os.path.join(config_dir, CONFIG_FILENAME)
 
 
+def get_data_dir(name):
+    """Get (and create) a named data folder next to config.ini."""
+    data_dir = os.path.join(os.path.dirname(get_config_path()), name)
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+
 def load_config():
     """Load config.ini or create it with defaults if not exists."""
     config_path = get_config_path()
     config = configparser.ConfigParser()
 
     if not os.path.exists(config_path):
-        config["Paths"] = {"llm_model_path": "", "survey_path": ""}
+        config["Paths"] = {
+            "llm_model_path": "",
+            "survey_path": "",
+            "sent_log_path": "",
+            "sent_log_export_path": "",
+        }
         with open(config_path, "w") as f:
             config.write(f)
     else:
@@ -44,3 +56,130 @@ def get_survey_path():
     """Get the survey file path from the config."""
     config = load_config()
     return config.get("Paths", "survey_path")
+
+
+def get_sent_log_path():
+    """Get the sent ledger path, defaulting to sent_log.db next to config.ini."""
+    config = load_config()
+    path = config.get("Paths", "sent_log_path", fallback="")
+    return path or os.path.join(os.path.dirname(get_config_path()), "sent_log.db")
+
+
+def get_sent_log_export_path():
+    """Get the sent_log.xlsx export path, defaulting to the survey file's folder."""
+    config = load_config()
+    path = config.get("Paths", "sent_log_export_path", fallback="")
+    if path:
+        return path
+    survey_path = config.get("Paths", "survey_path", fallback="")
+    base_dir = (
+        os.path.dirname(survey_path)
+        if survey_path
+        else os.path.dirname(get_config_path())
+    )
+    return os.path.join(base_dir, "sent_log.xlsx")
+
+
+def get_stop_patterns():
+    """Get extra stop patterns (one regex per line) from the [Generation] section."""
+    config = load_config()
+    value = config.get("Generation", "stop_patterns", fallback="")
+    return [line.strip() for line in value.splitlines() if line.strip()]
+
+
+def get_metrics_textfile_path():
+    """Get the Prometheus textfile path, defaulting to the telemetry data folder."""
+    config = load_config()
+    path = config.get("Telemetry", "textfile_path", fallback="")
+    return path or os.path.join(get_data_dir("telemetry"), "benchhub.prom")
+
+
+INFERENCE_DEFAULTS = {
+    "n_threads": "6",
+    "n_ctx": "auto",
+    "n_batch": "512",
+    "use_mmap": "yes",
+    "use_mlock": "no",
+    "workers": "1",
+    "threads_per_worker": "4",
+    "speculative": "off",
+    "draft_model_path": "",
+    "draft_tokens": "8",
+    "speculative_min_acceptance": "0.3",
+}
+INFERENCE_FLAGS = ("use_mmap", "use_mlock")
+INFERENCE_TEXT = ("speculative", "draft_model_path")
+INFERENCE_FLOATS = ("speculative_min_acceptance",)
+
+
+def get_inference_settings():
+    """
+    Get the [Inference] section merged over INFERENCE_DEFAULTS.
+
+    Flags are returned as booleans, the speculative mode and draft model
+    path as text, and everything else as numbers. ``workers`` may be
+    ``auto`` (returned as 0): one worker process per ``threads_per_worker``
+    physical cores. ``n_ctx`` may be ``auto`` (0, the default): the model's
+    trained context, capped (see llm_core.gguf.default_n_ctx).
+    """
+    config = load_config()
+    section = config["Inference"] if config.has_section("Inference") else {}
+    settings = {}
+    for key, value in INFERENCE_DEFAULTS.items():
+        raw = str(section.get(key, value)).strip()
+        if key in INFERENCE_TEXT:
+            settings[key] = raw
+        elif key in INFERENCE_FLOATS:
+            settings[key] = float(raw)
+        elif key in INFERENCE_FLAGS:
+            settings[key] = raw.lower() in ("1", "yes", "true", "on")
+        else:
+            settings[key] = 0 if raw.lower() == "auto" else int(raw)
+    return settings
+
+
+def save_inference_settings(values):
+    """Write ``values`` into the [Inference] section, keeping any other keys."""
+    config = load_config()
+    if not config.has_section("Inference"):
+        config.add_section("Inference")
+    for key, value in values.items():
+        if isinstance(value, bool):
+            value = "yes" if value else "no"
+        config["Inference"][key] = str(value)
+    save_config(config)
+
+
+MAIL_DEFAULTS = {
+    "transport": "outlook",
+    "sender": "",
+    "smtp_host": "",
+    "smtp_port": "587",
+    "smtp_username": "",
+    "smtp_password": "",
+    "smtp_starttls": "yes",
+    "smtp_ssl": "no",
+    "max_connections": "4",
+    "rate_per_minute": "0",
+    "max_attempts": "5",
+    "retry_base_seconds": "2",
+    "retry_max_seconds": "60",
+}
+
+
+def get_mail_settings():
+    """
+    Get the [Mail] section merged over MAIL_DEFAULTS.
+
+    The SMTP password may be left out of config.ini and supplied through the
+    BENCHHUB_SMTP_PASSWORD environment variable instead.
+    """
+    config = load_config()
+    section = config["Mail"] if config.has_section("Mail") else {}
+    settings = {key: section.get(key, value) for key, value in MAIL_DEFAULTS.items()}
+    settings["smtp_password"] = settings["smtp_password"] or os.getenv(
+        "BENCHHUB_SMTP_PASSWORD", ""
+    )
+    for key in ("smtp_starttls", "smtp_ssl"):
+        settings[key] = settings[key].strip().lower() in ("1", "yes", "true", "on")
+    return settings
@@ -1,18 +1,10 @@
-import sys
-import os
+from menu.utils.terminal import clear_screen
 
 # Orange ANSI escape code
 ORANGE = "\033[38;2;255;140;0m"
 RESET = "\033[0m"
 
-
-def get_logo():
-    if sys.platform.startswith("win"):
-        os.system("cls")
-    else:
-        os.system("clear")
-    print(
-        f"""
+LOGO = f"""
 {ORANGE}                  __
   ___  ____  ____/ /___ __   ______ _
  / _ \/ __ \/ __  / __ `/ | / / __ `/
@@ -22,4 +14,9 @@ def get_logo():
                                 BenchHub LLM Integration
 
 """
-    )
+
+
+def get_logo():
+    """Clear the screen with an ANSI escape (no shell process) and print the logo."""
+    clear_screen()
+    print(LOGO)
@@ -1,36 +1,88 @@
-import msvcrt
-from menu.utils.logo import get_logo
+from dataclasses import dataclass
+from typing import Callable, Optional, Union
 
+from menu.utils.logo import LOGO, get_logo
+from menu.utils.terminal import Screen, read_key
 
-def menu_builder(title, menu_items, header=None):
+# Returned by a callback to close the menu it was chosen from.
+BACK = "back"
+
+_screen = Screen()
+
+
+@dataclass
+class Menu:
+    title: str
+    items: list
+    header: Union[str, Callable[[], str], None] = None
+
+    def header_text(self) -> Optional[str]:
+        return self.header() if callable(self.header) else self.header
+
+
+def back():
+    return BACK
+
+
+def menu_builder(title, menu_items, header=None) -> Menu:
     """
-    Displays an interactive terminal menu based on a list of items with associated callbacks.
+    Builds a terminal menu from a list of items with associated callbacks.
 
     Args:
         title (str): The title to display above the menu.
         menu_items (list of dict): Each item must have 'label' and 'callback' keys.
-        header (str, optional): Text to display under the logo and above the title.
+            A callback returns None to come back to this menu, BACK to close it,
+            or another Menu to open on top of it.
+        header (str or callable, optional): Text to display under the logo and
+            above the title. A callable is called every time the menu is shown.
     """
-    selected = 0
+    return Menu(title, menu_items, header)
+
+
+def choose(menu: Menu, selected: int = 0) -> int:
+    """Show ``menu`` until Enter is pressed and return the selected index."""
+    header = menu.header_text()
     while True:
+        lines = [LOGO]
+        if header:
+            lines.append(header)
+        lines.append(f"\n{menu.title}")
+        for idx, item in enumerate(menu.items):
+            prefix = "-> " if idx == selected else "   "
+            lines.append(f"{prefix}{idx + 1}. {item['label']}")
+        lines.append("\nUse Up/Down arrows to move, Enter to select.")
+        _screen.draw("\n".join(lines))
+
+        key = read_key()
+        if key == "up":
+            selected = (selected - 1) % len(menu.items)
+        elif key == "down":
+            selected = (selected + 1) % len(menu.items)
+        elif key == "enter":
+            return selected
+
+
+def run_menu(menu: Menu):
+    """
+    Run ``menu`` and every menu opened from it in a single loop.
+
+    Open menus are kept on a stack with their selected item, so going back
+    returns to the same place, and a long session never grows the call
+    stack. Returns when the last menu is closed.
+    """
+    stack = [[menu, 0]]
+    while stack:
+        current = stack[-1]
+        current[1] = choose(*current)
+        menu = current[0]
         get_logo()
+        header = menu.header_text()
         if header:
             print(header)
-        print(f"\n{title}")
-        for idx, item in enumerate(menu_items):
-            prefix = "-> " if idx == selected else "   "
-            print(f"{prefix}{idx + 1}. {item['label']}")
-        print("\nUse Up/Down arrows to move, Enter to select.")
-
-        key = msvcrt.getch()
-        if key == b"\xe0":
-            key2 = msvcrt.getch()
-            if key2 == b"H":
-                selected = (selected - 1) % len(menu_items)
-            elif key2 == b"P":
-                selected = (selected + 1) % len(menu_items)
-        elif key == b"\r":
-            get_logo()
-            if header:
-                print(header)
-            return menu_items[selected]["callback"]()
+        result = menu.items[current[1]]["callback"]()
+        # The callback printed to the terminal; the next frame starts afresh.
+        _screen.invalidate()
+        if result == BACK:
+            stack.pop()
+        elif isinstance(result, Menu):
+            stack.append([result, 0])
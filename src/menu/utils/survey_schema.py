@@ -0,0 +1,324 @@
+from dataclasses import dataclass, field as dataclass_field
+from functools import lru_cache
+from typing import Optional
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+@dataclass(frozen=True)
+class SurveyColumn:
+    """
+    One column of the Microsoft Forms export.
+
+    ``keywords`` locate the column when Forms rewords the question: a header
+    matches when it contains a keyword (case-insensitive), exactly like
+    survey_parser.find_column. ``field`` is the logical field the app reads
+    from the column, if any; an ``optional`` field is resolved when present
+    but not required by every consumer.
+    """
+
+    title: str
+    keywords: tuple
+    field: Optional[str] = None
+    optional: bool = False
+
+
+SURVEY_COLUMNS = (
+    SurveyColumn("Id", ("Id",), "id"),
+    SurveyColumn("Start time", ("start time",)),
+    SurveyColumn(
+        "Completion time", ("completion time",), "completion_time", optional=True
+    ),
+    SurveyColumn("Email", ("email",), "email"),
+    SurveyColumn("Name", ("name",), "name"),
+    SurveyColumn(
+        "Please choose the office location you are assigned to.\n",
+        ("office location",),
+        "office",
+        optional=True,
+    ),
+    SurveyColumn(
+        "Please provide your Career Coach's email address in the space below.\n",
+        ("career coach",),
+        "career_coach",
+    ),
+    SurveyColumn(
+        "Which areas of upskilling are you most interested in? (You can select multiple options)\n",
+        ("upskilling",),
+        "r1",
+    ),
+    # Older workbooks had a "next period" question; the current form asks
+    # whether the person is currently engaged in training.
+    SurveyColumn(
+        "Are you currently engaged in any training, certifications, or testing activities?\n",
+        ("next period", "currently engaged in any training"),
+        "r3",
+    ),
+    SurveyColumn(
+        "If yes, please specify the type of training or certification you're currently engaged with.\n",
+        ("type of training",),
+    ),
+    SurveyColumn(
+        "Are there any specific topics or skills you would like to focus on in future training programs?\n",
+        ("future training programs",),
+        "r2",
+    ),
+    SurveyColumn(
+        "Would you be open to sharing your expertise by leading training sessions within your field of knowledge?\n",
+        ("sharing your expertise",),
+    ),
+    SurveyColumn(
+        (
+            "Would you be interested in joining Keystone MarketPlace Romania in the future?\n"
+            "https://confluence.endava.com/spaces/CTO/pages/577044538/KMP+in+Romania"
+        ),
+        ("keystone",),
+    ),
+    SurveyColumn(
+        "Do you feel you have enough information or clarity regarding your next steps during bench period?\n",
+        ("next steps",),
+    ),
+    SurveyColumn("Send Email", ("send email",)),
+)
+REQUIRED_COLUMNS = [column.title for column in SURVEY_COLUMNS]
+SURVEY_TITLES = frozenset(REQUIRED_COLUMNS)
+# The columns the sender and the preview read.
+FIELD_COLUMNS = tuple(column for column in SURVEY_COLUMNS if column.field)
+
+# Logical field -> keywords locating its column; the first header that
+# matches the first matching keyword wins.
+FIELD_KEYWORDS = {
+    column.field: column.keywords
+    for column in SURVEY_COLUMNS
+    if column.field and not column.optional
+}
+OPTIONAL_FIELD_KEYWORDS = {
+    column.field: column.keywords for column in SURVEY_COLUMNS if column.optional
+}
+
+
+def _find(lowered: list, keywords: tuple):
+    for keyword in keywords:
+        for i, col in enumerate(lowered):
+            if keyword.lower() in col:
+                return i
+    return None
+
+
+@lru_cache(maxsize=32)
+def _resolve(header: tuple) -> tuple:
+    lowered = [str(col).lower() if col is not None else "" for col in header]
+    resolved = []
+    for field, keywords in FIELD_KEYWORDS.items():
+        index = _find(lowered, keywords)
+        if index is None:
+            raise ValueError(f"Could not find column with keyword: '{keywords[0]}'")
+        resolved.append((field, index))
+    for field, keywords in OPTIONAL_FIELD_KEYWORDS.items():
+        index = _find(lowered, keywords)
+        if index is not None:
+            resolved.append((field, index))
+    return tuple(resolved)
+
+
+def resolve_indexes(header) -> dict[str, int]:
+    """
+    Map every logical field (plus any optional field present) to its column
+    position in ``header``.
+
+    The result is cached per distinct header, so resolving the same workbook
+    again is a dictionary lookup. Raises ValueError if a field has no column.
+    """
+    return dict(_resolve(tuple(header)))
+
+
+def _label(title: str) -> str:
+    """First line of a column title (some questions carry a link on a second line)."""
+    return title.strip().split("\n")[0]
+
+
+@dataclass
+class SchemaReport:
+    """
+    How a survey header compares to the expected columns.
+
+    ``renamed`` maps an expected title to the header found for it by
+    keyword; ``extra`` lists headers that match no expected column and
+    ``absent`` the optional columns the header does not have. Only
+    ``missing`` columns make the survey unusable.
+    """
+
+    missing: list[str] = dataclass_field(default_factory=list)
+    absent: list[str] = dataclass_field(default_factory=list)
+    renamed: dict[str, str] = dataclass_field(default_factory=dict)
+    extra: list[str] = dataclass_field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing
+
+    def describe(self) -> str:
+        lines = []
+        if self.missing:
+            lines.append("Missing required columns:")
+            lines += [f"  - {_label(title)}" for title in self.missing]
+        if self.absent:
+            lines.append("Optional columns not present:")
+            lines += [f"  - {_label(title)}" for title in self.absent]
+        if self.renamed:
+            lines.append("Columns found under a different header:")
+            lines += [
+                f"  - {_label(title)} -> {_label(header)}"
+                for title, header in self.renamed.items()
+            ]
+        if self.extra:
+            lines.append("Extra columns (ignored):")
+            lines += [f"  - {_label(header)}" for header in self.extra]
+        return "\n".join(lines)
+
+
+def validate_header(header, columns=SURVEY_COLUMNS) -> SchemaReport:
+    """
+    Compare ``header`` with ``columns``.
+
+    Exact titles match first. A column without one is matched by keyword
+    against the headers no expected column claimed, so a reworded question
+    is reported as renamed rather than missing. An optional column that is
+    not found is reported as absent, which does not fail the check.
+    """
+    headers = [str(col) for col in header if col is not None and str(col).strip()]
+    titles = {column.title for column in columns}
+    unclaimed = [h for h in headers if h not in titles]
+    # A header that is exactly another known question (e.g. "Send Email") is
+    # never a rewording of this one, even when ``columns`` leaves it out.
+    candidates = [h for h in unclaimed if h not in SURVEY_TITLES]
+    report = SchemaReport()
+    for column in columns:
+        if column.title in headers:
+            continue
+        match = next(
+            (
+                h
+                for keyword in column.keywords
+                for h in candidates
+                if keyword.lower() in h.lower()
+            ),
+            None,
+        )
+        if match is None and column.optional:
+            report.absent.append(column.title)
+        elif match is None:
+            report.missing.append(column.title)
+        else:
+            report.renamed[column.title] = match
+            unclaimed.remove(match)
+            candidates.remove(match)
+    report.extra = unclaimed
+    return report
+
+
+def _column_index(ref: str) -> int:
+    """0-based column of a cell reference such as "C1"."""
+    index = 0
+    for char in ref:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - ord("A") + 1
+    return index - 1
+
+
+def _first_sheet_path(archive) -> str:
+    import xml.etree.ElementTree as ET
+
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    sheet = workbook.find(f"{MAIN_NS}sheets/{MAIN_NS}sheet")
+    rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.iter(f"{PACKAGE_REL_NS}Relationship"):
+        if rel.get("Id") == sheet.get(f"{REL_NS}id"):
+            target = rel.get("Target")
+            return target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    return "xl/worksheets/sheet1.xml"
+
+
+def _string_text(item) -> str:
+    # Plain text is one <t>; rich text is split over <r><t> runs. Phonetic
+    # hints (<rPh>) are not part of the text.
+    parts = []
+    for child in item:
+        if child.tag == f"{MAIN_NS}t":
+            parts.append(child.text or "")
+        elif child.tag == f"{MAIN_NS}r":
+            parts.append(child.findtext(f"{MAIN_NS}t") or "")
+    return "".join(parts)
+
+
+def _shared_strings(archive, needed: int) -> list[str]:
+    """The first ``needed`` entries of the shared-strings table, streamed."""
+    import xml.etree.ElementTree as ET
+
+    strings = []
+    if needed <= 0 or "xl/sharedStrings.xml" not in archive.namelist():
+        return strings
+    with archive.open("xl/sharedStrings.xml") as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == f"{MAIN_NS}si":
+                strings.append(_string_text(elem))
+                elem.clear()
+                if len(strings) >= needed:
+                    break
+    return strings
+
+
+def read_header(path: str) -> tuple:
+    """
+    Return the first row of the survey workbook, parsing nothing after it.
+
+    The sheet XML is streamed only up to the end of row 1, and the
+    shared-strings table only up to the last string the header uses, so the
+    cost does not grow with the number of responses (openpyxl's read-only
+    mode still loads every shared string up front).
+    """
+    import xml.etree.ElementTree as ET
+    import zipfile
+
+    with zipfile.ZipFile(path) as archive:
+        cells = {}
+        with archive.open(_first_sheet_path(archive)) as f:
+            for _, elem in ET.iterparse(f):
+                if elem.tag != f"{MAIN_NS}row":
+                    continue
+                if elem.get("r", "1") != "1":
+                    break
+                for position, cell in enumerate(elem.iter(f"{MAIN_NS}c")):
+                    ref = cell.get("r")
+                    index = _column_index(ref) if ref else position
+                    kind = cell.get("t")
+                    inline = cell.find(f"{MAIN_NS}is")
+                    if inline is not None:
+                        value = _string_text(inline)
+                    else:
+                        value = cell.findtext(f"{MAIN_NS}v")
+                    cells[index] = (kind, value)
+                break
+        shared = [int(v) for kind, v in cells.values() if kind == "s" and v]
+        strings = _shared_strings(archive, max(shared, default=-1) + 1)
+
+    header = [None] * (max(cells, default=-1) + 1)
+    for index, (kind, value) in cells.items():
+        if kind == "s" and value:
+            header[index] = strings[int(value)]
+        elif kind == "b":
+            header[index] = value == "1"
+        elif kind in (None, "n") and value is not None:
+            number = float(value)
+            header[index] = int(number) if number.is_integer() else number
+        else:
+            header[index] = value
+    return tuple(header)
+
+
+def validate_survey(path: str, columns=SURVEY_COLUMNS) -> SchemaReport:
+    """Validate the survey workbook at ``path`` against ``columns`` from its header row."""
+    return validate_header(read_header(path), columns)
@@ -0,0 +1,145 @@
+import os
+import sys
+from typing import Optional
+
+CLEAR = "\033[H\033[2J"
+CLEAR_LINE = "\033[K"
+CLEAR_BELOW = "\033[J"
+
+# Second byte after the 0xE0/0x00 prefix msvcrt reports for special keys.
+WINDOWS_KEYS = {
+    b"H": "up",
+    b"P": "down",
+    b"K": "left",
+    b"M": "right",
+    b"I": "pageup",
+    b"Q": "pagedown",
+    b"G": "home",
+    b"O": "end",
+}
+# ANSI escape sequences sent by xterm-like terminals.
+ANSI_KEYS = {
+    b"\x1b[A": "up",
+    b"\x1b[B": "down",
+    b"\x1b[C": "right",
+    b"\x1b[D": "left",
+    b"\x1b[5~": "pageup",
+    b"\x1b[6~": "pagedown",
+    b"\x1b[H": "home",
+    b"\x1b[1~": "home",
+    b"\x1bOH": "home",
+    b"\x1b[F": "end",
+    b"\x1b[4~": "end",
+    b"\x1bOF": "end",
+    b"\x1b": "esc",
+    b"\r": "enter",
+    b"\n": "enter",
+}
+ESCAPE_TIMEOUT = 0.05  # seconds to wait for the rest of an escape sequence
+
+_vt_enabled = False
+
+
+def enable_ansi():
+    """Turn on ANSI escape processing in the Windows console (a no-op elsewhere)."""
+    global _vt_enabled
+    if _vt_enabled or os.name != "nt":
+        return
+    import ctypes
+
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+    mode = ctypes.c_uint32()
+    if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        kernel32.SetConsoleMode(handle, mode.value | 0x0004)
+    _vt_enabled = True
+
+
+def clear_screen():
+    enable_ansi()
+    sys.stdout.write(CLEAR)
+    sys.stdout.flush()
+
+
+def _read_key_windows() -> str:
+    import msvcrt
+
+    key = msvcrt.getch()
+    if key in (b"\xe0", b"\x00"):
+        return WINDOWS_KEYS.get(msvcrt.getch(), "")
+    if key == b"\x03":
+        raise KeyboardInterrupt
+    return ANSI_KEYS.get(key) or key.decode("latin-1").lower()
+
+
+def _read_key_posix() -> str:
+    import select
+    import termios
+    import tty
+
+    fd = sys.stdin.fileno()
+    saved = termios.tcgetattr(fd)
+    try:
+        # cbreak rather than raw, so Ctrl+C still raises KeyboardInterrupt.
+        tty.setcbreak(fd, termios.TCSANOW)
+        key = os.read(fd, 1)
+        if key == b"\x1b":
+            # Byte by byte, so keys typed ahead are left for the next call.
+            while select.select([fd], [], [], ESCAPE_TIMEOUT)[0]:
+                key += os.read(fd, 1)
+                if len(key) > 2 and (key[-1:].isalpha() or key.endswith(b"~")):
+                    break
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved)
+    return ANSI_KEYS.get(key) or key.decode("utf-8", errors="ignore").lower()
+
+
+def read_key() -> str:
+    """
+    Wait for one keypress and return its name.
+
+    Arrows and paging keys come back as "up", "down", "left", "right",
+    "pageup", "pagedown", "home" and "end"; Enter and Esc as "enter" and
+    "esc"; anything else as the lower-cased character. Uses msvcrt on
+    Windows and termios everywhere else.
+    """
+    if os.name == "nt":
+        return _read_key_windows()
+    return _read_key_posix()
+
+
+class Screen:
+    """
+    Draws full-screen frames, repainting only the lines that changed.
+
+    The first frame (and the first after ``invalidate``) clears the screen;
+    later frames move the cursor to each changed line and overwrite it in
+    place, so moving a selection rewrites two lines instead of the whole
+    screen. Call ``invalidate`` after anything else printed to the terminal.
+    """
+
+    def __init__(self):
+        self._lines: Optional[list[str]] = None
+
+    def invalidate(self):
+        self._lines = None
+
+    def draw(self, frame: str):
+        enable_ansi()
+        lines = frame.split("\n")
+        if self._lines is None:
+            out = [CLEAR, "\n".join(lines)]
+        else:
+            out = [
+                f"\033[{row + 1};1H{line}{CLEAR_LINE}"
+                for row, line in enumerate(lines)
+                if row >= len(self._lines) or self._lines[row] != line
+            ]
+            if len(lines) < len(self._lines):
+                out.append(f"\033[{len(lines) + 1};1H{CLEAR_BELOW}")
+            # Leave the cursor after the last line, where a full draw ends.
+            out.append(f"\033[{len(lines)};{len(lines[-1]) + 1}H")
+        sys.stdout.write("".join(out))
+        sys.stdout.flush()
+        self._lines = lines
@@ -0,0 +1,90 @@
+import json
+import os
+import time
+from datetime import datetime
+from typing import Optional
+
+from menu.utils.config_manager import get_data_dir, get_metrics_textfile_path
+
+REPORTS_DIRNAME = "telemetry"
+METRIC_PREFIX = "benchhub"
+
+
+def _atomic_write(path: str, text: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def write_json_report(report: dict, directory: Optional[str] = None) -> str:
+    """Write ``report`` as run-<timestamp>-<run>.json and return its path."""
+    directory = directory or get_data_dir(REPORTS_DIRNAME)
+    started = datetime.fromisoformat(report["started_at"])
+    name = f"run-{started:%Y%m%d-%H%M%S}-{report['run']}.json"
+    path = os.path.join(directory, name)
+    _atomic_write(path, json.dumps(report, indent=2))
+    return path
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_prometheus(report: dict) -> str:
+    """Render a run report in the Prometheus text exposition format."""
+    run = _label(report["run"])
+    metrics = {
+        "stage_seconds": ("gauge", "Time spent in the stage during the last run."),
+        "stage_max_seconds": ("gauge", "Slowest single call of the stage."),
+        "stage_calls": ("gauge", "Calls of the stage during the last run."),
+        "stage_errors": ("gauge", "Failed calls of the stage during the last run."),
+        "stage_peak_rss_bytes": ("gauge", "Highest RSS seen when the stage finished."),
+        "stage_items": ("gauge", "Items (tokens, rows, ...) counted by the stage."),
+    }
+    samples = {name: [] for name in metrics}
+    for stage, m in sorted(report["stages"].items()):
+        labels = f'run="{run}",stage="{_label(stage)}"'
+        samples["stage_seconds"].append(f"{{{labels}}} {m['seconds']}")
+        samples["stage_max_seconds"].append(f"{{{labels}}} {m['max_seconds']}")
+        samples["stage_calls"].append(f"{{{labels}}} {m['calls']}")
+        samples["stage_errors"].append(f"{{{labels}}} {m['errors']}")
+        samples["stage_peak_rss_bytes"].append(f"{{{labels}}} {m['peak_rss_bytes']}")
+        for item, value in sorted(m["counts"].items()):
+            samples["stage_items"].append(f'{{{labels},item="{_label(item)}"}} {value}')
+
+    lines = []
+    for name, (kind, help_text) in metrics.items():
+        if not samples[name]:
+            continue
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+        lines.extend(f"{METRIC_PREFIX}_{name}{sample}" for sample in samples[name])
+    for name, help_text, value in (
+        (
+            "run_duration_seconds",
+            "Wall time of the last run.",
+            report["duration_seconds"],
+        ),
+        ("peak_rss_bytes", "Peak RSS of the process.", report["peak_rss_bytes"]),
+        ("last_run_timestamp_seconds", "When the last run finished.", time.time()),
+    ):
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+        lines.append(f'{METRIC_PREFIX}_{name}{{run="{run}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_textfile(report: dict, path: Optional[str] = None) -> str:
+    """
+    Replace the Prometheus textfile with the metrics of ``report``.
+
+    Point node_exporter's textfile collector at the folder (or set
+    ``textfile_path`` under [Telemetry] in config.ini) to scrape it.
+    """
+    path = path or get_metrics_textfile_path()
+    _atomic_write(path, format_prometheus(report))
+    return path
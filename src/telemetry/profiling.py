@@ -0,0 +1,47 @@
+import cProfile
+import os
+import threading
+from contextlib import contextmanager
+from typing import Iterable
+
+from menu.utils.config_manager import get_data_dir
+
+# Set to a survey Id to profile every pipeline stage that handles that entry.
+PROFILE_ENV = "BENCHHUB_PROFILE_ENTRY"
+PROFILES_DIRNAME = "profiles"
+
+
+def profile_target() -> str:
+    return os.environ.get(PROFILE_ENV, "").strip()
+
+
+@contextmanager
+def profile_entries(entry_ids: Iterable[str], stage: str):
+    """
+    Run the body under cProfile if it handles the entry named by BENCHHUB_PROFILE_ENTRY.
+
+    The profile is written to profiles/entry-<id>-<stage>.prof in the data
+    folder (open it with ``python -m pstats`` or snakeviz). The stage runs on a
+    thread named ``pipeline-<stage>``, so ``py-spy dump --pid <pid>`` shows the
+    same entry in flight.
+    """
+    target = profile_target()
+    if not target or target not in {str(i) for i in entry_ids}:
+        yield
+        return
+
+    print(
+        f"Profiling entry {target} in stage '{stage}' "
+        f"(pid {os.getpid()}, thread {threading.current_thread().name})"
+    )
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path = os.path.join(
+            get_data_dir(PROFILES_DIRNAME), f"entry-{target}-{stage}.prof"
+        )
+        profiler.dump_stats(path)
+        print(f"Profile written to {path}")
@@ -0,0 +1,162 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from llm_core.memory import current_rss, peak_rss
+
+
+@dataclass
+class StageMetrics:
+    calls: int = 0
+    seconds: float = 0.0
+    max_seconds: float = 0.0
+    errors: int = 0
+    peak_rss: int = 0
+    counts: dict[str, int] = field(default_factory=dict)
+
+
+class Recorder:
+    """
+    Collects per-stage timings for one run.
+
+    Every stage accumulates its number of calls, total and slowest duration,
+    error count, the resident set size seen when it finished, and any counts
+    the caller attaches (tokens, rows, emails). Recording is thread-safe, so
+    pipeline stages running on separate threads share one recorder.
+    """
+
+    def __init__(self, name: str = "run"):
+        self.name = name
+        self.started_at = datetime.now()
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages: dict[str, StageMetrics] = {}
+
+    @contextmanager
+    def stage(self, name: str, **counts: int) -> Iterator[dict]:
+        """
+        Time the body as one call of stage ``name``.
+
+        Yields a dict the body can add counts to, e.g. ``counts["tokens"] = n``.
+        An exception counts as an error for the stage and is re-raised.
+        """
+        start = time.perf_counter()
+        error = False
+        try:
+            yield counts
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.record(name, time.perf_counter() - start, error=error, **counts)
+
+    def record(self, name: str, seconds: float, error: bool = False, **counts: int):
+        """Add one call of ``seconds`` to stage ``name`` (for durations measured elsewhere)."""
+        rss = current_rss()
+        with self._lock:
+            metrics = self.stages.setdefault(name, StageMetrics())
+            metrics.calls += 1
+            metrics.seconds += seconds
+            metrics.max_seconds = max(metrics.max_seconds, seconds)
+            metrics.errors += int(error)
+            metrics.peak_rss = max(metrics.peak_rss, rss)
+            for key, value in counts.items():
+                metrics.counts[key] = metrics.counts.get(key, 0) + int(value)
+
+    def timed_iter(self, name: str, iterable: Iterable) -> Iterator:
+        """Yield from ``iterable``, recording the time spent producing each item."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            except BaseException:
+                self.record(name, time.perf_counter() - start, error=True)
+                raise
+            self.record(name, time.perf_counter() - start, rows=1)
+            yield item
+
+    def report(self) -> dict:
+        with self._lock:
+            stages = {
+                name: {
+                    "calls": m.calls,
+                    "seconds": round(m.seconds, 6),
+                    "max_seconds": round(m.max_seconds, 6),
+                    "errors": m.errors,
+                    "peak_rss_bytes": m.peak_rss,
+                    "counts": dict(m.counts),
+                }
+                for name, m in self.stages.items()
+            }
+        return {
+            "run": self.name,
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "duration_seconds": round(time.perf_counter() - self._start, 6),
+            "peak_rss_bytes": peak_rss(),
+            "stages": stages,
+        }
+
+    def summary(self) -> str:
+        report = self.report()
+        lines = [f"Run '{self.name}' took {report['duration_seconds']:.2f}s:"]
+        slowest = sorted(report["stages"].items(), key=lambda kv: -kv[1]["seconds"])
+        for name, m in slowest:
+            errors = f", {m['errors']} errors" if m["errors"] else ""
+            lines.append(
+                f"  {name:<22} {m['seconds']:8.2f}s over {m['calls']} calls{errors}"
+            )
+        return "\n".join(lines)
+
+
+_recorder = Recorder()
+_recorder_lock = threading.Lock()
+
+
+def get_recorder() -> Recorder:
+    return _recorder
+
+
+def start_run(name: str) -> Recorder:
+    """Start recording a new run; stages recorded from now on belong to it."""
+    global _recorder
+    with _recorder_lock:
+        _recorder = Recorder(name)
+        return _recorder
+
+
+def stage(name: str, **counts: int):
+    return get_recorder().stage(name, **counts)
+
+
+def record(name: str, seconds: float, error: bool = False, **counts: int):
+    get_recorder().record(name, seconds, error=error, **counts)
+
+
+def timed_iter(name: str, iterable: Iterable) -> Iterator:
+    return get_recorder().timed_iter(name, iterable)
+
+
+def finish_run(recorder: Optional[Recorder] = None) -> Optional[str]:
+    """
+    Write the run's JSON report and refresh the Prometheus textfile.
+
+    Returns the report path, or None if the export failed (telemetry never
+    fails a run).
+    """
+    from telemetry.export import write_json_report, write_prometheus_textfile
+
+    recorder = recorder or get_recorder()
+    report = recorder.report()
+    try:
+        path = write_json_report(report)
+        write_prometheus_textfile(report)
+    except OSError as e:
+        print(f"Could not write the run report: {e}")
+        return None
+    return path
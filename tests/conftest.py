@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# The application imports its packages from src/ (see README).
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+
+@pytest.fixture
+def app_data(tmp_path, monkeypatch):
+    """Point config.ini and every data folder at a fresh temporary directory."""
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path))
+    return tmp_path
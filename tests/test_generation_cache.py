@@ -0,0 +1,27 @@
+from benchmarks.fakes import FakeLLMRunner
+from menu.options.send_emails.llm_integration import generation_cache, run
+
+
+def _entries():
+    return [
+        {"id": "1", "r1": "AI;", "r2": "Cloud", "r3": "No"},
+        {"id": "2", "r1": "Testing", "r2": "-", "r3": "Yes"},
+    ]
+
+
+def test_cache_survives_a_new_output_cap(app_data, monkeypatch):
+    monkeypatch.setattr(generation_cache, "_cache", None)
+    model_path = app_data / "model.gguf"
+    model_path.write_bytes(b"GGUF")
+    llm = FakeLLMRunner(str(model_path), tokens_per_entry=20)
+
+    first = _entries()
+    run.generate_for_entries(llm, first)
+    calls = llm.calls
+
+    # More paragraph history moves the learned output cap between runs.
+    monkeypatch.setattr(run, "MAX_TOKENS", run.MAX_TOKENS // 2)
+    second = _entries()
+    run.generate_for_entries(llm, second)
+    assert llm.calls == calls
+    assert [e["llm_output"] for e in second] == [e["llm_output"] for e in first]
@@ -0,0 +1,80 @@
+import struct
+
+import pytest
+
+from llm_core.gguf import GGUFError, default_n_ctx, read_gguf
+
+
+def _string(text: str) -> bytes:
+    data = text.encode("utf-8")
+    return struct.pack("<Q", len(data)) + data
+
+
+def _tiny_gguf() -> bytes:
+    """A GGUF v3 file with a few metadata keys and one 4x8 F32 tensor."""
+    metadata = [
+        ("general.architecture", 8, _string("llama")),
+        ("general.name", 8, _string("tiny")),
+        ("general.file_type", 4, struct.pack("<I", 15)),
+        ("llama.context_length", 4, struct.pack("<I", 2048)),
+        (
+            "tokenizer.ggml.tokens",
+            9,
+            struct.pack("<IQ", 8, 3) + b"".join(_string(t) for t in ("<s>", "a", "b")),
+        ),
+        ("tokenizer.ggml.scores", 9, struct.pack("<IQ", 6, 3) + bytes(12)),
+    ]
+    header = b"GGUF" + struct.pack("<IQQ", 3, 1, len(metadata))
+    for key, kind, value in metadata:
+        header += _string(key) + struct.pack("<I", kind) + value
+    header += _string("token_embd.weight") + struct.pack("<IQQIQ", 2, 4, 8, 0, 0)
+    header += bytes(-len(header) % 32)
+    return header + bytes(4 * 8 * 4)
+
+
+def _write(tmp_path, data: bytes, name="model.gguf") -> str:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_valid_header(tmp_path):
+    data = _tiny_gguf()
+    info = read_gguf(_write(tmp_path, data))
+    assert info.version == 3
+    assert info.architecture == "llama"
+    assert info.name == "tiny"
+    assert info.context_length == 2048
+    assert info.quantization == "Q4_K_M"
+    assert info.tensor_count == 1
+    assert info.metadata["tokenizer.ggml.tokens"] == 3
+    assert info.data_end == len(data)
+    assert info.summary() == "tiny (llama, Q4_K_M, ctx 2048, 1 tensors)"
+    assert default_n_ctx(str(tmp_path / "model.gguf"), cap=1024) == 1024
+
+
+def test_bad_magic(tmp_path):
+    path = _write(tmp_path, b"GGML" + _tiny_gguf()[4:])
+    with pytest.raises(GGUFError, match="magic"):
+        read_gguf(path)
+    assert default_n_ctx(path, cap=4096) == 4096
+
+
+def test_truncated_mid_metadata(tmp_path):
+    data = _tiny_gguf()
+    cut = data.index(b"llama.context_length") + 5
+    with pytest.raises(GGUFError, match="ends inside its header"):
+        read_gguf(_write(tmp_path, data[:cut]))
+
+
+def test_truncated_weights(tmp_path):
+    with pytest.raises(GGUFError, match="truncated"):
+        read_gguf(_write(tmp_path, _tiny_gguf()[:-1]))
+
+
+def test_every_truncation_raises_a_clean_error(tmp_path):
+    data = _tiny_gguf()
+    for size in range(len(data)):
+        path = _write(tmp_path, data[:size], name=f"cut{size}.gguf")
+        with pytest.raises(GGUFError):
+            read_gguf(path)
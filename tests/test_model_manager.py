@@ -0,0 +1,55 @@
+import llm_core.autotune
+from llm_core import model_manager
+from llm_core.model_manager import ModelManager
+from menu.options.configuration.autotune import run_autotune
+from menu.utils.config_manager import (
+    get_inference_settings,
+    load_config,
+    save_config,
+)
+
+
+class FakeRunner:
+    def __init__(self):
+        self.loaded = True
+
+    @property
+    def is_loaded(self):
+        return self.loaded
+
+    def unload(self):
+        was_loaded, self.loaded = self.loaded, False
+        return was_loaded
+
+
+def test_evict_drops_only_that_model():
+    manager = ModelManager()
+    old, other = FakeRunner(), FakeRunner()
+    manager._runners[("a.gguf", 0, 6)] = old
+    manager._runners[("b.gguf", 0, 6)] = other
+    assert manager.evict("a.gguf") == 1
+    assert not old.is_loaded
+    assert other.is_loaded
+    assert list(manager._runners) == [("b.gguf", 0, 6)]
+
+
+def test_autotune_unloads_before_the_sweep_and_evicts_after(app_data, monkeypatch):
+    model_path = str(app_data / "model.gguf")
+    open(model_path, "wb").close()
+    config = load_config()
+    config["Paths"]["llm_model_path"] = model_path
+    save_config(config)
+
+    manager = ModelManager()
+    monkeypatch.setattr(model_manager, "_manager", manager)
+    resident = FakeRunner()
+    manager._runners[(model_path, 0, 6)] = resident
+
+    def fake_autotune(path, prompt, n_ctx=0, baseline=None, on_trial=None):
+        assert not resident.is_loaded, "the sweep ran next to a resident model"
+        return {"n_threads": 3, "n_batch": 128}, []
+
+    monkeypatch.setattr(llm_core.autotune, "autotune", fake_autotune)
+    assert run_autotune() == 0
+    assert manager._runners == {}
+    assert get_inference_settings()["n_threads"] == 3
@@ -0,0 +1,44 @@
+import math
+
+from menu.options.send_emails.llm_integration.normalization import (
+    canonical_answer,
+    group_entries,
+    normalize_entry,
+)
+
+
+def _entry(r1, r2, r3):
+    return {"r1": r1, "r2": r2, "r3": r3}
+
+
+def test_placeholders_fold_in_free_text_fields():
+    entry = _entry("N/A", " no ", "Yes")
+    normalize_entry(entry)
+    assert entry == _entry("-", "-", "Yes")
+
+
+def test_yes_no_answer_keeps_no():
+    entry = _entry("AI;", "Cloud", "No")
+    normalize_entry(entry)
+    assert entry["r3"] == "No"
+
+
+def test_yes_no_answer_still_folds_empty_values():
+    for value in (None, math.nan, "", "   "):
+        entry = _entry("AI", "Cloud", value)
+        normalize_entry(entry)
+        assert entry["r3"] == "-"
+
+
+def test_multi_select_is_sorted_and_deduplicated():
+    assert canonical_answer("Automation;AI;ai;", multi_select=True) == "AI, Automation"
+
+
+def test_no_and_missing_training_answers_are_grouped_apart():
+    entries = [
+        _entry("AI", "Cloud", "No"),
+        _entry("ai;", "cloud", "no"),
+        _entry("AI", "Cloud", None),
+    ]
+    groups = group_entries(entries)
+    assert [len(group) for group in groups] == [2, 1]
@@ -0,0 +1,161 @@
+import os
+import sqlite3
+
+from benchmarks.fakes import FakeTransport
+from menu.options.send_emails.llm_integration.sent_log import load_sent_log
+from menu.options.send_emails import outbox_sender
+from menu.options.send_emails.outbox import Outbox
+from menu.options.send_emails.outbox_sender import OutboxSender
+
+
+def _sender(app_data, transport, **kwargs):
+    outbox = Outbox(str(app_data / "outbox"))
+    log_path = str(app_data / "sent_log.db")
+    sender = OutboxSender(outbox, transport, log_path=log_path, **kwargs)
+    return outbox, sender, log_path
+
+
+def test_spooled_message_id_is_sent(app_data):
+    transport = FakeTransport()
+    outbox, sender, log_path = _sender(app_data, transport)
+    outbox.enqueue("7", to="a@example.com", cc="", subject="Hi", html_body="<p>x</p>")
+    message_id = outbox.load("7")[0]["message_id"]
+    assert message_id.startswith("<benchhub-7-")
+
+    sender.start()
+    try:
+        assert sender.drain(timeout=10)
+    finally:
+        sender.stop()
+    assert [sent["message_id"] for sent in transport.sent] == [message_id]
+    assert load_sent_log(log_path) == {"7"}
+    assert outbox.pending() == []
+
+
+def test_unreadable_message_is_parked_and_worker_survives(app_data):
+    transport = FakeTransport()
+    outbox, sender, log_path = _sender(app_data, transport)
+    for entry_id in ("1", "2"):
+        outbox.enqueue(
+            entry_id,
+            to=f"{entry_id}@example.com",
+            cc="",
+            subject="Hi",
+            html_body="<p>x</p>",
+        )
+    eml_path, _ = outbox._paths("1")
+    with open(eml_path, "wb") as f:
+        f.write(b"not an email")
+
+    sender.start()
+    try:
+        assert sender.drain(timeout=10)
+        outbox.enqueue("3", to="3@example.com", cc="", subject="Hi", html_body="<p/>")
+        sender.submit("3")
+        assert sender.drain(timeout=10)
+    finally:
+        sender.stop()
+    assert sorted(sent["to"] for sent in transport.sent) == [
+        "2@example.com",
+        "3@example.com",
+    ]
+    assert outbox.pending() == []
+    assert os.listdir(outbox.failed_directory)
+    assert load_sent_log(log_path) == {"1", "2", "3"}
+
+
+def test_ledger_error_is_retried(app_data, monkeypatch):
+    transport = FakeTransport()
+    outbox, sender, log_path = _sender(app_data, transport, retry_base=0.01)
+    real_get_ledger = outbox_sender.get_ledger
+    calls = []
+
+    def flaky_get_ledger(path=None):
+        calls.append(path)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return real_get_ledger(path)
+
+    monkeypatch.setattr(outbox_sender, "get_ledger", flaky_get_ledger)
+    outbox.enqueue("1", to="1@example.com", cc="", subject="Hi", html_body="<p/>")
+    sender.start()
+    try:
+        assert sender.drain(timeout=10)
+    finally:
+        sender.stop()
+    assert [sent["to"] for sent in transport.sent] == ["1@example.com"]
+    assert load_sent_log(log_path) == {"1"}
+
+
+def test_failing_thread_setup_does_not_stop_the_worker(app_data):
+    class SetupFails(FakeTransport):
+        def on_thread_start(self):
+            raise OSError("COM unavailable")
+
+    transport = SetupFails()
+    outbox, sender, _ = _sender(app_data, transport)
+    outbox.enqueue("1", to="1@example.com", cc="", subject="Hi", html_body="<p/>")
+    sender.start()
+    try:
+        assert sender.drain(timeout=10)
+    finally:
+        sender.stop()
+    assert len(transport.sent) == 1
+
+
+def _fail_once(monkeypatch, target, name, error):
+    real = getattr(target, name)
+    calls = []
+
+    def flaky(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise error
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(target, name, flaky)
+
+
+def _run(sender):
+    sender.start()
+    try:
+        assert sender.drain(timeout=10)
+    finally:
+        sender.stop()
+
+
+def test_ledger_failure_after_send_does_not_resend(app_data, monkeypatch):
+    transport = FakeTransport()
+    outbox, sender, log_path = _sender(app_data, transport, retry_base=0.01)
+    _fail_once(
+        monkeypatch,
+        outbox_sender,
+        "append_to_sent_log",
+        sqlite3.OperationalError("disk I/O error"),
+    )
+    outbox.enqueue("1", to="1@example.com", cc="", subject="Hi", html_body="<p/>")
+    _run(sender)
+    assert len(transport.sent) == 1
+    # Kept, marked delivered, so the next run records it without sending.
+    assert outbox.load("1")[0]["delivered"]
+
+    _, next_sender, _ = _sender(app_data, transport)
+    _run(next_sender)
+    assert len(transport.sent) == 1
+    assert load_sent_log(log_path) == {"1"}
+    assert outbox.pending() == []
+
+
+def test_remove_failure_after_send_does_not_resend(app_data, monkeypatch):
+    transport = FakeTransport()
+    outbox, sender, log_path = _sender(app_data, transport, retry_base=0.01)
+    _fail_once(monkeypatch, outbox, "remove", PermissionError("file in use"))
+    outbox.enqueue("1", to="1@example.com", cc="", subject="Hi", html_body="<p/>")
+    _run(sender)
+    assert len(transport.sent) == 1
+    assert load_sent_log(log_path) == {"1"}
+
+    _, next_sender, _ = _sender(app_data, transport)
+    _run(next_sender)
+    assert len(transport.sent) == 1
+    assert outbox.pending() == []
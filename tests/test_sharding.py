@@ -0,0 +1,48 @@
+import queue
+
+from llm_core.generation import GenerationStats, StopCondition
+from llm_core.sharding import ShardedGenerator
+
+
+class _Alive:
+    name = "llm-worker-0"
+
+    def is_alive(self):
+        return True
+
+
+def _pool(results: list) -> ShardedGenerator:
+    """A pool whose 'workers' already answered with ``results``."""
+    pool = ShardedGenerator("model.gguf", [[0]], n_ctx=512, batch_size=2)
+    pool._processes = [_Alive()]
+    pool._tasks = queue.Queue()
+    pool._results = queue.Queue()
+    for message in results:
+        pool._results.put(message)
+    return pool
+
+
+def _result(job, start, texts, worker=0):
+    return ("result", job, start, texts, [GenerationStats() for _ in texts], worker)
+
+
+def test_results_are_merged_in_input_order():
+    pool = _pool([_result(1, 2, ["c"]), _result(1, 0, ["a", "b"])])
+    texts = pool.generate(["1", "2", "3"], max_tokens=8, stop=StopCondition())
+    assert texts == ["a", "b", "c"]
+    assert pool._tasks.qsize() == 2
+
+
+def test_late_results_of_an_abandoned_job_are_dropped():
+    pool = _pool(
+        [
+            # Job 1 was abandoned after queueing two tasks; both answer late.
+            _result(1, 0, ["stale a", "stale b"]),
+            ("error", 1, 2, "interrupted"),
+            _result(2, 0, ["fresh a", "fresh b"]),
+        ]
+    )
+    pool._job = 1
+    texts = pool.generate(["1", "2"], max_tokens=8, stop=StopCondition())
+    assert texts == ["fresh a", "fresh b"]
+    assert pool.prompts_per_worker == [2]
@@ -0,0 +1,55 @@
+from menu.utils.survey_schema import (
+    FIELD_COLUMNS,
+    SURVEY_COLUMNS,
+    SurveyColumn,
+    resolve_indexes,
+    validate_header,
+)
+
+OPTIONAL_TITLES = [column.title for column in SURVEY_COLUMNS if column.optional]
+
+
+def test_full_header_is_ok():
+    report = validate_header([column.title for column in SURVEY_COLUMNS])
+    assert report.ok
+    assert not report.missing and not report.absent and not report.extra
+
+
+def test_absent_optional_columns_are_not_missing():
+    header = [column.title for column in SURVEY_COLUMNS if not column.optional]
+    for columns in (SURVEY_COLUMNS, FIELD_COLUMNS):
+        report = validate_header(header, columns)
+        assert report.ok
+        assert report.missing == []
+        assert report.absent == OPTIONAL_TITLES
+    # The workbook the validator accepts is one the sender can resolve.
+    assert "office" not in resolve_indexes(header)
+    assert "Optional columns not present:" in report.describe()
+
+
+def test_absent_required_column_is_missing():
+    header = [column.title for column in SURVEY_COLUMNS if column.title != "Email"]
+    report = validate_header(header, FIELD_COLUMNS)
+    assert not report.ok
+    # "Send Email" contains the keyword but is another question, not a rewording.
+    assert report.missing == ["Email"]
+    assert "Send Email" in report.extra
+
+
+def test_reworded_column_is_renamed():
+    header = [column.title for column in SURVEY_COLUMNS]
+    header[header.index("Email")] = "Work email address"
+    report = validate_header(header)
+    assert report.ok
+    assert report.renamed == {"Email": "Work email address"}
+
+
+def test_custom_columns_are_checked_against_their_own_titles():
+    columns = (
+        SurveyColumn("Id", ("Id",), "id"),
+        SurveyColumn("Team", ("team",), "team"),
+    )
+    report = validate_header(["Id", "Your team name", "Start time"], columns)
+    assert report.ok
+    assert report.renamed == {"Team": "Your team name"}
+    assert report.extra == ["Start time"]
@@ -0,0 +1,60 @@
+import pytest
+
+from benchmarks.fakes import FakeTokenizer
+from menu.options.send_emails.llm_integration.token_budget import (
+    TRUNCATION_MARK,
+    TokenBudget,
+    fair_shares,
+)
+
+LONG = "lorem ipsum " * 2000
+
+
+class OvershootingTokenizer(FakeTokenizer):
+    """Keeps 100 tokens more than asked for, so fitting by shares never converges."""
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        return super().truncate(text, max_tokens + 100)
+
+
+def _entry(r1=LONG, r2=LONG, r3="No"):
+    return {"id": "1", "r1": r1, "r2": r2, "r3": r3}
+
+
+def _template_tokens(tokenizer) -> int:
+    return TokenBudget(tokenizer, 0, 0).count_prompt([TRUNCATION_MARK] * 2 + ["No"])
+
+
+def test_fair_shares_protects_short_answers():
+    assert fair_shares([5, 1000, 1000], 105) == [5, 50, 50]
+
+
+def test_prompt_that_fits_is_unchanged():
+    budget = TokenBudget(FakeTokenizer(), n_ctx=4096, max_tokens=256)
+    prompt, n_tokens = budget.fit(_entry(r1="AI", r2="Cloud"))
+    assert "AI" in prompt and "Cloud" in prompt
+    assert n_tokens <= budget.prompt_limit
+    assert budget.truncated == 0
+
+
+def test_long_answers_are_truncated_to_the_limit():
+    budget = TokenBudget(FakeTokenizer(), n_ctx=2048, max_tokens=256)
+    prompt, n_tokens = budget.fit(_entry())
+    assert n_tokens <= budget.prompt_limit
+    assert prompt.count(TRUNCATION_MARK) == 2
+    assert budget.truncated == 1
+
+
+def test_limit_holds_when_truncation_overshoots():
+    tokenizer = OvershootingTokenizer()
+    n_ctx = _template_tokens(tokenizer) + 256 + 8 + 40
+    budget = TokenBudget(tokenizer, n_ctx=n_ctx, max_tokens=256)
+    _, n_tokens = budget.fit(_entry())
+    assert n_tokens <= budget.prompt_limit
+
+
+def test_context_too_small_for_the_template_raises():
+    tokenizer = FakeTokenizer()
+    budget = TokenBudget(tokenizer, n_ctx=_template_tokens(tokenizer), max_tokens=256)
+    with pytest.raises(ValueError, match="too small"):
+        budget.fit(_entry())
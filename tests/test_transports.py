@@ -0,0 +1,147 @@
+import asyncio
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email import message_from_bytes, policy
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from menu.options.send_emails.transports import SMTPTransport
+
+
+class RecordingHandler:
+    """Keeps every message and tracks how many are being received at once."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.messages = []
+        self.sessions = set()
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        with self._lock:
+            self.sessions.add(id(session))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            message = message_from_bytes(envelope.content, policy=policy.default)
+            with self._lock:
+                self.messages.append(message)
+        finally:
+            with self._lock:
+                self.active -= 1
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    servers = []
+
+    def start(handler, port=None):
+        controller = Controller(
+            handler, hostname="127.0.0.1", port=port or _free_port()
+        )
+        controller.start()
+        servers.append(controller)
+        return controller
+
+    yield start
+    for controller in servers:
+        try:
+            controller.stop()
+        except AssertionError:
+            pass  # Already stopped by the test.
+
+
+def _transport(controller, **kwargs) -> SMTPTransport:
+    return SMTPTransport(
+        host=controller.hostname,
+        port=controller.port,
+        sender="benchhub@example.com",
+        starttls=False,
+        timeout=5,
+        **kwargs,
+    )
+
+
+def _send(transport, n: int, **kwargs):
+    transport.send(
+        to=f"person{n}@example.com",
+        cc="coach@example.com",
+        subject="Bench",
+        html_body=f"<p>{n}</p>",
+        **kwargs,
+    )
+
+
+def test_connection_is_reused(smtp_server):
+    handler = RecordingHandler()
+    transport = _transport(smtp_server(handler), max_connections=2)
+    try:
+        for n in range(5):
+            _send(transport, n)
+    finally:
+        transport.close()
+    assert len(handler.messages) == 5
+    assert transport.connections_opened == 1
+    assert len(handler.sessions) == 1
+
+
+def test_sends_run_concurrently_up_to_the_limit(smtp_server):
+    handler = RecordingHandler(delay=0.2)
+    transport = _transport(smtp_server(handler), max_connections=3)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda n: _send(transport, n), range(12)))
+    finally:
+        transport.close()
+    assert len(handler.messages) == 12
+    assert handler.peak == 3
+    assert transport.connections_opened <= 3
+    assert len(handler.sessions) <= 3
+
+
+def test_dropped_connection_is_reopened_and_retried_once(smtp_server):
+    handler = RecordingHandler()
+    controller = smtp_server(handler)
+    transport = _transport(controller, max_connections=1)
+    try:
+        _send(transport, 1)
+        # Restarting the server drops the pooled connection.
+        controller.stop()
+        smtp_server(handler, port=controller.port)
+        _send(transport, 2)
+    finally:
+        transport.close()
+    assert [m["To"] for m in handler.messages] == [
+        "person1@example.com",
+        "person2@example.com",
+    ]
+    assert transport.connections_opened == 2
+
+
+def test_message_headers(smtp_server):
+    handler = RecordingHandler()
+    transport = _transport(smtp_server(handler))
+    try:
+        _send(transport, 1, message_id="<benchhub-1@example.com>")
+    finally:
+        transport.close()
+    (message,) = handler.messages
+    assert message["Message-ID"] == "<benchhub-1@example.com>"
+    assert message["From"] == "benchhub@example.com"
+    assert message["Cc"] == "coach@example.com"
+    assert (
+        message.get_body(preferencelist=("html",)).get_content().strip() == "<p>1</p>"
+    )